@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2026 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License.
+
+"""
+Compare building a DataFrame from a result cell by cell and from its columns
+converted to typed arrays, and the export to an Arrow table.
+
+    python3 -m benchmark.columnar_benchmark --rows 100000
+"""
+
+import argparse
+import time
+
+from nebula3.common.ttypes import DataSet, NullType, Row, Value
+from nebula3.data.ResultSet import ResultSet
+from nebula3.graph.ttypes import ExecutionResponse
+
+
+def make_response(rows):
+    data = DataSet(
+        column_names=[b'id', b'age', b'score', b'active', b'team', b'name'],
+        rows=[],
+    )
+    for i in range(rows):
+        data.rows.append(
+            Row(
+                values=[
+                    Value(iVal=i),
+                    Value(iVal=20 + i % 30),
+                    Value(fVal=i / 7.0),
+                    Value(bVal=i % 2 == 0),
+                    Value(sVal=b'team%d' % (i % 30)),
+                    (
+                        Value(nVal=NullType.__NULL__)
+                        if i % 10 == 0
+                        else Value(sVal=b'player%d' % i)
+                    ),
+                ]
+            )
+        )
+    return ExecutionResponse(error_code=0, latency_in_us=0, data=data)
+
+
+def per_cell(resp):
+    # what as_data_frame did before the columns
+    import pandas as pd
+
+    result = ResultSet(resp, 0)
+    data = dict()
+    for col in result.keys():
+        data[col] = [x.cast_primitive() for x in result.column_values(col)]
+    return pd.DataFrame(data)
+
+
+def columnar(resp):
+    return ResultSet(resp, 0).as_data_frame()
+
+
+def arrow(resp):
+    return ResultSet(resp, 0).to_arrow()
+
+
+def bench(convert, resp, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        convert(resp)
+        cost = time.perf_counter() - start
+        best = cost if best is None else min(best, cost)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    resp = make_response(args.rows)
+    cell = bench(per_cell, resp, args.repeat)
+    column = bench(columnar, resp, args.repeat)
+    table = bench(arrow, resp, args.repeat)
+    print(
+        'per cell: {:>8.1f} ms  columnar: {:>8.1f} ms ({:.1f}x)'
+        '  arrow: {:>8.1f} ms ({:.1f}x)'.format(
+            cell * 1000, column * 1000, cell / column, table * 1000, cell / table
+        )
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,182 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2026 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License.
+
+"""
+Compare the bytes on the wire and the throughput of scanVertex against a
+local storaged stand-in server with each header transport compression.
+
+The stand-in answers every scan with the same page of repetitive properties.
+--mbps throttles the client reads to mimic a link between racks.
+
+    python3 -m benchmark.compression_benchmark --rows 5000 --mbps 100
+"""
+
+import argparse
+import socket
+import threading
+import time
+
+from nebula3.common.ttypes import DataSet, Row, Value
+from nebula3.fbthrift.protocol import THeaderProtocol
+from nebula3.fbthrift.server.TServer import TServer
+from nebula3.fbthrift.transport import THeaderTransport, TSocket, TTransport
+from nebula3.storage import GraphStorageService
+from nebula3.storage.ttypes import (
+    ResponseCommon,
+    ScanCursor,
+    ScanResponse,
+    ScanVertexRequest,
+    VertexProp,
+)
+
+
+class ScanHandler(GraphStorageService.Iface):
+    def __init__(self, rows):
+        props = DataSet(column_names=[b'player._vid', b'player.name', b'player.age'])
+        props.rows = [
+            Row(
+                values=[
+                    Value(sVal=b'player%d' % i),
+                    Value(sVal=b'Tim Duncan the big fundamental'),
+                    Value(iVal=20 + i % 30),
+                ]
+            )
+            for i in range(rows)
+        ]
+        self._resp = ScanResponse(
+            result=ResponseCommon(failed_parts=[], latency_in_us=1),
+            props=props,
+            cursors={},
+        )
+
+    def scanVertex(self, req):
+        return self._resp
+
+
+class StorageStandIn(object):
+    """Serve GraphStorageService over the header transport on a local port"""
+
+    def __init__(self, rows):
+        self._server = TServer(
+            GraphStorageService.Processor(ScanHandler(rows)),
+            None,
+            TTransport.TBufferedTransportFactory(),
+            THeaderProtocol.THeaderProtocolFactory(),
+        )
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind(('127.0.0.1', 0))
+        self._sock.listen(16)
+        self.port = self._sock.getsockname()[1]
+        thread = threading.Thread(target=self._accept, daemon=True)
+        thread.start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            client = TSocket.TSocket()
+            client.setHandle(conn)
+            thread = threading.Thread(
+                target=self._server.handle, args=(client,), daemon=True
+            )
+            thread.start()
+
+    def close(self):
+        self._sock.close()
+
+
+class WireSocket(TSocket.TSocket):
+    """Count the bytes sent and received, and cap the receiving rate"""
+
+    def __init__(self, host, port, mbps):
+        TSocket.TSocket.__init__(self, host, port)
+        self.sent = 0
+        self.received = 0
+        self._bytes_per_second = mbps * 1e6 / 8 if mbps else 0
+
+    def _throttle(self, size):
+        self.received += size
+        if self._bytes_per_second:
+            time.sleep(size / self._bytes_per_second)
+
+    def read(self, sz):
+        buff = TSocket.TSocket.read(self, sz)
+        self._throttle(len(buff))
+        return buff
+
+    def readInto(self, buf):
+        size = TSocket.TSocket.readInto(self, buf)
+        self._throttle(size)
+        return size
+
+    def write(self, buff):
+        self.sent += len(buff)
+        TSocket.TSocket.write(self, buff)
+
+
+def run(port, compression, min_size, requests, mbps):
+    sock = WireSocket('127.0.0.1', port, mbps)
+    header_transport = THeaderTransport.THeaderTransport(
+        TTransport.TBufferedTransport(sock)
+    )
+    if compression is not None:
+        header_transport.set_compression(compression, min_size)
+    client = GraphStorageService.Client(
+        THeaderProtocol.THeaderProtocol(header_transport)
+    )
+    header_transport.open()
+    req = ScanVertexRequest(
+        space_id=1,
+        parts={1: ScanCursor()},
+        return_columns=[VertexProp(tag=1, props=[b'_vid', b'name', b'age'])],
+        limit=1000,
+    )
+    rows = 0
+    start = time.perf_counter()
+    for _ in range(requests):
+        rows += len(client.scanVertex(req).props.rows)
+    cost = time.perf_counter() - start
+    header_transport.close()
+    return sock.sent, sock.received, rows / cost
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--rows', type=int, default=5000)
+    parser.add_argument('--requests', type=int, default=50)
+    parser.add_argument('--min-size', type=int, default=0)
+    parser.add_argument(
+        '--mbps', type=float, default=0, help='link speed, 0 means unlimited'
+    )
+    parser.add_argument(
+        '--compressions', nargs='+', default=['none', 'zlib', 'snappy', 'zstd']
+    )
+    args = parser.parse_args()
+
+    server = StorageStandIn(args.rows)
+    for name in args.compressions:
+        compression = None if name == 'none' else name
+        try:
+            sent, received, rows_per_second = run(
+                server.port, compression, args.min_size, args.requests, args.mbps
+            )
+        except Exception as e:
+            print('{:<6} skipped: {}'.format(name, e))
+            continue
+        print(
+            '{:<6} sent: {:>10} B  received: {:>12} B  rows/s: {:>10.0f}'.format(
+                name, sent, received, rows_per_second
+            )
+        )
+    server.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2026 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License.
+
+"""
+Measure how many result rows per second can be decoded from an
+ExecutionResponse, with and without the native fastproto codec.
+
+    python3 setup.py build_ext --inplace
+    python3 -m benchmark.decode_benchmark --rows 200000
+"""
+
+import argparse
+import time
+
+from nebula3.common import ttypes
+from nebula3.common.ttypes import DataSet, Row, Tag, Value, Vertex
+from nebula3.fbthrift.protocol import TBinaryProtocol, TCompactProtocol
+from nebula3.fbthrift.util import Serializer
+from nebula3.graph import ttypes as graph_ttypes
+from nebula3.graph.ttypes import ExecutionResponse
+
+try:
+    from nebula3.fbthrift.protocol import fastproto
+except ImportError:
+    fastproto = None
+
+
+def make_response(rows):
+    data = DataSet(column_names=[b'id', b'name', b'age', b'score', b'v'], rows=[])
+    for i in range(rows):
+        name = b'player%d' % i
+        vertex = Vertex(
+            vid=Value(sVal=name),
+            tags=[Tag(name=b'player', props={b'name': Value(sVal=name)})],
+        )
+        data.rows.append(
+            Row(
+                values=[
+                    Value(iVal=i),
+                    Value(sVal=name),
+                    Value(iVal=i % 50),
+                    Value(fVal=i / 3.0),
+                    Value(vVal=vertex),
+                ]
+            )
+        )
+    return ExecutionResponse(error_code=0, latency_in_us=0, data=data)
+
+
+def set_fastproto(module):
+    ttypes.fastproto = module
+    graph_ttypes.fastproto = module
+
+
+def bench(factory, payload, rows, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        Serializer.deserialize(factory, payload, ExecutionResponse())
+        cost = time.perf_counter() - start
+        best = cost if best is None else min(best, cost)
+    return rows / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    resp = make_response(args.rows)
+    protocols = [
+        ('binary', TBinaryProtocol.TBinaryProtocolAcceleratedFactory()),
+        ('compact', TCompactProtocol.TCompactProtocolAcceleratedFactory()),
+    ]
+    for name, factory in protocols:
+        payload = Serializer.serialize(factory, resp)
+        set_fastproto(None)
+        python_rate = bench(factory, payload, args.rows, args.repeat)
+        line = '{:<8} {:>9} bytes  python: {:>10.0f} rows/s'.format(
+            name, len(payload), python_rate
+        )
+        if fastproto is not None:
+            set_fastproto(fastproto)
+            native_rate = bench(factory, payload, args.rows, args.repeat)
+            line += '  fastproto: {:>10.0f} rows/s  ({:.1f}x)'.format(
+                native_rate, native_rate / python_rate
+            )
+        else:
+            line += '  fastproto: not built'
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
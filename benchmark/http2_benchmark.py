@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2026 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License.
+
+"""
+Compare request latency of THttp2Client against a local h2c stand-in server
+that answers every POST with a fixed body:
+
+- when the HTTP/2 connection is re-established for every request or kept,
+- when many threads each own a connection or share THttp2Channels.
+
+    python3 -m benchmark.http2_benchmark --requests 2000 --threads 32
+"""
+
+import argparse
+import socket
+import threading
+import time
+
+import h2.config
+import h2.connection
+import h2.events
+
+from nebula3.fbthrift.transport.THttp2Client import THttp2Channels, THttp2Client
+
+
+class Http2StandIn(object):
+    """A minimal HTTP/2 (prior knowledge, no TLS) server"""
+
+    def __init__(self, body=b'\x00' * 64):
+        self._body = body
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind(('127.0.0.1', 0))
+        self._sock.listen(128)
+        self.port = self._sock.getsockname()[1]
+        self.connections = 0
+        thread = threading.Thread(target=self._accept, daemon=True)
+        thread.start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            thread = threading.Thread(target=self._serve, args=(conn,), daemon=True)
+            thread.start()
+
+    def _serve(self, conn):
+        h2conn = h2.connection.H2Connection(
+            config=h2.config.H2Configuration(client_side=False)
+        )
+        h2conn.initiate_connection()
+        conn.sendall(h2conn.data_to_send())
+        try:
+            while True:
+                data = conn.recv(65535)
+                if not data:
+                    return
+                for event in h2conn.receive_data(data):
+                    if isinstance(event, h2.events.DataReceived):
+                        h2conn.acknowledge_received_data(
+                            event.flow_controlled_length, event.stream_id
+                        )
+                    elif isinstance(event, h2.events.StreamEnded):
+                        h2conn.send_headers(
+                            event.stream_id,
+                            [
+                                (':status', '200'),
+                                ('content-type', 'application/x-thrift'),
+                                ('content-length', str(len(self._body))),
+                            ],
+                        )
+                        h2conn.send_data(event.stream_id, self._body, end_stream=True)
+                conn.sendall(h2conn.data_to_send())
+        except OSError:
+            return
+        finally:
+            conn.close()
+
+    def close(self):
+        self._sock.close()
+
+
+def run(transport, requests, reconnect):
+    payload = b'\x01' * 256
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        if reconnect:
+            # what flush() used to do before every request
+            transport.close()
+        transport.write(payload)
+        transport.flush()
+        transport.read(4096)
+        latencies.append(time.perf_counter() - start)
+    latencies.sort()
+    return latencies
+
+
+def run_threads(url, threads, requests, channels):
+    latencies = []
+    lock = threading.Lock()
+
+    def worker():
+        transport = THttp2Client(url, channels=channels)
+        transport.open()
+        result = run(transport, requests // threads, False)
+        transport.close()
+        with lock:
+            latencies.extend(result)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for worker_thread in workers:
+        worker_thread.start()
+    for worker_thread in workers:
+        worker_thread.join()
+    latencies.sort()
+    return latencies
+
+
+def report(name, latencies, connections):
+    print(
+        '{:<16} p50: {:>7.3f} ms  p99: {:>7.3f} ms  connections: {}'.format(
+            name,
+            latencies[len(latencies) // 2] * 1000,
+            latencies[int(len(latencies) * 0.99)] * 1000,
+            connections,
+        )
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--channels', type=int, default=2)
+    args = parser.parse_args()
+
+    server = Http2StandIn()
+    url = 'http://127.0.0.1:{}'.format(server.port)
+    for name, reconnect in (('reconnect', True), ('persistent', False)):
+        before = server.connections
+        transport = THttp2Client(url)
+        transport.open()
+        latencies = run(transport, args.requests, reconnect)
+        transport.close()
+        report(name, latencies, server.connections - before)
+
+    before = server.connections
+    latencies = run_threads(url, args.threads, args.requests, None)
+    report('%d threads' % args.threads, latencies, server.connections - before)
+
+    before = server.connections
+    channels = THttp2Channels(args.channels)
+    latencies = run_threads(url, args.threads, args.requests, channels)
+    channels.close()
+    report('%d shared' % args.threads, latencies, server.connections - before)
+    server.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2026 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License.
+
+"""
+Compare iterating the rows of a result as Records of ValueWrappers and as
+tuples of primitive values.
+
+    python3 -m benchmark.iter_benchmark --rows 200000
+"""
+
+import argparse
+import time
+
+from nebula3.common.ttypes import DataSet, Row, Value
+from nebula3.data.ResultSet import ResultSet
+from nebula3.graph.ttypes import ExecutionResponse
+
+
+def make_result(rows):
+    data = DataSet(column_names=[b'id', b'name', b'age', b'score'], rows=[])
+    data.rows = [
+        Row(
+            values=[
+                Value(iVal=i),
+                Value(sVal=b'player%d' % i),
+                Value(iVal=20 + i % 30),
+                Value(fVal=i / 7.0),
+            ]
+        )
+        for i in range(rows)
+    ]
+    return ResultSet(ExecutionResponse(error_code=0, latency_in_us=0, data=data), 0)
+
+
+def records(result):
+    for record in result:
+        [value.cast_primitive() for value in record]
+
+
+def tuples(result):
+    for _ in result.iter_tuples():
+        pass
+
+
+def bench(iterate, result, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        iterate(result)
+        cost = time.perf_counter() - start
+        best = cost if best is None else min(best, cost)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    result = make_result(args.rows)
+    record = bench(records, result, args.repeat)
+    plain = bench(tuples, result, args.repeat)
+    print(
+        'records: {:>8.1f} ms  tuples: {:>8.1f} ms  ({:.1f}x)'.format(
+            record * 1000, plain * 1000, record / plain
+        )
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2026 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License.
+
+"""
+Compare reading one column of a wide result when the whole response is
+decoded and when its rows are decoded lazily.
+
+    python3 -m benchmark.lazy_decode_benchmark --rows 50000 --columns 20
+"""
+
+import argparse
+import time
+
+from nebula3.common import ttypes
+from nebula3.common.ttypes import DataSet, Row, Value
+from nebula3.data.LazyDataSet import recv_execute_with_parameter
+from nebula3.data.ResultSet import ResultSet
+from nebula3.fbthrift.Thrift import TMessageType
+from nebula3.fbthrift.protocol import THeaderProtocol
+from nebula3.fbthrift.transport import THeaderTransport, TTransport
+from nebula3.graph import GraphService
+from nebula3.graph import ttypes as graph_ttypes
+from nebula3.graph.ttypes import ExecutionResponse
+
+
+def make_reply(rows, columns):
+    data = DataSet(column_names=[b'id'] + [b'p%d' % i for i in range(columns - 1)])
+    data.rows = [
+        Row(
+            values=[Value(iVal=i)]
+            + [Value(sVal=b'value%d' % (i * j)) for j in range(columns - 1)]
+        )
+        for i in range(rows)
+    ]
+    resp = ExecutionResponse(error_code=0, latency_in_us=0, data=data)
+    buf = TTransport.TMemoryBuffer()
+    trans = THeaderTransport.THeaderTransport(buf)
+    prot = THeaderProtocol.THeaderProtocol(trans)
+    prot.writeMessageBegin('executeWithParameter', TMessageType.REPLY, 0)
+    GraphService.executeWithParameter_result(success=resp).write(prot)
+    prot.writeMessageEnd()
+    trans.flush()
+    return buf.getvalue()
+
+
+def client_for(frame):
+    trans = THeaderTransport.THeaderTransport(TTransport.TMemoryBuffer(frame))
+    return GraphService.Client(THeaderProtocol.THeaderProtocol(trans))
+
+
+def eager(frame):
+    result = ResultSet(client_for(frame).recv_executeWithParameter(), 0)
+    return result.column_values('id')
+
+
+def lazy(frame):
+    result = ResultSet(recv_execute_with_parameter(client_for(frame)), 0)
+    return result.column_values('id')
+
+
+def bench(read, frame, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        read(frame)
+        cost = time.perf_counter() - start
+        best = cost if best is None else min(best, cost)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--columns', type=int, default=20)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument(
+        '--python', action='store_true', help='decode without fastproto'
+    )
+    args = parser.parse_args()
+
+    if args.python:
+        ttypes.fastproto = None
+        graph_ttypes.fastproto = None
+        GraphService.fastproto = None
+    frame = make_reply(args.rows, args.columns)
+    full = bench(eager, frame, args.repeat)
+    partial = bench(lazy, frame, args.repeat)
+    print('fastproto: {}'.format('on' if graph_ttypes.fastproto else 'off'))
+    print(
+        'eager: {:>8.1f} ms  lazy: {:>8.1f} ms  ({:.1f}x)'.format(
+            full * 1000, partial * 1000, full / partial
+        )
+    )
+
+
+if __name__ == '__main__':
+    main()
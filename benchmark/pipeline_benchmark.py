@@ -0,0 +1,60 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2026 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License.
+
+"""
+Compare executing many small statements one by one and pipelined on one
+session, against a local graphd stand-in.
+
+    python3 -m benchmark.pipeline_benchmark --statements 5000
+"""
+
+import argparse
+import time
+
+from nebula3.Config import Config
+from nebula3.gclient.net import ConnectionPool
+from tests.graphd_stand_in import GraphdStandIn
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--statements', type=int, default=5000)
+    args = parser.parse_args()
+
+    server = GraphdStandIn()
+    pool = ConnectionPool()
+    pool.init([server.address], Config())
+    session = pool.get_session('root', 'nebula')
+    stmts = [
+        'FETCH PROP ON player "player{}" YIELD properties(vertex)'.format(i)
+        for i in range(args.statements)
+    ]
+
+    start = time.perf_counter()
+    for stmt in stmts:
+        session.execute(stmt)
+    serial = time.perf_counter() - start
+
+    start = time.perf_counter()
+    session.execute_pipeline(stmts)
+    pipelined = time.perf_counter() - start
+
+    session.release()
+    pool.close()
+    server.close()
+    print(
+        'one by one: {:>8.0f} statements/s  pipelined: {:>8.0f} statements/s'
+        '  ({:.1f}x)'.format(
+            args.statements / serial,
+            args.statements / pipelined,
+            serial / pipelined,
+        )
+    )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2026 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License.
+
+"""
+Measure the session checkout latency and the statement throughput of a
+ConnectionPool shared by many threads, against a local graphd stand-in.
+
+    python3 -m benchmark.pool_benchmark --threads 64 --latency 0.002
+    python3 -m benchmark.pool_benchmark --validation always idle never
+    python3 -m benchmark.pool_benchmark --max-size 16 --acquire-timeout 5000
+    python3 -m benchmark.pool_benchmark --connect-latency 0.05 --min-idle 64
+    python3 -m benchmark.pool_benchmark --slow-latency 0.02 \
+        --load-balancer round_robin least_in_flight ewma
+"""
+
+import argparse
+import itertools
+import threading
+import time
+
+from nebula3.Config import Config
+from nebula3.gclient.net import ConnectionPool
+from tests.graphd_stand_in import GraphdHandler, GraphdStandIn
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))]
+
+
+def run(pool, threads, requests, statements):
+    checkouts = []
+    latencies = []
+    failures = []
+    lock = threading.Lock()
+
+    def worker():
+        costs = []
+        executes = []
+        failed = 0
+        for _ in range(requests):
+            start = time.perf_counter()
+            try:
+                session = pool.get_session('root', 'nebula')
+            except Exception:
+                failed += 1
+                continue
+            costs.append(time.perf_counter() - start)
+            for _ in range(statements):
+                start = time.perf_counter()
+                session.execute('YIELD 1')
+                executes.append(time.perf_counter() - start)
+            session.release()
+        with lock:
+            checkouts.extend(costs)
+            latencies.extend(executes)
+            failures.append(failed)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return time.perf_counter() - start, checkouts, latencies, sum(failures)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--threads', type=int, default=64)
+    parser.add_argument('--requests', type=int, default=20)
+    parser.add_argument('--statements', type=int, default=1)
+    parser.add_argument('--max-size', type=int, default=64)
+    parser.add_argument(
+        '--latency', type=float, default=0.002, help='seconds per statement'
+    )
+    parser.add_argument(
+        '--slow-latency',
+        type=float,
+        default=None,
+        help='seconds per statement of a second, slower, graphd',
+    )
+    parser.add_argument(
+        '--connect-latency',
+        type=float,
+        default=0.0,
+        help='seconds to open a connection or a session',
+    )
+    parser.add_argument(
+        '--min-idle',
+        type=int,
+        default=0,
+        help='the idle connections kept open to each graphd',
+    )
+    parser.add_argument(
+        '--acquire-timeout',
+        type=int,
+        default=0,
+        help='ms to wait for a connection when the pool is full',
+    )
+    parser.add_argument(
+        '--validation',
+        nargs='+',
+        default=['always'],
+        help='the validation policies to compare',
+    )
+    parser.add_argument(
+        '--load-balancer',
+        nargs='+',
+        default=['round_robin'],
+        help='the load balancers to compare',
+    )
+    args = parser.parse_args()
+
+    for policy, balancer in itertools.product(args.validation, args.load_balancer):
+        latencies = [args.latency]
+        if args.slow_latency is not None:
+            latencies.append(args.slow_latency)
+        servers = [
+            GraphdStandIn(
+                GraphdHandler(latency, args.connect_latency, args.connect_latency)
+            )
+            for latency in latencies
+        ]
+        config = Config()
+        config.max_connection_pool_size = args.max_size
+        config.min_idle_size = args.min_idle
+        config.validation_policy = policy
+        config.acquire_timeout = args.acquire_timeout
+        config.load_balancer = balancer
+        pool = ConnectionPool()
+        pool.init([server.address for server in servers], config)
+        cost, checkouts, latencies, failures = run(
+            pool, args.threads, args.requests, args.statements
+        )
+        waits = pool.wait_stats()
+        pool.close()
+        for server in servers:
+            server.close()
+        statements = len(checkouts) * args.statements
+        print(
+            '{:<10} {:<15} threads: {}  statements/s: {:>8.0f}'
+            '  round trips: {:>6}  checkout p50: {:>7.2f} ms  p99: {:>7.2f} ms'
+            '  statement p99: {:>7.2f} ms  failed: {}'
+            '  waited: {}  max wait: {:.0f} ms'.format(
+                policy,
+                balancer,
+                args.threads,
+                statements / cost,
+                sum(server.handler.calls.get('execute', 0) for server in servers),
+                percentile(checkouts, 0.5) * 1000,
+                percentile(checkouts, 0.99) * 1000,
+                percentile(latencies, 0.99) * 1000,
+                failures,
+                waits['waits'],
+                waits['wait_time_max'],
+            )
+        )
+
+
+if __name__ == '__main__':
+    main()
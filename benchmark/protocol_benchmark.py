@@ -0,0 +1,136 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2026 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License.
+
+"""
+Compare the encoded size and decode time of header transport responses with
+the binary and compact protocols, on a few typical DataSet shapes.
+
+    python3 -m benchmark.protocol_benchmark --rows 50000
+"""
+
+import argparse
+import time
+
+from nebula3.common import ttypes
+from nebula3.common.ttypes import DataSet, Edge, Row, Tag, Value, Vertex
+from nebula3.fbthrift.protocol import THeaderProtocol
+from nebula3.fbthrift.transport import THeaderTransport, TTransport
+from nebula3.graph import ttypes as graph_ttypes
+from nebula3.graph.ttypes import ExecutionResponse
+
+
+def counts(i):
+    # GROUP BY ... YIELD count(*), small ints only
+    return [Value(iVal=i % 1000), Value(iVal=i % 7), Value(iVal=i * 3 % 100)]
+
+
+def properties(i):
+    return [
+        Value(sVal=b'player%d' % i),
+        Value(iVal=20 + i % 30),
+        Value(fVal=i / 7.0),
+        Value(bVal=i % 2 == 0),
+    ]
+
+
+def vertices(i):
+    props = {b'name': Value(sVal=b'player%d' % i), b'age': Value(iVal=20 + i % 30)}
+    tag = Tag(name=b'player', props=props)
+    return [Value(vVal=Vertex(vid=Value(iVal=i), tags=[tag]))]
+
+
+def edges(i):
+    edge = Edge(
+        src=Value(iVal=i),
+        dst=Value(iVal=i + 1),
+        type=1,
+        name=b'follow',
+        ranking=0,
+        props={b'degree': Value(iVal=i % 100)},
+    )
+    return [Value(eVal=edge)]
+
+
+SHAPES = [
+    ('counts', counts),
+    ('properties', properties),
+    ('vertices', vertices),
+    ('edges', edges),
+]
+
+
+def make_response(shape, rows):
+    data = DataSet(column_names=[b'c%d' % i for i in range(len(shape(0)))])
+    data.rows = [Row(values=shape(i)) for i in range(rows)]
+    return ExecutionResponse(error_code=0, latency_in_us=0, data=data)
+
+
+def encode(resp, name):
+    buf = TTransport.TMemoryBuffer()
+    trans = THeaderTransport.THeaderTransport(buf)
+    trans.set_protocol(name)
+    resp.write(THeaderProtocol.THeaderProtocol(trans))
+    trans.flush()
+    return buf.getvalue()
+
+
+def decode(frame):
+    trans = THeaderTransport.THeaderTransport(TTransport.TMemoryBuffer(frame))
+    prot = THeaderProtocol.THeaderProtocol(trans)
+    # what readMessageBegin does
+    trans.readFrame(0)
+    prot.reset_protocol()
+    resp = ExecutionResponse()
+    resp.read(prot)
+    return resp
+
+
+def bench(frame, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        decode(frame)
+        cost = time.perf_counter() - start
+        best = cost if best is None else min(best, cost)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--rows', type=int, default=50000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument(
+        '--python', action='store_true', help='decode without fastproto'
+    )
+    args = parser.parse_args()
+
+    if args.python:
+        ttypes.fastproto = None
+        graph_ttypes.fastproto = None
+    print('fastproto: {}'.format('on' if graph_ttypes.fastproto else 'off'))
+    for shape_name, shape in SHAPES:
+        resp = make_response(shape, args.rows)
+        result = {}
+        for name in ('binary', 'compact'):
+            frame = encode(resp, name)
+            result[name] = (len(frame), bench(frame, args.repeat))
+        binary, compact = result['binary'], result['compact']
+        print(
+            '{:<10} binary: {:>9} B {:>7.1f} ms  compact: {:>9} B {:>7.1f} ms'
+            '  size: {:.0%}'.format(
+                shape_name,
+                binary[0],
+                binary[1] * 1000,
+                compact[0],
+                compact[1] * 1000,
+                compact[0] / binary[0],
+            )
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2026 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License.
+
+"""
+Measure the session checkout and return of a SessionPool shared by many
+threads, the bookkeeping alone and with a statement, against a local graphd
+stand-in.
+
+    python3 -m benchmark.session_pool_benchmark --threads 64 --size 256
+"""
+
+import argparse
+import threading
+import time
+
+from nebula3.Config import SessionPoolConfig
+from nebula3.gclient.net.SessionPool import SessionPool
+from tests.graphd_stand_in import GraphdStandIn
+
+
+def run(threads, requests, work):
+    barrier = threading.Barrier(threads + 1)
+
+    def worker():
+        barrier.wait()
+        for _ in range(requests):
+            work()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    return threads * requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--threads', type=int, default=64)
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--size', type=int, default=256)
+    args = parser.parse_args()
+
+    server = GraphdStandIn()
+    server.handler.json_rows = 100
+    config = SessionPoolConfig()
+    config.min_size = args.size
+    config.max_size = args.size
+    pool = SessionPool('root', 'nebula', 'nba', [server.address])
+    pool.init(config)
+
+    def checkout():
+        pool._return_session(pool._get_idle_session())
+
+    def execute():
+        pool.execute('YIELD 1')
+
+    def execute_json():
+        pool.execute_json('YIELD 1')
+
+    print('{} threads, {} sessions'.format(args.threads, args.size))
+    print(
+        'checkout + return: {:>10.0f} /s'.format(
+            run(args.threads, args.requests, checkout)
+        )
+    )
+    print(
+        'execute:           {:>10.0f} /s'.format(
+            run(args.threads, args.requests // 10, execute)
+        )
+    )
+    print(
+        'execute_json:      {:>10.0f} /s'.format(
+            run(args.threads, args.requests // 10, execute_json)
+        )
+    )
+    pool.close()
+    server.close()
+
+
+if __name__ == '__main__':
+    main()
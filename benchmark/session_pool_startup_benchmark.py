@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2026 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License.
+
+"""
+Measure how long a SessionPool takes to create its sessions, at init for
+min_size and when it grows for callers arriving at the same time, against a
+local graphd stand-in where opening a session costs the given latency.
+
+    python3 -m benchmark.session_pool_startup_benchmark --size 50 --latency 0.005 --connect-latency 0.005
+"""
+
+import argparse
+import threading
+import time
+
+from nebula3.Config import SessionPoolConfig
+from nebula3.gclient.net.SessionPool import SessionPool
+from tests.graphd_stand_in import GraphdHandler, GraphdStandIn
+
+
+def init(server, args):
+    config = SessionPoolConfig()
+    config.min_size = args.size
+    config.max_size = args.size
+    config.create_workers = args.workers
+    pool = SessionPool('root', 'nebula', 'nba', [server.address])
+    start = time.perf_counter()
+    pool.init(config)
+    cost = time.perf_counter() - start
+    pool.close()
+    return cost
+
+
+def grow(server, args):
+    config = SessionPoolConfig()
+    config.min_size = 0
+    config.max_size = args.size
+    pool = SessionPool('root', 'nebula', 'nba', [server.address])
+    pool.init(config)
+    barrier = threading.Barrier(args.size + 1)
+
+    def worker():
+        barrier.wait()
+        pool.execute('YIELD 1')
+
+    workers = [threading.Thread(target=worker) for _ in range(args.size)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    cost = time.perf_counter() - start
+    pool.close()
+    return cost
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--size', type=int, default=50)
+    parser.add_argument('--workers', type=int, default=8)
+    parser.add_argument('--latency', type=float, default=0.005)
+    parser.add_argument('--connect-latency', type=float, default=0.005)
+    args = parser.parse_args()
+
+    server = GraphdStandIn(
+        GraphdHandler(args.latency, args.connect_latency, args.connect_latency)
+    )
+    print(
+        '{} sessions, {} workers, {} s a statement, {} s to connect'.format(
+            args.size, args.workers, args.latency, args.connect_latency
+        )
+    )
+    print('init: {:>8.3f} s'.format(init(server, args)))
+    print('grow: {:>8.3f} s'.format(grow(server, args)))
+    server.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2026 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License.
+
+"""
+Measure TSocket.write throughput over a local socket pair against the old
+send loop that re-sliced the remaining bytes after every partial send.
+
+    python3 -m benchmark.socket_write_benchmark --sizes 1 8 32
+"""
+
+import argparse
+import socket
+import threading
+import time
+
+from nebula3.fbthrift.transport import TSocket
+
+
+def sliced_write(handle, buff):
+    # the write loop TSocket used before
+    sent = 0
+    have = len(buff)
+    while sent < have:
+        plus = handle.send(buff)
+        sent += plus
+        buff = buff[plus:]
+
+
+def drain(sock, total):
+    buf = bytearray(1 << 20)
+    got = 0
+    while got < total:
+        sz = sock.recv_into(buf)
+        if not sz:
+            return
+        got += sz
+
+
+def bench(write, size, repeat, sndbuf):
+    payload = b'x' * size
+    best = None
+    for _ in range(repeat):
+        server, client = socket.socketpair()
+        # bound the bytes taken by one send() like a busy TCP connection,
+        # with a timeout as TSocket sets one, send() returns partial writes
+        client.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, sndbuf)
+        client.settimeout(60)
+        reader = threading.Thread(target=drain, args=(server, size))
+        reader.start()
+        start = time.perf_counter()
+        write(client, payload)
+        reader.join()
+        cost = time.perf_counter() - start
+        server.close()
+        client.close()
+        best = cost if best is None else min(best, cost)
+    return size / best / 2**20
+
+
+def tsocket_write(handle, buff):
+    sock = TSocket.TSocket()
+    sock.setHandle(handle)
+    sock.write(buff)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().split('\n')[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--sndbuf', type=int, default=65536)
+    args = parser.parse_args()
+
+    for mb in args.sizes:
+        size = mb * 2**20
+        old = bench(sliced_write, size, args.repeat, args.sndbuf)
+        new = bench(tsocket_write, size, args.repeat, args.sndbuf)
+        print(
+            '{:>4} MB  sliced: {:>8.0f} MB/s  memoryview: {:>8.0f} MB/s'.format(
+                mb, old, new
+            )
+        )
+
+
+if __name__ == '__main__':
+    main()
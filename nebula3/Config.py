@@ -14,6 +14,10 @@ class Config(object):
     min_connection_pool_size = 0
     # the max connection in pool
     max_connection_pool_size = 10
+    # the idle connections kept open to each ok graphd, they are opened by
+    # init, after a connection is handed out and by the periodic check of
+    # interval_check, and are not closed for idle_time. 0 means none
+    min_idle_size = 0
     # connection or execute timeout, unit ms, 0 means no timeout
     timeout = 0
     # 0 means will never close the idle connection, unit ms,
@@ -24,6 +28,50 @@ class Config(object):
     use_http2 = False
     # headers for http2, dict type
     http_headers = None
+    # the number of http2 connections to each graphd shared by all the
+    # connections of the pool, their requests are multiplexed as streams.
+    # 0 means every connection owns its http2 connection
+    http2_channels = 0
+    # compress the requests with 'zlib', 'snappy' or 'zstd', graphd replies
+    # with the same transform. None means no compression, not used by http2
+    compression = None
+    # the requests smaller than it in bytes are sent uncompressed, and so
+    # are their responses
+    compression_min_size = 0
+    # encode the requests with the 'binary' or 'compact' thrift protocol,
+    # graphd replies with the same one. None means compact, http2 is always
+    # binary
+    protocol = None
+    # keep the rows of the results serialized and only decode the rows or
+    # columns used, see nebula3.data.LazyDataSet. http2 decodes all the rows
+    lazy_decode = False
+    # when get_connection pings an idle connection before handing it out:
+    # 'always', 'idle' when it is unused longer than validation_idle_time,
+    # 'background' only by the periodic check of interval_check, or 'never'.
+    # a broken connection handed out without a ping is reconnected by the
+    # session when retry_connect is on
+    validation_policy = 'always'
+    # the unused time of the 'idle' validation policy, unit ms
+    validation_idle_time = 1000
+    # the time to wait for a connection given back when the pool is full,
+    # unit ms, 0 means no waiting
+    acquire_timeout = 0
+    # the max number of the callers waiting for a connection, the others
+    # fail right away, 0 means no limit
+    max_waiters = 0
+    # how to pick the graphd of a new connection: 'round_robin',
+    # 'least_in_flight' requests, 'ewma' the cheaper of two random graphd by
+    # their latency, or a nebula3.gclient.net.LoadBalancer.LoadBalancer
+    load_balancer = 'round_robin'
+    # the failed health checks in a row to mark a graphd bad, all the graphd
+    # are checked at the same time by update_servers_status
+    breaker_failure_threshold = 1
+    # the time a bad graphd is skipped by the health checks before it is
+    # checked again, unit ms
+    breaker_reset_timeout = 10000
+    # the max number of the connections opened at the same time to fill the
+    # pool up to min_connection_pool_size or min_idle_size
+    open_workers = 8
 
 
 class SSL_config(object):
@@ -78,10 +126,23 @@ class SSL_config(object):
 class SessionPoolConfig(object):
     """The configs for the session pool
     @ timeout(int): the timeout of the session
-    @ idle_time(int): the idle time of the session
+    @ idle_time(int): the idle time of the session, unit ms
     @ max_size(int): the max size of the session
     @ min_size(int): the min size of the session
     @ interval_check(int): the interval to check the idle time of the session
+    @ http2_channels(int): the number of shared http2 connections to each graphd
+    @ compression(str): the compression of the requests and responses
+    @ compression_min_size(int): the min size of the requests to compress
+    @ protocol(str): the thrift protocol of the requests and responses
+    @ lazy_decode(bool): decode the rows of the results when they are used
+    @ acquire_timeout(int): the time to wait for a session when the pool is full
+    @ max_waiters(int): the max number of the callers waiting for a session
+    @ load_balancer(str): how to pick the graphd of a session
+    @ breaker_failure_threshold(int): the failed health checks to mark a graphd bad
+    @ breaker_reset_timeout(int): the time a bad graphd is not checked
+    @ keep_alive_interval(int): the longest time an idle session is not used on graphd
+    @ keep_alive_workers(int): the max number of the sessions pinged at the same time
+    @ create_workers(int): the max number of the sessions init creates at the same time
     """
 
     timeout = 0
@@ -93,3 +154,48 @@ class SessionPoolConfig(object):
     use_http2 = False
     # headers for http2, dict type
     http_headers = None
+    # the number of http2 connections to each graphd shared by all the
+    # connections of the pool, their requests are multiplexed as streams.
+    # 0 means every connection owns its http2 connection
+    http2_channels = 0
+    # compress the requests with 'zlib', 'snappy' or 'zstd', graphd replies
+    # with the same transform. None means no compression, not used by http2
+    compression = None
+    # the requests smaller than it in bytes are sent uncompressed, and so
+    # are their responses
+    compression_min_size = 0
+    # encode the requests with the 'binary' or 'compact' thrift protocol,
+    # graphd replies with the same one. None means compact, http2 is always
+    # binary
+    protocol = None
+    # keep the rows of the results serialized and only decode the rows or
+    # columns used, see nebula3.data.LazyDataSet. http2 decodes all the rows
+    lazy_decode = False
+    # the time to wait for a session given back when the pool is full,
+    # unit ms, 0 means no waiting
+    acquire_timeout = 0
+    # the max number of the callers waiting for a session, the others fail
+    # right away, 0 means no limit
+    max_waiters = 0
+    # how to pick the graphd of a new session and of an idle session:
+    # 'round_robin', 'least_in_flight' requests, 'ewma' the cheaper of two
+    # random graphd by their latency, or a
+    # nebula3.gclient.net.LoadBalancer.LoadBalancer
+    load_balancer = 'round_robin'
+    # the failed health checks in a row to mark a graphd bad, all the graphd
+    # are checked at the same time by update_servers_status
+    breaker_failure_threshold = 1
+    # the time a bad graphd is skipped by the health checks before it is
+    # checked again, unit ms
+    breaker_reset_timeout = 10000
+    # ping the idle sessions in the background, so graphd never sees a
+    # session idle for longer than it, set it below the
+    # session_idle_timeout_secs of graphd. The dead sessions are replaced in
+    # the background too. Unit ms, 0 means no keep-alive
+    keep_alive_interval = 0
+    # the max number of the sessions pinged or replaced at the same time
+    keep_alive_workers = 8
+    # the max number of the sessions of min_size created at the same time by
+    # init, a session created when the pool grows is created by its caller
+    # out of the lock
+    create_workers = 8
@@ -0,0 +1,258 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2026 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License.
+
+
+"""
+The columnar form of a result: each column is converted once into a typed
+array, strings are dictionary encoded and NULLs are kept in a validity
+bitmap, the layout of Apache Arrow.
+"""
+
+from array import array
+
+from nebula3.common.ttypes import Value
+
+NULL_TYPES = (Value.__EMPTY__, Value.NVAL)
+
+
+class Column(object):
+    # the types of column
+    NULL = 'null'
+    INT64 = 'int64'
+    DOUBLE = 'double'
+    BOOL = 'bool'
+    STRING = 'string'
+    OBJECT = 'object'
+
+    _TYPECODES = {
+        Value.IVAL: (INT64, 'q'),
+        Value.FVAL: (DOUBLE, 'd'),
+        Value.BVAL: (BOOL, 'b'),
+    }
+
+    def __init__(
+        self,
+        name,
+        type,
+        length,
+        values,
+        validity=None,
+        null_count=0,
+        dictionary=None,
+        decode_type='utf-8',
+        timezone_offset: int = 0,
+    ):
+        """Constructor method, see Column.from_values
+
+        :param name: the column name
+        :param type: one of the column types
+        :param length: the number of values
+        :param values: array of the values for INT64, DOUBLE and BOOL,
+        array of the dictionary indexes for STRING,
+        list of the Values for OBJECT, None for NULL
+        :param validity: bitmap of the not NULL values, None means no NULL
+        :param null_count: the number of NULL values
+        :param dictionary: the strings of STRING
+        :param decode_type: the decode_type of the OBJECT values
+        :param timezone_offset: the timezone offset of the OBJECT values
+        """
+        self.name = name
+        self.type = type
+        self._length = length
+        self.values = values
+        self.validity = validity
+        self.null_count = null_count
+        self.dictionary = dictionary
+        self._decode_type = decode_type
+        self._timezone_offset = timezone_offset
+
+    @classmethod
+    def from_values(cls, name, values, decode_type='utf-8', timezone_offset: int = 0):
+        """convert the Values of a column
+
+        :param name: the column name
+        :param values: list<Value>
+        :param decode_type: the decode_type for decode binary value
+        :param timezone_offset: the timezone offset for calculate local time
+        :return: Column
+        """
+        length = len(values)
+        types = {value.field for value in values}
+        nulls = [t for t in types if t in NULL_TYPES]
+        types.difference_update(NULL_TYPES)
+        validity = None
+        null_count = 0
+        if nulls:
+            if not types:
+                return cls(name, cls.NULL, length, None, null_count=length)
+            validity = bytearray(b'\xff' * ((length + 7) // 8))
+            for index, value in enumerate(values):
+                if value.field in NULL_TYPES:
+                    validity[index >> 3] &= ~(1 << (index & 7))
+                    null_count += 1
+
+        (value_type,) = types if len(types) == 1 else (None,)
+        if value_type in cls._TYPECODES:
+            type, typecode = cls._TYPECODES[value_type]
+            data = array(
+                typecode,
+                [value.value if value.field == value_type else 0 for value in values],
+            )
+            return cls(name, type, length, data, validity, null_count)
+        if value_type == Value.SVAL:
+            indexes = {}
+            codes = array(
+                'i',
+                [
+                    (
+                        indexes.setdefault(value.value, len(indexes))
+                        if value.field == Value.SVAL
+                        else 0
+                    )
+                    for value in values
+                ],
+            )
+            dictionary = [raw.decode(decode_type) for raw in indexes]
+            return cls(
+                name, cls.STRING, length, codes, validity, null_count, dictionary
+            )
+        return cls(
+            name,
+            cls.OBJECT,
+            length,
+            list(values),
+            validity,
+            null_count,
+            decode_type=decode_type,
+            timezone_offset=timezone_offset,
+        )
+
+    def __len__(self):
+        return self._length
+
+    def is_null(self, index):
+        """check if the value at index is NULL
+
+        :param index: the value index
+        :return: true or false
+        """
+        if self.type == Column.NULL:
+            return True
+        if self.validity is None:
+            return False
+        return not self.validity[index >> 3] & (1 << (index & 7))
+
+    def _null_indexes(self):
+        if self.validity is None:
+            return []
+        return [index for index in range(self._length) if self.is_null(index)]
+
+    def to_pylist(self):
+        """convert to a list of primitive values like ValueWrapper.cast_primitive,
+        None for NULL
+
+        :return: list
+        """
+        if self.type == Column.NULL:
+            return [None] * self._length
+        if self.type == Column.OBJECT:
+            # import here to avoid the circular import
+            from nebula3.data.DataObject import ValueWrapper
+
+            return [
+                ValueWrapper(
+                    value, self._decode_type, self._timezone_offset
+                ).cast_primitive()
+                for value in self.values
+            ]
+        if self.type == Column.STRING:
+            dictionary = self.dictionary
+            result = [dictionary[code] for code in self.values]
+        elif self.type == Column.BOOL:
+            result = [code == 1 for code in self.values]
+        else:
+            result = self.values.tolist()
+        for index in self._null_indexes():
+            result[index] = None
+        return result
+
+    def to_numpy(self):
+        """convert to a numpy array, sharing the memory of INT64, DOUBLE and
+        BOOL columns, NULL values are masked
+
+        :return: numpy.ndarray or numpy.ma.MaskedArray
+        """
+        try:
+            import numpy as np
+        except ImportError:
+            raise ImportError("numpy is not installed")
+
+        if self.type == Column.INT64:
+            data = np.frombuffer(self.values, dtype=np.int64)
+        elif self.type == Column.DOUBLE:
+            data = np.frombuffer(self.values, dtype=np.float64)
+        elif self.type == Column.BOOL:
+            data = np.frombuffer(self.values, dtype=np.int8).view(np.bool_)
+        else:
+            data = np.empty(self._length, dtype=object)
+            data[:] = self.to_pylist()
+            return data
+        if self.validity is None:
+            return data
+        mask = np.zeros(self._length, dtype=np.bool_)
+        mask[self._null_indexes()] = True
+        return np.ma.masked_array(data, mask=mask)
+
+    def to_arrow(self):
+        """convert to a pyarrow array, sharing the memory of INT64, DOUBLE
+        and the dictionary indexes of STRING columns, the OBJECT values of
+        different types are converted to strings
+
+        :return: pyarrow.Array
+        """
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("pyarrow is not installed")
+
+        validity = None if self.validity is None else pa.py_buffer(self.validity)
+        if self.type == Column.NULL:
+            return pa.nulls(self._length)
+        if self.type in (Column.INT64, Column.DOUBLE):
+            arrow_type = pa.int64() if self.type == Column.INT64 else pa.float64()
+            return pa.Array.from_buffers(
+                arrow_type,
+                self._length,
+                [validity, pa.py_buffer(self.values)],
+                self.null_count,
+            )
+        if self.type == Column.STRING:
+            indices = pa.Array.from_buffers(
+                pa.int32(),
+                self._length,
+                [validity, pa.py_buffer(self.values)],
+                self.null_count,
+            )
+            return pa.DictionaryArray.from_arrays(
+                indices, pa.array(self.dictionary, type=pa.string())
+            )
+        if self.type == Column.BOOL:
+            return pa.array(self.to_pylist(), type=pa.bool_())
+        values = self.to_pylist()
+        try:
+            return pa.array(values)
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            # values of different types, like int and string, have no arrow type
+            return pa.array(
+                [None if value is None else str(value) for value in values],
+                type=pa.string(),
+            )
+
+    def __repr__(self):
+        return 'Column(name={}, type={}, length={}, null_count={})'.format(
+            self.name, self.type, self._length, self.null_count
+        )
@@ -23,6 +23,8 @@ from nebula3.common.ttypes import (
     DateTime,
     Time,
 )
+from nebula3.data.Column import Column
+from nebula3.data.LazyDataSet import LazyDataSet
 
 __AS_MAP__ = {
     Value.NVAL: "as_null",
@@ -197,17 +199,36 @@ class DataSetWrapper(object):
         self._decode_type = decode_type
         self._timezone_offset = timezone_offset
         self._data_set = data_set
+        # a LazyDataSet decodes the rows or columns used only
+        self._lazy = isinstance(data_set, LazyDataSet)
+        self._columns = None
         self._column_names = []
         self._key_indexes = {}
         self._pos = -1
+        self._rows_iter = None
         for index, name in enumerate(self._data_set.column_names):
             d_name = name.decode(self._decode_type)
             self._column_names.append(d_name)
             self._key_indexes[d_name] = index
 
     def get_row_size(self):
+        if self._lazy:
+            return self._data_set.row_size()
         return len(self._data_set.rows)
 
+    def _row(self, row_index):
+        if self._lazy:
+            return self._data_set.row(row_index)
+        return self._data_set.rows[row_index]
+
+    def _iter_rows(self):
+        """iterate the rows in order, a LazyDataSet decodes them from one
+        position instead of looking up each row
+        """
+        if self._lazy:
+            return self._data_set.iter_rows()
+        return iter(self._data_set.rows)
+
     def get_col_names(self):
         return self._column_names
 
@@ -238,9 +259,9 @@ class DataSetWrapper(object):
           ttypes.Value.GGVAL = 16
           ttypes.Value.DUVAL = 17
         """
-        if len(self._data_set.rows) == 0:
+        if self.get_row_size() == 0:
             return []
-        return [(value.getType()) for value in self._data_set.rows[0].values]
+        return [(value.getType()) for value in self._row(0).values]
 
     def row_values(self, row_index):
         """get row values
@@ -248,7 +269,7 @@ class DataSetWrapper(object):
         :param row_index: the Record index
         :return: list<ValueWrapper>
         """
-        if row_index >= len(self._data_set.rows):
+        if row_index >= self.get_row_size():
             raise OutOfRangeException()
         return [
             ValueWrapper(
@@ -256,7 +277,7 @@ class DataSetWrapper(object):
                 decode_type=self._decode_type,
                 timezone_offset=self._timezone_offset,
             )
-            for value in self._data_set.rows[row_index].values
+            for value in self._row(row_index).values
         ]
 
     def column_values(self, key):
@@ -270,15 +291,73 @@ class DataSetWrapper(object):
 
         return [
             ValueWrapper(
-                value=row.values[self._key_indexes[key]],
+                value=value,
                 decode_type=self._decode_type,
                 timezone_offset=self._timezone_offset,
             )
-            for row in self._data_set.rows
+            for value in self._column(self._key_indexes[key])
         ]
 
+    def _column(self, col_index):
+        if self._lazy:
+            return self._data_set.column(col_index)
+        return [row.values[col_index] for row in self._data_set.rows]
+
+    def get_columns(self):
+        """get the columns converted to typed arrays, converted once
+
+        :return: dict<str, Column>
+        """
+        if self._columns is None:
+            self._columns = {
+                name: Column.from_values(
+                    name,
+                    self._column(index),
+                    decode_type=self._decode_type,
+                    timezone_offset=self._timezone_offset,
+                )
+                for name, index in self._key_indexes.items()
+            }
+        return self._columns
+
+    def _primitive_caster(self, field):
+        decode_type = self._decode_type
+        timezone_offset = self._timezone_offset
+
+        def cast(value):
+            return ValueWrapper(value, decode_type, timezone_offset).cast_primitive()
+
+        if field in (Value.BVAL, Value.IVAL, Value.FVAL):
+            return lambda value: value.value if value.field == field else cast(value)
+        if field == Value.SVAL:
+            return lambda value: (
+                value.value.decode(decode_type)
+                if value.field == Value.SVAL
+                else cast(value)
+            )
+        if field in (Value.__EMPTY__, Value.NVAL):
+            return lambda value: (
+                None if value.field in (Value.__EMPTY__, Value.NVAL) else cast(value)
+            )
+        return cast
+
+    def iter_tuples(self):
+        """iterate the rows as tuples of primitive values like
+        ValueWrapper.cast_primitive, without a Record and ValueWrappers per row,
+        the cast of each column is chosen once from the first row
+
+        :return: iter<tuple>
+        """
+        casters = None
+        for row in self._iter_rows():
+            values = row.values
+            if casters is None:
+                casters = [self._primitive_caster(value.field) for value in values]
+            yield tuple([cast(value) for cast, value in zip(casters, values)])
+
     def __iter__(self):
         self._pos = -1
+        self._rows_iter = self._iter_rows()
         return self
 
     def __next__(self):
@@ -286,11 +365,12 @@ class DataSetWrapper(object):
 
         :return: record
         """
-        if len(self._data_set.rows) == 0 or self._pos >= len(self._data_set.rows) - 1:
-            raise StopIteration
+        if self._rows_iter is None:
+            self._rows_iter = self._iter_rows()
+        row = next(self._rows_iter)
         self._pos = self._pos + 1
         return Record(
-            values=self._data_set.rows[self._pos].values,
+            values=row.values,
             names=self._column_names,
             decode_type=self._decode_type,
             timezone_offset=self._timezone_offset,
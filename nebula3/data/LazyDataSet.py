@@ -0,0 +1,290 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2026 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License.
+
+
+"""
+Read an ExecutionResponse without decoding the rows of its DataSet,
+the rows stay serialized and only the rows or columns used are decoded.
+"""
+
+from threading import Lock
+
+from nebula3.common import ttypes
+from nebula3.common.ttypes import DataSet, Row, Value
+from nebula3.fbthrift.Thrift import TApplicationException, TMessageType, TType
+from nebula3.fbthrift.protocol.TBinaryProtocol import TBinaryProtocolAccelerated
+from nebula3.fbthrift.protocol.TCompactProtocol import TCompactProtocolAccelerated
+from nebula3.fbthrift.protocol.THeaderProtocol import THeaderProtocol
+from nebula3.fbthrift.transport.TTransport import TMemoryBuffer
+from nebula3.graph.ttypes import ExecutionResponse
+
+VALUE_ARGS = [Value, Value.thrift_spec, True]
+
+# the rows decoded at a time by LazyDataSet.iter_rows
+ITER_BATCH_SIZE = 256
+
+
+class LazyDataSet(DataSet):
+    """A DataSet that keeps its rows serialized, each row is decoded
+    when it is used, each column can be decoded on its own.
+    Reading `rows` decodes all of them like a DataSet.
+    """
+
+    def __init__(self, column_names, raw, offsets, base, protoid):
+        """
+        :param column_names: the column names
+        :param raw: the serialized rows
+        :param offsets: where each row starts, followed by where the last ends
+        :param base: the offset of raw in the buffer it was read from
+        :param protoid: the protocol id the rows are serialized with
+        """
+        self.column_names = column_names
+        self._raw = raw
+        self._offsets = offsets
+        self._base = base
+        self._protoid = protoid
+        self._rows = None
+        # one buffer over raw for all the reads, a new one for each read
+        # would copy raw every time, the lock guards its position
+        self._prot = None
+        self._lock = Lock()
+
+    def _protocol(self, pos=0):
+        """get the protocol over raw at pos, with the lock held
+
+        :param pos: the offset in raw
+        :return: TProtocol
+        """
+        if self._prot is None:
+            trans = TMemoryBuffer(self._raw)
+            if self._protoid == THeaderProtocol.T_COMPACT_PROTOCOL:
+                self._prot = TCompactProtocolAccelerated(trans)
+            else:
+                self._prot = TBinaryProtocolAccelerated(trans)
+        self._prot.trans.cstringio_buf.seek(pos)
+        return self._prot
+
+    def _decode_rows(self, start, stop):
+        """decode the rows in [start, stop) in order, with the lock held
+
+        :return: list<Row>
+        """
+        if self._rows is not None:
+            # decoded by another thread meanwhile
+            return self._rows[start:stop]
+        prot = self._protocol(self._offsets[start] - self._base)
+        rows = []
+        for _ in range(start, stop):
+            row = Row()
+            row.read(prot)
+            rows.append(row)
+        return rows
+
+    def _read_rows(self, start, stop):
+        """decode the rows in [start, stop) in order
+
+        :return: list<Row>
+        """
+        with self._lock:
+            return self._decode_rows(start, stop)
+
+    @property
+    def rows(self):
+        if self._rows is None:
+            with self._lock:
+                if self._rows is None:
+                    self._rows = self._decode_rows(0, self.row_size())
+                    self._raw = None
+                    self._prot = None
+        return self._rows
+
+    @rows.setter
+    def rows(self, rows):
+        with self._lock:
+            self._rows = rows
+            self._raw = None
+            self._prot = None
+
+    def is_decoded(self):
+        """all the rows have been decoded
+
+        :return: bool
+        """
+        return self._rows is not None
+
+    def row_size(self):
+        """get the row size without decoding the rows
+
+        :return: int
+        """
+        if self._rows is not None:
+            return len(self._rows)
+        return len(self._offsets) - 1
+
+    def row(self, index):
+        """decode the row at index only
+
+        :param index: the row index
+        :return: Row
+        """
+        rows = self._rows
+        if rows is not None:
+            return rows[index]
+        if index < 0:
+            index += self.row_size()
+        if not 0 <= index < self.row_size():
+            raise IndexError('row index out of range')
+        return self._read_rows(index, index + 1)[0]
+
+    def iter_rows(self):
+        """decode the rows in order, a batch at a time, without keeping them
+
+        :return: iter<Row>
+        """
+        if self._rows is not None:
+            yield from self._rows
+            return
+        size = self.row_size()
+        for start in range(0, size, ITER_BATCH_SIZE):
+            if self._rows is not None:
+                yield from self._rows[start:]
+                return
+            yield from self._read_rows(start, min(start + ITER_BATCH_SIZE, size))
+
+    def column(self, index):
+        """decode the values of the column at index only
+
+        :param index: the column index
+        :return: list<Value>
+        """
+        if self._rows is None and ttypes.fastproto is not None:
+            with self._lock:
+                if self._rows is None:
+                    # the values of Row, field 1
+                    return ttypes.fastproto.decode_column(
+                        self._protocol().trans,
+                        self.row_size(),
+                        1,
+                        index,
+                        TType.STRUCT,
+                        VALUE_ARGS,
+                        utf8strings=ttypes.UTF8STRINGS,
+                        protoid=self._protoid,
+                    )
+        return [row.values[index] for row in self.rows]
+
+    def __eq__(self, other):
+        if not isinstance(other, DataSet):
+            return False
+        return self.column_names == other.column_names and self.rows == other.rows
+
+    def __ne__(self, other):
+        return not (self == other)
+
+    def __repr__(self):
+        return 'LazyDataSet(column_names={}, rows={})'.format(
+            self.column_names,
+            self.rows if self._rows is not None else self.row_size(),
+        )
+
+
+def _read_data_set(iprot):
+    column_names = []
+    raw = b''
+    offsets = [0]
+    iprot.readStructBegin()
+    while True:
+        _, ftype, fid = iprot.readFieldBegin()
+        if ftype == TType.STOP:
+            break
+        if fid == 1 and ftype == TType.LIST:
+            _, size = iprot.readListBegin()
+            column_names = [iprot.readString() for _ in range(size)]
+            iprot.readListEnd()
+        elif fid == 2 and ftype == TType.LIST:
+            etype, size = iprot.readListBegin()
+            offsets = ttypes.fastproto.offsets(
+                iprot.trans, etype, size, protoid=iprot.get_protocol_id()
+            )
+            with iprot.trans.cstringio_buf.getbuffer() as view:
+                raw = bytes(view[offsets[0] : offsets[-1]])
+            iprot.readListEnd()
+        else:
+            iprot.skip(ftype)
+        iprot.readFieldEnd()
+    iprot.readStructEnd()
+    return LazyDataSet(column_names, raw, offsets, offsets[0], iprot.get_protocol_id())
+
+
+def _read_execution_response(iprot):
+    resp = ExecutionResponse()
+    spec = ExecutionResponse.thrift_spec
+    iprot.readStructBegin()
+    while True:
+        _, ftype, fid = iprot.readFieldBegin()
+        if ftype == TType.STOP:
+            break
+        field = spec[fid] if 0 <= fid < len(spec) else None
+        if field is None or field[1] != ftype:
+            iprot.skip(ftype)
+        elif field[2] == 'data':
+            resp.data = _read_data_set(iprot)
+        elif ftype == TType.STRUCT:
+            value = field[3][0]()
+            value.read(iprot)
+            setattr(resp, field[2], value)
+        elif ftype == TType.I32:
+            setattr(resp, field[2], iprot.readI32())
+        elif ftype == TType.I64:
+            setattr(resp, field[2], iprot.readI64())
+        elif ftype == TType.STRING:
+            setattr(resp, field[2], iprot.readString())
+        else:
+            iprot.skip(ftype)
+        iprot.readFieldEnd()
+    iprot.readStructEnd()
+    return resp
+
+
+def recv_execute_with_parameter(client):
+    """receive the response of GraphService.Client.send_executeWithParameter,
+    the DataSet of the response is a LazyDataSet over the header transport.
+    Without fastproto the rows are decoded right away, skipping them in
+    Python costs more than decoding them.
+
+    :param client: the GraphService.Client the request was sent with
+    :return: ExecutionResponse
+    """
+    iprot = client._iprot
+    if not isinstance(iprot, THeaderProtocol) or ttypes.fastproto is None:
+        return client.recv_executeWithParameter()
+    _, mtype, _ = iprot.readMessageBegin()
+    if mtype == TMessageType.EXCEPTION:
+        x = TApplicationException()
+        x.read(iprot)
+        iprot.readMessageEnd()
+        raise x
+    success = None
+    # executeWithParameter_result
+    iprot.readStructBegin()
+    while True:
+        _, ftype, fid = iprot.readFieldBegin()
+        if ftype == TType.STOP:
+            break
+        if fid == 0 and ftype == TType.STRUCT:
+            success = _read_execution_response(iprot)
+        else:
+            iprot.skip(ftype)
+        iprot.readFieldEnd()
+    iprot.readStructEnd()
+    iprot.readMessageEnd()
+    if success is not None:
+        return success
+    raise TApplicationException(
+        TApplicationException.MISSING_RESULT,
+        "executeWithParameter failed: unknown result",
+    )
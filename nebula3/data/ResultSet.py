@@ -8,6 +8,7 @@
 
 from nebula3.common.ttypes import ErrorCode
 
+from nebula3.data.Column import Column
 from nebula3.data.DataObject import DataSetWrapper, Node, Relationship, PathWrapper
 
 
@@ -125,7 +126,7 @@ class ResultSet(object):
         """
         if self._data_set_wrapper is None:
             return 0
-        return len(self._data_set_wrapper.get_rows())
+        return self._data_set_wrapper.get_row_size()
 
     def col_size(self):
         """get column size
@@ -183,6 +184,34 @@ class ResultSet(object):
             return []
         return self._data_set_wrapper.column_values(key)
 
+    def columns(self):
+        """get all columns converted to typed arrays, int, double and bool
+        values in arrays, strings dictionary encoded, NULL values in a
+        validity bitmap, see Column
+
+        :return: dict<str, Column>
+        """
+        if self._data_set_wrapper is None:
+            return {}
+        return self._data_set_wrapper.get_columns()
+
+    def to_arrow(self):
+        """Convert result set to a pyarrow Table, int and double columns and
+        the indexes of the string columns share the memory of the columns
+
+        :return: pyarrow.Table
+        """
+        try:
+            import pyarrow as pa
+        except ImportError:
+            raise ImportError("pyarrow is not installed")
+
+        columns = self.columns()
+        return pa.table(
+            [column.to_arrow() for column in columns.values()],
+            names=list(columns.keys()),
+        )
+
     def rows(self):
         """get all rows
 
@@ -197,13 +226,25 @@ class ResultSet(object):
 
         :return: list<dict>
         """
-        return [
-            {
-                col_key: self.row_values(row_index)[col_index].cast_primitive()
-                for col_index, col_key in enumerate(self.keys())
-            }
-            for row_index in range(self.row_size())
-        ]
+        return list(self.iter_primitive())
+
+    def iter_tuples(self):
+        """iterate the rows as tuples of primitive values, the fast way to
+        read many rows
+
+        :return: iter<tuple>
+        """
+        if self._data_set_wrapper is None:
+            return iter(())
+        return self._data_set_wrapper.iter_tuples()
+
+    def iter_primitive(self):
+        """iterate the rows as dicts of primitive values, like as_primitive
+
+        :return: iter<dict>
+        """
+        keys = self.keys()
+        return (dict(zip(keys, values)) for values in self.iter_tuples())
 
     def dict_for_vis(self):
         """Convert result set to a dictionary format suitable for visualization.
@@ -381,10 +422,17 @@ class ResultSet(object):
             return pd.DataFrame()
 
         data = dict()
-        for col in self.keys():
-            if primitive:
-                data[col] = [x.cast_primitive() for x in self.column_values(col)]
+        for col, column in self.columns().items():
+            if column.type in (Column.INT64, Column.DOUBLE, Column.BOOL) and (
+                column.null_count == 0
+            ):
+                data[col] = column.to_numpy()
+            elif primitive:
+                data[col] = column.to_pylist()
+            elif column.type == Column.STRING and column.null_count == 0:
+                data[col] = column.to_pylist()
             else:
+                # cast gives a Null for NULL values
                 data[col] = [x.cast() for x in self.column_values(col)]
 
         return pd.DataFrame(data)
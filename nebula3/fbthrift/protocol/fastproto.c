@@ -0,0 +1,1794 @@
+/*
+ * Copyright (c) 2026 vesoft inc. All rights reserved.
+ *
+ * This source code is licensed under Apache 2.0 License.
+ *
+ * Native implementation of the `fastproto` hook used by the generated
+ * ttypes/Service modules.  Structs are decoded and encoded by walking their
+ * `thrift_spec` tables, for both the binary (protoid=0) and the compact
+ * (protoid=2) protocols.  The module is optional: when it is not built the
+ * generated code falls back to the pure Python protocol implementation.
+ *
+ * Decoding reads straight out of the `cstringio_buf` of a CReadableTransport
+ * and calls `cstringio_refill` when the buffer runs dry, the same contract
+ * as the upstream fbthrift extension.
+ */
+
+#define PY_SSIZE_T_CLEAN
+#include <Python.h>
+
+#include <stdint.h>
+#include <string.h>
+
+#define PROTO_BINARY 0
+#define PROTO_COMPACT 2
+
+/* TType, see nebula3/fbthrift/Thrift.py */
+enum {
+  T_STOP = 0,
+  T_VOID = 1,
+  T_BOOL = 2,
+  T_BYTE = 3,
+  T_DOUBLE = 4,
+  T_I16 = 6,
+  T_I32 = 8,
+  T_I64 = 10,
+  T_STRING = 11,
+  T_STRUCT = 12,
+  T_MAP = 13,
+  T_SET = 14,
+  T_LIST = 15,
+  T_UTF8 = 16,
+  T_UTF16 = 17,
+  T_FLOAT = 19,
+};
+
+/* CompactType, see nebula3/fbthrift/protocol/TCompactProtocol.py */
+enum {
+  CT_STOP = 0x00,
+  CT_TRUE = 0x01,
+  CT_FALSE = 0x02,
+  CT_BYTE = 0x03,
+  CT_I16 = 0x04,
+  CT_I32 = 0x05,
+  CT_I64 = 0x06,
+  CT_DOUBLE = 0x07,
+  CT_BINARY = 0x08,
+  CT_LIST = 0x09,
+  CT_SET = 0x0A,
+  CT_MAP = 0x0B,
+  CT_STRUCT = 0x0C,
+  CT_FLOAT = 0x0D,
+};
+
+static PyObject *str_cstringio_buf;
+static PyObject *str_cstringio_refill;
+static PyObject *str_getbuffer;
+static PyObject *str_tell;
+static PyObject *str_seek;
+static PyObject *str_read;
+static PyObject *str_field;
+static PyObject *str_value;
+static PyObject *empty_tuple;
+static PyObject *int_zero;
+
+/* ------------------------------------------------------------------------ */
+/* helpers                                                                  */
+/* ------------------------------------------------------------------------ */
+
+/* Surface malformed data as TProtocolException like the Python protocols. */
+static void raise_protocol_error(const char *msg) {
+  PyObject *mod, *exc, *inst;
+
+  mod = PyImport_ImportModule("nebula3.fbthrift.protocol.TProtocol");
+  if (mod != NULL) {
+    exc = PyObject_GetAttrString(mod, "TProtocolException");
+    Py_DECREF(mod);
+    if (exc != NULL) {
+      /* TProtocolException.INVALID_DATA == 1 */
+      inst = PyObject_CallFunction(exc, "is", 1, msg);
+      if (inst != NULL) {
+        PyErr_SetObject(exc, inst);
+        Py_DECREF(inst);
+      }
+      Py_DECREF(exc);
+      return;
+    }
+  }
+  PyErr_Clear();
+  PyErr_SetString(PyExc_ValueError, msg);
+}
+
+/* Borrowed item of a list or tuple. */
+static PyObject *seq_item(PyObject *seq, Py_ssize_t i) {
+  if (PyTuple_Check(seq) && i < PyTuple_GET_SIZE(seq)) {
+    return PyTuple_GET_ITEM(seq, i);
+  }
+  if (PyList_Check(seq) && i < PyList_GET_SIZE(seq)) {
+    return PyList_GET_ITEM(seq, i);
+  }
+  PyErr_SetString(PyExc_TypeError, "malformed thrift_spec");
+  return NULL;
+}
+
+static int as_ttype(PyObject *o, long *out) {
+  long v;
+  if (o == NULL) {
+    return -1;
+  }
+  v = PyLong_AsLong(o);
+  if (v == -1 && PyErr_Occurred()) {
+    return -1;
+  }
+  *out = v;
+  return 0;
+}
+
+static int ctype_to_ttype(int ctype) {
+  switch (ctype) {
+    case CT_STOP:
+      return T_STOP;
+    case CT_TRUE:
+    case CT_FALSE:
+      return T_BOOL;
+    case CT_BYTE:
+      return T_BYTE;
+    case CT_I16:
+      return T_I16;
+    case CT_I32:
+      return T_I32;
+    case CT_I64:
+      return T_I64;
+    case CT_DOUBLE:
+      return T_DOUBLE;
+    case CT_BINARY:
+      return T_STRING;
+    case CT_LIST:
+      return T_LIST;
+    case CT_SET:
+      return T_SET;
+    case CT_MAP:
+      return T_MAP;
+    case CT_STRUCT:
+      return T_STRUCT;
+    case CT_FLOAT:
+      return T_FLOAT;
+    default:
+      return -1;
+  }
+}
+
+static int ttype_to_ctype(long ttype) {
+  switch (ttype) {
+    case T_BOOL:
+      return CT_TRUE;
+    case T_BYTE:
+      return CT_BYTE;
+    case T_I16:
+      return CT_I16;
+    case T_I32:
+      return CT_I32;
+    case T_I64:
+      return CT_I64;
+    case T_DOUBLE:
+      return CT_DOUBLE;
+    case T_FLOAT:
+      return CT_FLOAT;
+    case T_STRING:
+    case T_UTF8:
+    case T_UTF16:
+      return CT_BINARY;
+    case T_STRUCT:
+      return CT_STRUCT;
+    case T_LIST:
+      return CT_LIST;
+    case T_SET:
+      return CT_SET;
+    case T_MAP:
+      return CT_MAP;
+    default:
+      return -1;
+  }
+}
+
+/* The spec stores STRING/UTF8/UTF16 under different ids but they share one
+ * wire representation. */
+static long wire_ttype(long ttype) {
+  if (ttype == T_UTF8 || ttype == T_UTF16) {
+    return T_STRING;
+  }
+  return ttype;
+}
+
+/* Create a struct instance without running the generated __init__.  The
+ * generated constructors only assign the defaults stored in the spec (or
+ * `field = 0, value = None` for unions), so doing the same here saves a
+ * Python level call with one keyword argument per field for every Value. */
+static PyObject *new_struct(PyObject *cls, PyObject *spec, int is_union) {
+  PyTypeObject *tp;
+  PyObject *obj;
+  Py_ssize_t i, n;
+
+  if (!PyType_Check(cls) || !PyTuple_Check(spec)) {
+    return PyObject_CallObject(cls, NULL);
+  }
+  tp = (PyTypeObject *)cls;
+  obj = tp->tp_new(tp, empty_tuple, NULL);
+  if (obj == NULL) {
+    return NULL;
+  }
+  if (is_union) {
+    if (PyObject_SetAttr(obj, str_field, int_zero) < 0 ||
+        PyObject_SetAttr(obj, str_value, Py_None) < 0) {
+      Py_DECREF(obj);
+      return NULL;
+    }
+    return obj;
+  }
+  n = PyTuple_GET_SIZE(spec);
+  for (i = 0; i < n; i++) {
+    PyObject *f = PyTuple_GET_ITEM(spec, i);
+    if (f == Py_None) {
+      continue;
+    }
+    if (!PyTuple_Check(f) || PyTuple_GET_SIZE(f) < 5) {
+      Py_DECREF(obj);
+      PyErr_SetString(PyExc_TypeError, "malformed thrift_spec");
+      return NULL;
+    }
+    if (PyObject_SetAttr(obj, PyTuple_GET_ITEM(f, 2), PyTuple_GET_ITEM(f, 4)) <
+        0) {
+      Py_DECREF(obj);
+      return NULL;
+    }
+  }
+  return obj;
+}
+
+/* ------------------------------------------------------------------------ */
+/* decoding                                                                 */
+/* ------------------------------------------------------------------------ */
+
+typedef struct {
+  PyObject *trans;
+  PyObject *buf; /* the transport's current cstringio_buf */
+  PyObject *owned; /* bytes copy when buf has no getbuffer() */
+  Py_buffer view;
+  int has_view;
+  const unsigned char *data;
+  Py_ssize_t len;
+  Py_ssize_t pos;
+  int protoid;
+  int utf8strings;
+  /* the containers created so far, kept out of the collector until the
+   * decoding is over, see decoder_untrack */
+  PyObject **untracked;
+  Py_ssize_t n_untracked;
+  Py_ssize_t untracked_cap;
+} Decoder;
+
+#if PY_VERSION_HEX < 0x03090000
+#define PyObject_GC_IsTracked(o) _PyObject_GC_IS_TRACKED(o)
+#endif
+
+/* Take a new container out of the collector while it is being filled.
+ * Decoding creates acyclic objects only, but every one of them counts
+ * towards a collection; a large DataSet would otherwise trigger many full
+ * collections, each traversing the rows built so far.  Untracking them,
+ * rather than disabling the collector, leaves it running for the other
+ * threads and during the transport reads.  The decoder holds a reference
+ * so none of them is freed before decoder_track. */
+static int decoder_untrack(Decoder *d, PyObject *obj) {
+  if (!PyObject_IS_GC(obj) || !PyObject_GC_IsTracked(obj)) {
+    return 0;
+  }
+  if (d->n_untracked == d->untracked_cap) {
+    Py_ssize_t cap = d->untracked_cap ? d->untracked_cap * 2 : 1024;
+    PyObject **items = PyMem_Realloc(d->untracked, cap * sizeof(PyObject *));
+    if (items == NULL) {
+      PyErr_NoMemory();
+      return -1;
+    }
+    d->untracked = items;
+    d->untracked_cap = cap;
+  }
+  Py_INCREF(obj);
+  d->untracked[d->n_untracked++] = obj;
+  PyObject_GC_UnTrack(obj);
+  return 0;
+}
+
+/* Give the untracked containers back to the collector. */
+static void decoder_track(Decoder *d) {
+  Py_ssize_t i;
+
+  for (i = 0; i < d->n_untracked; i++) {
+    PyObject *obj = d->untracked[i];
+    /* a dict tracks itself again when a container is stored in it */
+    if (!PyObject_GC_IsTracked(obj)) {
+      PyObject_GC_Track(obj);
+    }
+  }
+  for (i = 0; i < d->n_untracked; i++) {
+    Py_DECREF(d->untracked[i]);
+  }
+  PyMem_Free(d->untracked);
+  d->untracked = NULL;
+  d->n_untracked = 0;
+  d->untracked_cap = 0;
+}
+
+static void decoder_release(Decoder *d) {
+  if (d->has_view) {
+    PyBuffer_Release(&d->view);
+    d->has_view = 0;
+  }
+  Py_CLEAR(d->owned);
+  d->data = NULL;
+  d->len = 0;
+}
+
+/* Map the unread part of `buf` into the decoder. */
+static int decoder_attach(Decoder *d, PyObject *buf) {
+  PyObject *pos, *mv;
+
+  Py_XSETREF(d->buf, buf);
+  pos = PyObject_CallMethodObjArgs(buf, str_tell, NULL);
+  if (pos == NULL) {
+    return -1;
+  }
+  d->pos = PyLong_AsSsize_t(pos);
+  Py_DECREF(pos);
+  if (d->pos == -1 && PyErr_Occurred()) {
+    return -1;
+  }
+
+  mv = PyObject_CallMethodObjArgs(buf, str_getbuffer, NULL);
+  if (mv != NULL) {
+    int rc = PyObject_GetBuffer(mv, &d->view, PyBUF_SIMPLE);
+    Py_DECREF(mv);
+    if (rc < 0) {
+      return -1;
+    }
+    d->has_view = 1;
+    d->data = (const unsigned char *)d->view.buf;
+    d->len = d->view.len;
+    return 0;
+  }
+  if (!PyErr_ExceptionMatches(PyExc_AttributeError)) {
+    return -1;
+  }
+  /* Not a BytesIO: read the remainder and remember where it started. */
+  PyErr_Clear();
+  d->owned = PyObject_CallMethodObjArgs(buf, str_read, NULL);
+  if (d->owned == NULL) {
+    return -1;
+  }
+  if (!PyBytes_Check(d->owned)) {
+    PyErr_SetString(PyExc_TypeError, "cstringio_buf.read() must return bytes");
+    return -1;
+  }
+  d->data = (const unsigned char *)PyBytes_AS_STRING(d->owned);
+  d->len = PyBytes_GET_SIZE(d->owned);
+  /* offsets in `owned` are relative to the old position */
+  d->data -= d->pos;
+  d->len += d->pos;
+  return 0;
+}
+
+/* Make sure `n` more bytes are available, asking the transport for more
+ * data through cstringio_refill when the current buffer is exhausted. */
+static int decoder_need(Decoder *d, Py_ssize_t n) {
+  PyObject *partial, *reqlen, *newbuf;
+  Py_ssize_t have = d->len - d->pos;
+
+  if (have >= n) {
+    return 0;
+  }
+  partial = PyBytes_FromStringAndSize((const char *)d->data + d->pos, have);
+  if (partial == NULL) {
+    return -1;
+  }
+  decoder_release(d);
+  reqlen = PyLong_FromSsize_t(n);
+  if (reqlen == NULL) {
+    Py_DECREF(partial);
+    return -1;
+  }
+  newbuf = PyObject_CallMethodObjArgs(
+      d->trans, str_cstringio_refill, partial, reqlen, NULL);
+  Py_DECREF(partial);
+  Py_DECREF(reqlen);
+  if (newbuf == NULL) {
+    return -1;
+  }
+  if (decoder_attach(d, newbuf) < 0) {
+    return -1;
+  }
+  if (d->len - d->pos < n) {
+    PyErr_SetString(PyExc_EOFError, "unexpected end of thrift data");
+    return -1;
+  }
+  return 0;
+}
+
+static int read_u8(Decoder *d, uint8_t *out) {
+  if (d->pos >= d->len && decoder_need(d, 1) < 0) {
+    return -1;
+  }
+  *out = d->data[d->pos++];
+  return 0;
+}
+
+static int read_be(Decoder *d, int width, uint64_t *out) {
+  uint64_t v = 0;
+  int i;
+  if (decoder_need(d, width) < 0) {
+    return -1;
+  }
+  for (i = 0; i < width; i++) {
+    v = (v << 8) | d->data[d->pos + i];
+  }
+  d->pos += width;
+  *out = v;
+  return 0;
+}
+
+static int read_varint(Decoder *d, uint64_t *out) {
+  uint64_t result = 0;
+  int shift = 0;
+  uint8_t byte;
+  while (1) {
+    if (read_u8(d, &byte) < 0) {
+      return -1;
+    }
+    result |= (uint64_t)(byte & 0x7f) << shift;
+    if (!(byte & 0x80)) {
+      *out = result;
+      return 0;
+    }
+    shift += 7;
+    if (shift > 63) {
+      raise_protocol_error("varint is too long");
+      return -1;
+    }
+  }
+}
+
+static int read_zigzag(Decoder *d, int64_t *out) {
+  uint64_t v;
+  if (read_varint(d, &v) < 0) {
+    return -1;
+  }
+  *out = (int64_t)(v >> 1) ^ -(int64_t)(v & 1);
+  return 0;
+}
+
+/* Integral of the given ttype (BYTE/I16/I32/I64). */
+static int read_int(Decoder *d, long ttype, int64_t *out) {
+  uint64_t v;
+  uint8_t b;
+  if (ttype == T_BYTE) {
+    if (read_u8(d, &b) < 0) {
+      return -1;
+    }
+    *out = (int8_t)b;
+    return 0;
+  }
+  if (d->protoid == PROTO_COMPACT) {
+    return read_zigzag(d, out);
+  }
+  switch (ttype) {
+    case T_I16:
+      if (read_be(d, 2, &v) < 0) {
+        return -1;
+      }
+      *out = (int16_t)v;
+      return 0;
+    case T_I32:
+      if (read_be(d, 4, &v) < 0) {
+        return -1;
+      }
+      *out = (int32_t)v;
+      return 0;
+    default:
+      if (read_be(d, 8, &v) < 0) {
+        return -1;
+      }
+      *out = (int64_t)v;
+      return 0;
+  }
+}
+
+static int read_size(Decoder *d, Py_ssize_t *out) {
+  int64_t v;
+  uint64_t u;
+  if (d->protoid == PROTO_COMPACT) {
+    if (read_varint(d, &u) < 0) {
+      return -1;
+    }
+    v = (int64_t)u;
+  } else if (read_int(d, T_I32, &v) < 0) {
+    return -1;
+  }
+  if (v < 0 || v > PY_SSIZE_T_MAX) {
+    raise_protocol_error("negative or oversized length");
+    return -1;
+  }
+  *out = (Py_ssize_t)v;
+  return 0;
+}
+
+static int read_list_header(Decoder *d, long *etype, Py_ssize_t *size) {
+  uint8_t b;
+  if (d->protoid == PROTO_COMPACT) {
+    if (read_u8(d, &b) < 0) {
+      return -1;
+    }
+    *etype = ctype_to_ttype(b & 0x0f);
+    *size = b >> 4;
+    if (*size == 15 && read_size(d, size) < 0) {
+      return -1;
+    }
+  } else {
+    if (read_u8(d, &b) < 0) {
+      return -1;
+    }
+    *etype = b;
+    if (read_size(d, size) < 0) {
+      return -1;
+    }
+  }
+  return 0;
+}
+
+static int
+read_map_header(Decoder *d, long *ktype, long *vtype, Py_ssize_t *size) {
+  uint8_t b;
+  if (d->protoid == PROTO_COMPACT) {
+    if (read_size(d, size) < 0) {
+      return -1;
+    }
+    *ktype = *vtype = T_STOP;
+    if (*size > 0) {
+      if (read_u8(d, &b) < 0) {
+        return -1;
+      }
+      *ktype = ctype_to_ttype(b >> 4);
+      *vtype = ctype_to_ttype(b & 0x0f);
+    }
+  } else {
+    if (read_u8(d, &b) < 0) {
+      return -1;
+    }
+    *ktype = b;
+    if (read_u8(d, &b) < 0) {
+      return -1;
+    }
+    *vtype = b;
+    if (read_size(d, size) < 0) {
+      return -1;
+    }
+  }
+  return 0;
+}
+
+/* Field header.  `fid` tracking for the compact protocol is done through
+ * `last_fid`; for compact booleans the value is returned in `bool_val`. */
+static int read_field_header(
+    Decoder *d, long *ttype, int16_t *fid, int16_t *last_fid, int *bool_val) {
+  uint8_t b;
+  int64_t v;
+  uint64_t u;
+
+  if (read_u8(d, &b) < 0) {
+    return -1;
+  }
+  if (d->protoid == PROTO_COMPACT) {
+    int ctype = b & 0x0f;
+    int delta = b >> 4;
+    if (ctype == CT_STOP) {
+      *ttype = T_STOP;
+      return 0;
+    }
+    if (delta == 0) {
+      if (read_zigzag(d, &v) < 0) {
+        return -1;
+      }
+      *fid = (int16_t)v;
+    } else {
+      *fid = (int16_t)(*last_fid + delta);
+    }
+    *last_fid = *fid;
+    *ttype = ctype_to_ttype(ctype);
+    if (*ttype < 0) {
+      raise_protocol_error("unknown compact type");
+      return -1;
+    }
+    *bool_val = ctype == CT_TRUE;
+    return 0;
+  }
+  *ttype = b;
+  if (b == T_STOP) {
+    return 0;
+  }
+  if (read_be(d, 2, &u) < 0) {
+    return -1;
+  }
+  *fid = (int16_t)u;
+  return 0;
+}
+
+static int skip(Decoder *d, long ttype, int depth);
+
+static int skip_struct(Decoder *d, int depth) {
+  long ttype;
+  int16_t fid = 0, last_fid = 0;
+  int bool_val;
+  while (1) {
+    if (read_field_header(d, &ttype, &fid, &last_fid, &bool_val) < 0) {
+      return -1;
+    }
+    if (ttype == T_STOP) {
+      return 0;
+    }
+    /* compact booleans live in the field header */
+    if (ttype == T_BOOL && d->protoid == PROTO_COMPACT) {
+      continue;
+    }
+    if (skip(d, ttype, depth + 1) < 0) {
+      return -1;
+    }
+  }
+}
+
+static int skip(Decoder *d, long ttype, int depth) {
+  Py_ssize_t size, i;
+  long etype, ktype, vtype;
+  int64_t iv;
+  uint8_t b;
+
+  if (Py_EnterRecursiveCall(" while skipping thrift data")) {
+    return -1;
+  }
+  switch (ttype) {
+    case T_BOOL:
+    case T_BYTE:
+      if (read_u8(d, &b) < 0) {
+        goto error;
+      }
+      break;
+    case T_I16:
+    case T_I32:
+    case T_I64:
+      if (read_int(d, ttype, &iv) < 0) {
+        goto error;
+      }
+      break;
+    case T_DOUBLE:
+      if (decoder_need(d, 8) < 0) {
+        goto error;
+      }
+      d->pos += 8;
+      break;
+    case T_FLOAT:
+      if (decoder_need(d, 4) < 0) {
+        goto error;
+      }
+      d->pos += 4;
+      break;
+    case T_STRING:
+    case T_UTF8:
+    case T_UTF16:
+      if (read_size(d, &size) < 0 || decoder_need(d, size) < 0) {
+        goto error;
+      }
+      d->pos += size;
+      break;
+    case T_STRUCT:
+      if (skip_struct(d, depth) < 0) {
+        goto error;
+      }
+      break;
+    case T_LIST:
+    case T_SET:
+      if (read_list_header(d, &etype, &size) < 0) {
+        goto error;
+      }
+      for (i = 0; i < size; i++) {
+        if (skip(d, etype, depth + 1) < 0) {
+          goto error;
+        }
+      }
+      break;
+    case T_MAP:
+      if (read_map_header(d, &ktype, &vtype, &size) < 0) {
+        goto error;
+      }
+      for (i = 0; i < size; i++) {
+        if (skip(d, ktype, depth + 1) < 0 || skip(d, vtype, depth + 1) < 0) {
+          goto error;
+        }
+      }
+      break;
+    default:
+      raise_protocol_error("unexpected type for skipping");
+      goto error;
+  }
+  Py_LeaveRecursiveCall();
+  return 0;
+error:
+  Py_LeaveRecursiveCall();
+  return -1;
+}
+
+static PyObject *decode_val(Decoder *d, long ttype, PyObject *args);
+
+static int decode_struct_into(
+    Decoder *d, PyObject *obj, PyObject *spec, int is_union) {
+  long ttype, spec_ttype;
+  int16_t fid = 0, last_fid = 0;
+  int bool_val = 0;
+  PyObject *field, *val;
+
+  if (!PyTuple_Check(spec)) {
+    PyErr_SetString(PyExc_TypeError, "thrift_spec must be a tuple");
+    return -1;
+  }
+  while (1) {
+    if (read_field_header(d, &ttype, &fid, &last_fid, &bool_val) < 0) {
+      return -1;
+    }
+    if (ttype == T_STOP) {
+      return 0;
+    }
+    field = NULL;
+    if (fid >= 0 && fid < PyTuple_GET_SIZE(spec)) {
+      field = PyTuple_GET_ITEM(spec, fid);
+      if (field == Py_None) {
+        field = NULL;
+      }
+    }
+    if (field != NULL) {
+      if (as_ttype(seq_item(field, 1), &spec_ttype) < 0) {
+        return -1;
+      }
+      if (wire_ttype(spec_ttype) != ttype) {
+        field = NULL;
+      }
+    }
+    if (field == NULL) {
+      if (ttype == T_BOOL && d->protoid == PROTO_COMPACT) {
+        continue;
+      }
+      if (skip(d, ttype, 0) < 0) {
+        return -1;
+      }
+      continue;
+    }
+
+    if (ttype == T_BOOL && d->protoid == PROTO_COMPACT) {
+      val = PyBool_FromLong(bool_val);
+    } else {
+      val = decode_val(d, spec_ttype, PyTuple_GET_ITEM(field, 3));
+    }
+    if (val == NULL) {
+      return -1;
+    }
+    if (is_union) {
+      PyObject *pyfid = PyLong_FromLong(fid);
+      int rc;
+      if (pyfid == NULL) {
+        Py_DECREF(val);
+        return -1;
+      }
+      rc = PyObject_SetAttr(obj, str_field, pyfid);
+      Py_DECREF(pyfid);
+      if (rc == 0) {
+        rc = PyObject_SetAttr(obj, str_value, val);
+      }
+      Py_DECREF(val);
+      if (rc < 0) {
+        return -1;
+      }
+    } else {
+      int rc = PyObject_SetAttr(obj, PyTuple_GET_ITEM(field, 2), val);
+      Py_DECREF(val);
+      if (rc < 0) {
+        return -1;
+      }
+    }
+  }
+}
+
+/* `args` is the spec type argument:
+ *   STRUCT: [cls, spec, is_union]
+ *   LIST/SET: (etype, eargs)
+ *   MAP: (ktype, kargs, vtype, vargs)
+ *   STRING: True when the field is a utf-8 `string` rather than `binary` */
+static PyObject *decode_val(Decoder *d, long ttype, PyObject *args) {
+  PyObject *ret = NULL;
+  Py_ssize_t size, i;
+  int64_t iv;
+  uint64_t u;
+  uint8_t b;
+
+  if (Py_EnterRecursiveCall(" while decoding thrift data")) {
+    return NULL;
+  }
+  switch (ttype) {
+    case T_BOOL:
+      if (read_u8(d, &b) < 0) {
+        break;
+      }
+      if (d->protoid == PROTO_COMPACT) {
+        ret = PyBool_FromLong(b == CT_TRUE);
+      } else {
+        ret = PyBool_FromLong(b != 0);
+      }
+      break;
+    case T_BYTE:
+    case T_I16:
+    case T_I32:
+    case T_I64:
+      if (read_int(d, ttype, &iv) == 0) {
+        ret = PyLong_FromLongLong(iv);
+      }
+      break;
+    case T_DOUBLE: {
+      double dv;
+      if (read_be(d, 8, &u) < 0) {
+        break;
+      }
+      memcpy(&dv, &u, sizeof(dv));
+      ret = PyFloat_FromDouble(dv);
+      break;
+    }
+    case T_FLOAT: {
+      float fv;
+      uint32_t u32;
+      if (read_be(d, 4, &u) < 0) {
+        break;
+      }
+      u32 = (uint32_t)u;
+      memcpy(&fv, &u32, sizeof(fv));
+      ret = PyFloat_FromDouble(fv);
+      break;
+    }
+    case T_STRING:
+    case T_UTF8:
+    case T_UTF16: {
+      const char *p;
+      if (read_size(d, &size) < 0 || decoder_need(d, size) < 0) {
+        break;
+      }
+      p = (const char *)d->data + d->pos;
+      d->pos += size;
+      if (d->utf8strings && args == Py_True) {
+        ret = PyUnicode_DecodeUTF8(p, size, NULL);
+      } else {
+        ret = PyBytes_FromStringAndSize(p, size);
+      }
+      break;
+    }
+    case T_STRUCT: {
+      PyObject *cls, *spec, *union_flag, *obj;
+      int is_union;
+      if ((cls = seq_item(args, 0)) == NULL ||
+          (spec = seq_item(args, 1)) == NULL ||
+          (union_flag = seq_item(args, 2)) == NULL) {
+        break;
+      }
+      is_union = PyObject_IsTrue(union_flag);
+      if (is_union < 0) {
+        break;
+      }
+      obj = new_struct(cls, spec, is_union);
+      if (obj == NULL) {
+        break;
+      }
+      if (decoder_untrack(d, obj) < 0) {
+        Py_DECREF(obj);
+        break;
+      }
+      if (decode_struct_into(d, obj, spec, is_union) < 0) {
+        Py_DECREF(obj);
+        break;
+      }
+      ret = obj;
+      break;
+    }
+    case T_LIST:
+    case T_SET: {
+      long etype, spec_etype;
+      PyObject *eargs, *item;
+      if (as_ttype(seq_item(args, 0), &spec_etype) < 0 ||
+          (eargs = seq_item(args, 1)) == NULL) {
+        break;
+      }
+      if (read_list_header(d, &etype, &size) < 0) {
+        break;
+      }
+      if (size > 0 && etype != wire_ttype(spec_etype)) {
+        raise_protocol_error("container element type mismatch");
+        break;
+      }
+      if (ttype == T_LIST) {
+        /* every element takes at least one byte on the wire */
+        int prealloc = size <= d->len - d->pos;
+        ret = PyList_New(prealloc ? size : 0);
+        if (ret == NULL) {
+          break;
+        }
+        if (decoder_untrack(d, ret) < 0) {
+          Py_CLEAR(ret);
+          break;
+        }
+        for (i = 0; i < size; i++) {
+          item = decode_val(d, spec_etype, eargs);
+          if (item == NULL) {
+            Py_CLEAR(ret);
+            break;
+          }
+          if (prealloc) {
+            PyList_SET_ITEM(ret, i, item);
+          } else {
+            int rc = PyList_Append(ret, item);
+            Py_DECREF(item);
+            if (rc < 0) {
+              Py_CLEAR(ret);
+              break;
+            }
+          }
+        }
+      } else {
+        ret = PySet_New(NULL);
+        if (ret == NULL) {
+          break;
+        }
+        if (decoder_untrack(d, ret) < 0) {
+          Py_CLEAR(ret);
+          break;
+        }
+        for (i = 0; i < size; i++) {
+          int rc;
+          item = decode_val(d, spec_etype, eargs);
+          if (item == NULL) {
+            Py_CLEAR(ret);
+            break;
+          }
+          rc = PySet_Add(ret, item);
+          Py_DECREF(item);
+          if (rc < 0) {
+            Py_CLEAR(ret);
+            break;
+          }
+        }
+      }
+      break;
+    }
+    case T_MAP: {
+      long ktype, vtype, spec_ktype, spec_vtype;
+      PyObject *kargs, *vargs, *k, *v;
+      if (as_ttype(seq_item(args, 0), &spec_ktype) < 0 ||
+          (kargs = seq_item(args, 1)) == NULL ||
+          as_ttype(seq_item(args, 2), &spec_vtype) < 0 ||
+          (vargs = seq_item(args, 3)) == NULL) {
+        break;
+      }
+      if (read_map_header(d, &ktype, &vtype, &size) < 0) {
+        break;
+      }
+      if (size > 0 && (ktype != wire_ttype(spec_ktype) ||
+                       vtype != wire_ttype(spec_vtype))) {
+        raise_protocol_error("map key or value type mismatch");
+        break;
+      }
+      ret = PyDict_New();
+      if (ret == NULL) {
+        break;
+      }
+      if (decoder_untrack(d, ret) < 0) {
+        Py_CLEAR(ret);
+        break;
+      }
+      for (i = 0; i < size; i++) {
+        int rc;
+        k = decode_val(d, spec_ktype, kargs);
+        if (k == NULL) {
+          Py_CLEAR(ret);
+          break;
+        }
+        v = decode_val(d, spec_vtype, vargs);
+        if (v == NULL) {
+          Py_DECREF(k);
+          Py_CLEAR(ret);
+          break;
+        }
+        rc = PyDict_SetItem(ret, k, v);
+        Py_DECREF(k);
+        Py_DECREF(v);
+        if (rc < 0) {
+          Py_CLEAR(ret);
+          break;
+        }
+      }
+      break;
+    }
+    default:
+      raise_protocol_error("unexpected type in thrift_spec");
+      break;
+  }
+  Py_LeaveRecursiveCall();
+  return ret;
+}
+
+/* Attach a decoder to the cstringio_buf of `trans`. */
+static int decoder_open(Decoder *d, PyObject *trans, int protoid, int utf8strings) {
+  PyObject *buf;
+
+  memset(d, 0, sizeof(*d));
+  if (protoid != PROTO_BINARY && protoid != PROTO_COMPACT) {
+    PyErr_Format(PyExc_ValueError, "unsupported protocol id %d", protoid);
+    return -1;
+  }
+  d->trans = trans;
+  d->protoid = protoid;
+  d->utf8strings = utf8strings;
+  buf = PyObject_GetAttr(trans, str_cstringio_buf);
+  if (buf == NULL) {
+    return -1;
+  }
+  if (decoder_attach(d, buf) < 0) {
+    decoder_release(d);
+    Py_CLEAR(d->buf);
+    return -1;
+  }
+  return 0;
+}
+
+/* Detach the decoder, leaving the buffer positioned after what was read
+ * when `rc` tells the decoding succeeded. */
+static int decoder_close(Decoder *d, int rc) {
+  PyObject *r;
+
+  decoder_track(d);
+  decoder_release(d);
+  if (rc == 0) {
+    r = PyObject_CallMethod(d->buf, "seek", "n", d->pos);
+    if (r == NULL) {
+      rc = -1;
+    }
+    Py_XDECREF(r);
+  }
+  Py_CLEAR(d->buf);
+  return rc;
+}
+
+static PyObject *fastproto_decode(PyObject *self, PyObject *args, PyObject *kw) {
+  static char *kwlist[] = {"obj", "trans", "spec", "utf8strings", "protoid", NULL};
+  PyObject *obj, *trans, *spec_args, *spec, *union_flag;
+  int utf8strings = 0, protoid = PROTO_BINARY, is_union, rc;
+  Decoder d;
+
+  if (!PyArg_ParseTupleAndKeywords(
+          args, kw, "OOO|ii", kwlist, &obj, &trans, &spec_args, &utf8strings,
+          &protoid)) {
+    return NULL;
+  }
+  if ((spec = seq_item(spec_args, 1)) == NULL ||
+      (union_flag = seq_item(spec_args, 2)) == NULL) {
+    return NULL;
+  }
+  is_union = PyObject_IsTrue(union_flag);
+  if (is_union < 0) {
+    return NULL;
+  }
+  if (decoder_open(&d, trans, protoid, utf8strings) < 0) {
+    return NULL;
+  }
+  rc = decode_struct_into(&d, obj, spec, is_union);
+  if (decoder_close(&d, rc) < 0) {
+    return NULL;
+  }
+  Py_INCREF(obj);
+  return obj;
+}
+
+static PyObject *
+fastproto_offsets(PyObject *self, PyObject *args, PyObject *kw) {
+  static char *kwlist[] = {"trans", "ttype", "count", "protoid", NULL};
+  PyObject *trans, *buf, *ret, *pos;
+  long ttype;
+  Py_ssize_t count, i;
+  int protoid = PROTO_BINARY, rc = 0;
+  Decoder d;
+
+  if (!PyArg_ParseTupleAndKeywords(
+          args, kw, "Oln|i", kwlist, &trans, &ttype, &count, &protoid)) {
+    return NULL;
+  }
+  if (count < 0) {
+    PyErr_SetString(PyExc_ValueError, "count must not be negative");
+    return NULL;
+  }
+  if (decoder_open(&d, trans, protoid, 0) < 0) {
+    return NULL;
+  }
+  buf = d.buf;
+  ret = PyList_New(count + 1);
+  if (ret == NULL) {
+    decoder_close(&d, -1);
+    return NULL;
+  }
+  for (i = 0; i <= count; i++) {
+    pos = PyLong_FromSsize_t(d.pos);
+    if (pos == NULL) {
+      rc = -1;
+      break;
+    }
+    PyList_SET_ITEM(ret, i, pos);
+    if (i < count && skip(&d, ttype, 0) < 0) {
+      rc = -1;
+      break;
+    }
+    /* a refill moves to another buffer, the offsets would be meaningless */
+    if (d.buf != buf) {
+      PyErr_SetString(
+          PyExc_ValueError, "the values span more than one transport buffer");
+      rc = -1;
+      break;
+    }
+  }
+  if (decoder_close(&d, rc) < 0) {
+    Py_DECREF(ret);
+    return NULL;
+  }
+  return ret;
+}
+
+/* Decode element `index` of the list field `field` of the struct at the
+ * decoder position, skipping everything else.  Returns None when the struct
+ * has no such element. */
+static PyObject *decode_list_item(
+    Decoder *d, long field, Py_ssize_t index, long ttype, PyObject *args) {
+  long ftype, etype;
+  int16_t fid = 0, last_fid = 0;
+  int bool_val;
+  Py_ssize_t size, i;
+  PyObject *ret = NULL;
+
+  while (1) {
+    if (read_field_header(d, &ftype, &fid, &last_fid, &bool_val) < 0) {
+      goto error;
+    }
+    if (ftype == T_STOP) {
+      break;
+    }
+    if (ftype == T_BOOL && d->protoid == PROTO_COMPACT) {
+      continue;
+    }
+    if (fid != field || ftype != T_LIST || ret != NULL) {
+      if (skip(d, ftype, 0) < 0) {
+        goto error;
+      }
+      continue;
+    }
+    if (read_list_header(d, &etype, &size) < 0) {
+      goto error;
+    }
+    for (i = 0; i < size; i++) {
+      if (i == index && etype == wire_ttype(ttype)) {
+        ret = decode_val(d, ttype, args);
+        if (ret == NULL) {
+          goto error;
+        }
+      } else if (skip(d, etype, 0) < 0) {
+        goto error;
+      }
+    }
+  }
+  if (ret == NULL) {
+    Py_RETURN_NONE;
+  }
+  return ret;
+error:
+  Py_XDECREF(ret);
+  return NULL;
+}
+
+static PyObject *
+fastproto_decode_column(PyObject *self, PyObject *args, PyObject *kw) {
+  static char *kwlist[] = {
+      "trans", "count", "field", "index", "ttype", "args", "utf8strings",
+      "protoid", NULL};
+  PyObject *trans, *type_args, *ret, *item;
+  long field, ttype;
+  Py_ssize_t count, index, i;
+  int utf8strings = 0, protoid = PROTO_BINARY, rc = 0;
+  Decoder d;
+
+  if (!PyArg_ParseTupleAndKeywords(
+          args, kw, "OnlnlO|ii", kwlist, &trans, &count, &field, &index,
+          &ttype, &type_args, &utf8strings, &protoid)) {
+    return NULL;
+  }
+  if (count < 0) {
+    PyErr_SetString(PyExc_ValueError, "count must not be negative");
+    return NULL;
+  }
+  if (decoder_open(&d, trans, protoid, utf8strings) < 0) {
+    return NULL;
+  }
+  ret = PyList_New(count);
+  if (ret == NULL) {
+    decoder_close(&d, -1);
+    return NULL;
+  }
+  for (i = 0; i < count; i++) {
+    item = decode_list_item(&d, field, index, ttype, type_args);
+    if (item == NULL) {
+      rc = -1;
+      break;
+    }
+    PyList_SET_ITEM(ret, i, item);
+  }
+  if (decoder_close(&d, rc) < 0) {
+    Py_DECREF(ret);
+    return NULL;
+  }
+  return ret;
+}
+
+/* ------------------------------------------------------------------------ */
+/* encoding                                                                 */
+/* ------------------------------------------------------------------------ */
+
+typedef struct {
+  char *buf;
+  Py_ssize_t len;
+  Py_ssize_t cap;
+  int protoid;
+  int utf8strings;
+} Encoder;
+
+static int enc_reserve(Encoder *e, Py_ssize_t n) {
+  Py_ssize_t cap;
+  char *nbuf;
+  if (e->len + n <= e->cap) {
+    return 0;
+  }
+  cap = e->cap ? e->cap : 256;
+  while (cap < e->len + n) {
+    cap *= 2;
+  }
+  nbuf = PyMem_Realloc(e->buf, cap);
+  if (nbuf == NULL) {
+    PyErr_NoMemory();
+    return -1;
+  }
+  e->buf = nbuf;
+  e->cap = cap;
+  return 0;
+}
+
+static int enc_bytes(Encoder *e, const void *p, Py_ssize_t n) {
+  if (enc_reserve(e, n) < 0) {
+    return -1;
+  }
+  memcpy(e->buf + e->len, p, n);
+  e->len += n;
+  return 0;
+}
+
+static int enc_u8(Encoder *e, uint8_t b) {
+  if (enc_reserve(e, 1) < 0) {
+    return -1;
+  }
+  e->buf[e->len++] = (char)b;
+  return 0;
+}
+
+static int enc_be(Encoder *e, uint64_t v, int width) {
+  int i;
+  if (enc_reserve(e, width) < 0) {
+    return -1;
+  }
+  for (i = width - 1; i >= 0; i--) {
+    e->buf[e->len + i] = (char)(v & 0xff);
+    v >>= 8;
+  }
+  e->len += width;
+  return 0;
+}
+
+static int enc_varint(Encoder *e, uint64_t v) {
+  if (enc_reserve(e, 10) < 0) {
+    return -1;
+  }
+  while (v & ~(uint64_t)0x7f) {
+    e->buf[e->len++] = (char)((v & 0x7f) | 0x80);
+    v >>= 7;
+  }
+  e->buf[e->len++] = (char)v;
+  return 0;
+}
+
+static int enc_zigzag(Encoder *e, int64_t v) {
+  return enc_varint(e, ((uint64_t)v << 1) ^ (uint64_t)(v >> 63));
+}
+
+static int enc_size(Encoder *e, Py_ssize_t n) {
+  if (n > INT32_MAX) {
+    PyErr_SetString(PyExc_OverflowError, "container or string is too large");
+    return -1;
+  }
+  if (e->protoid == PROTO_COMPACT) {
+    return enc_varint(e, (uint64_t)n);
+  }
+  return enc_be(e, (uint64_t)n, 4);
+}
+
+static int enc_int(Encoder *e, long ttype, PyObject *o) {
+  long long v = PyLong_AsLongLong(o);
+  long long lo, hi;
+  if (v == -1 && PyErr_Occurred()) {
+    return -1;
+  }
+  switch (ttype) {
+    case T_BYTE:
+      lo = INT8_MIN;
+      hi = INT8_MAX;
+      break;
+    case T_I16:
+      lo = INT16_MIN;
+      hi = INT16_MAX;
+      break;
+    case T_I32:
+      lo = INT32_MIN;
+      hi = INT32_MAX;
+      break;
+    default:
+      lo = INT64_MIN;
+      hi = INT64_MAX;
+      break;
+  }
+  if (v < lo || v > hi) {
+    PyErr_Format(PyExc_OverflowError, "%lld is out of range for type %ld", v,
+                 ttype);
+    return -1;
+  }
+  if (ttype == T_BYTE) {
+    return enc_u8(e, (uint8_t)(int8_t)v);
+  }
+  if (e->protoid == PROTO_COMPACT) {
+    return enc_zigzag(e, (int64_t)v);
+  }
+  switch (ttype) {
+    case T_I16:
+      return enc_be(e, (uint64_t)(uint16_t)(int16_t)v, 2);
+    case T_I32:
+      return enc_be(e, (uint64_t)(uint32_t)(int32_t)v, 4);
+    default:
+      return enc_be(e, (uint64_t)v, 8);
+  }
+}
+
+static int enc_list_header(Encoder *e, long etype, Py_ssize_t size) {
+  if (e->protoid == PROTO_COMPACT) {
+    int ct = ttype_to_ctype(etype);
+    if (ct < 0) {
+      raise_protocol_error("unexpected element type");
+      return -1;
+    }
+    if (size <= 14) {
+      return enc_u8(e, (uint8_t)(size << 4 | ct));
+    }
+    if (enc_u8(e, (uint8_t)(0xf0 | ct)) < 0) {
+      return -1;
+    }
+    return enc_size(e, size);
+  }
+  if (enc_u8(e, (uint8_t)wire_ttype(etype)) < 0) {
+    return -1;
+  }
+  return enc_size(e, size);
+}
+
+static int
+enc_map_header(Encoder *e, long ktype, long vtype, Py_ssize_t size) {
+  if (e->protoid == PROTO_COMPACT) {
+    int kc = ttype_to_ctype(ktype), vc = ttype_to_ctype(vtype);
+    if (kc < 0 || vc < 0) {
+      raise_protocol_error("unexpected map key or value type");
+      return -1;
+    }
+    if (size == 0) {
+      return enc_u8(e, 0);
+    }
+    if (enc_size(e, size) < 0) {
+      return -1;
+    }
+    return enc_u8(e, (uint8_t)(kc << 4 | vc));
+  }
+  if (enc_u8(e, (uint8_t)wire_ttype(ktype)) < 0 ||
+      enc_u8(e, (uint8_t)wire_ttype(vtype)) < 0) {
+    return -1;
+  }
+  return enc_size(e, size);
+}
+
+static int enc_val(Encoder *e, long ttype, PyObject *args, PyObject *o);
+
+static int enc_struct(Encoder *e, PyObject *obj, PyObject *spec, int is_union);
+
+static int enc_field_header(
+    Encoder *e, long ttype, int16_t fid, int16_t *last_fid, int bool_val) {
+  if (e->protoid == PROTO_COMPACT) {
+    int ct = ttype_to_ctype(ttype);
+    int delta = fid - *last_fid;
+    if (ct < 0) {
+      raise_protocol_error("unexpected field type");
+      return -1;
+    }
+    if (ttype == T_BOOL) {
+      ct = bool_val ? CT_TRUE : CT_FALSE;
+    }
+    *last_fid = fid;
+    if (delta > 0 && delta <= 15) {
+      return enc_u8(e, (uint8_t)(delta << 4 | ct));
+    }
+    if (enc_u8(e, (uint8_t)ct) < 0) {
+      return -1;
+    }
+    return enc_zigzag(e, fid);
+  }
+  if (enc_u8(e, (uint8_t)wire_ttype(ttype)) < 0) {
+    return -1;
+  }
+  return enc_be(e, (uint64_t)(uint16_t)fid, 2);
+}
+
+static int enc_field(
+    Encoder *e, PyObject *field, PyObject *val, int16_t *last_fid) {
+  long ttype, fid;
+  if (as_ttype(PyTuple_GET_ITEM(field, 0), &fid) < 0 ||
+      as_ttype(PyTuple_GET_ITEM(field, 1), &ttype) < 0) {
+    return -1;
+  }
+  if (ttype == T_BOOL && e->protoid == PROTO_COMPACT) {
+    int truth = PyObject_IsTrue(val);
+    if (truth < 0) {
+      return -1;
+    }
+    return enc_field_header(e, ttype, (int16_t)fid, last_fid, truth);
+  }
+  if (enc_field_header(e, ttype, (int16_t)fid, last_fid, 0) < 0) {
+    return -1;
+  }
+  return enc_val(e, ttype, PyTuple_GET_ITEM(field, 3), val);
+}
+
+static int enc_struct(Encoder *e, PyObject *obj, PyObject *spec, int is_union) {
+  Py_ssize_t i, n;
+  int16_t last_fid = 0;
+
+  if (!PyTuple_Check(spec)) {
+    PyErr_SetString(PyExc_TypeError, "thrift_spec must be a tuple");
+    return -1;
+  }
+  n = PyTuple_GET_SIZE(spec);
+  if (is_union) {
+    PyObject *pyfid, *val;
+    long fid;
+    int rc = 0;
+    pyfid = PyObject_GetAttr(obj, str_field);
+    if (pyfid == NULL) {
+      return -1;
+    }
+    fid = PyLong_AsLong(pyfid);
+    Py_DECREF(pyfid);
+    if (fid == -1 && PyErr_Occurred()) {
+      return -1;
+    }
+    if (fid > 0 && fid < n && PyTuple_GET_ITEM(spec, fid) != Py_None) {
+      val = PyObject_GetAttr(obj, str_value);
+      if (val == NULL) {
+        return -1;
+      }
+      rc = enc_field(e, PyTuple_GET_ITEM(spec, fid), val, &last_fid);
+      Py_DECREF(val);
+    }
+    if (rc < 0) {
+      return -1;
+    }
+    return enc_u8(e, T_STOP);
+  }
+
+  for (i = 0; i < n; i++) {
+    PyObject *field = PyTuple_GET_ITEM(spec, i), *val;
+    int rc;
+    if (field == Py_None) {
+      continue;
+    }
+    val = PyObject_GetAttr(obj, PyTuple_GET_ITEM(field, 2));
+    if (val == NULL) {
+      if (!PyErr_ExceptionMatches(PyExc_AttributeError)) {
+        return -1;
+      }
+      PyErr_Clear();
+      continue;
+    }
+    if (val == Py_None) {
+      Py_DECREF(val);
+      continue;
+    }
+    rc = enc_field(e, field, val, &last_fid);
+    Py_DECREF(val);
+    if (rc < 0) {
+      return -1;
+    }
+  }
+  return enc_u8(e, T_STOP);
+}
+
+static int enc_val(Encoder *e, long ttype, PyObject *args, PyObject *o) {
+  int rc = -1;
+  if (Py_EnterRecursiveCall(" while encoding thrift data")) {
+    return -1;
+  }
+  switch (ttype) {
+    case T_BOOL: {
+      int truth = PyObject_IsTrue(o);
+      if (truth < 0) {
+        break;
+      }
+      if (e->protoid == PROTO_COMPACT) {
+        rc = enc_u8(e, truth ? CT_TRUE : CT_FALSE);
+      } else {
+        rc = enc_u8(e, truth ? 1 : 0);
+      }
+      break;
+    }
+    case T_BYTE:
+    case T_I16:
+    case T_I32:
+    case T_I64:
+      rc = enc_int(e, ttype, o);
+      break;
+    case T_DOUBLE: {
+      double dv = PyFloat_AsDouble(o);
+      uint64_t u;
+      if (dv == -1.0 && PyErr_Occurred()) {
+        break;
+      }
+      memcpy(&u, &dv, sizeof(u));
+      rc = enc_be(e, u, 8);
+      break;
+    }
+    case T_FLOAT: {
+      float fv = (float)PyFloat_AsDouble(o);
+      uint32_t u;
+      if (fv == -1.0f && PyErr_Occurred()) {
+        break;
+      }
+      memcpy(&u, &fv, sizeof(u));
+      rc = enc_be(e, u, 4);
+      break;
+    }
+    case T_STRING:
+    case T_UTF8:
+    case T_UTF16: {
+      const char *p;
+      Py_ssize_t n;
+      if (PyUnicode_Check(o)) {
+        p = PyUnicode_AsUTF8AndSize(o, &n);
+        if (p == NULL) {
+          break;
+        }
+        if (enc_size(e, n) == 0) {
+          rc = enc_bytes(e, p, n);
+        }
+      } else if (PyBytes_Check(o)) {
+        n = PyBytes_GET_SIZE(o);
+        if (enc_size(e, n) == 0) {
+          rc = enc_bytes(e, PyBytes_AS_STRING(o), n);
+        }
+      } else {
+        Py_buffer view;
+        if (PyObject_GetBuffer(o, &view, PyBUF_SIMPLE) < 0) {
+          break;
+        }
+        if (enc_size(e, view.len) == 0) {
+          rc = enc_bytes(e, view.buf, view.len);
+        }
+        PyBuffer_Release(&view);
+      }
+      break;
+    }
+    case T_STRUCT: {
+      PyObject *spec, *union_flag;
+      int is_union;
+      if ((spec = seq_item(args, 1)) == NULL ||
+          (union_flag = seq_item(args, 2)) == NULL) {
+        break;
+      }
+      is_union = PyObject_IsTrue(union_flag);
+      if (is_union < 0) {
+        break;
+      }
+      rc = enc_struct(e, o, spec, is_union);
+      break;
+    }
+    case T_LIST:
+    case T_SET: {
+      long etype;
+      PyObject *eargs, *it, *item;
+      Py_ssize_t size;
+      if (as_ttype(seq_item(args, 0), &etype) < 0 ||
+          (eargs = seq_item(args, 1)) == NULL) {
+        break;
+      }
+      size = PyObject_Size(o);
+      if (size < 0 || enc_list_header(e, etype, size) < 0) {
+        break;
+      }
+      it = PyObject_GetIter(o);
+      if (it == NULL) {
+        break;
+      }
+      rc = 0;
+      while ((item = PyIter_Next(it)) != NULL) {
+        rc = enc_val(e, etype, eargs, item);
+        Py_DECREF(item);
+        if (rc < 0) {
+          break;
+        }
+      }
+      Py_DECREF(it);
+      if (PyErr_Occurred()) {
+        rc = -1;
+      }
+      break;
+    }
+    case T_MAP: {
+      long ktype, vtype;
+      PyObject *kargs, *vargs, *k, *v, *items = NULL;
+      Py_ssize_t pos = 0, size, i;
+      if (as_ttype(seq_item(args, 0), &ktype) < 0 ||
+          (kargs = seq_item(args, 1)) == NULL ||
+          as_ttype(seq_item(args, 2), &vtype) < 0 ||
+          (vargs = seq_item(args, 3)) == NULL) {
+        break;
+      }
+      size = PyObject_Size(o);
+      if (size < 0 || enc_map_header(e, ktype, vtype, size) < 0) {
+        break;
+      }
+      rc = 0;
+      if (PyDict_Check(o)) {
+        while (PyDict_Next(o, &pos, &k, &v)) {
+          if (enc_val(e, ktype, kargs, k) < 0 ||
+              enc_val(e, vtype, vargs, v) < 0) {
+            rc = -1;
+            break;
+          }
+        }
+        break;
+      }
+      items = PyMapping_Items(o);
+      if (items == NULL) {
+        rc = -1;
+        break;
+      }
+      for (i = 0; i < PyList_GET_SIZE(items); i++) {
+        PyObject *kv = PyList_GET_ITEM(items, i);
+        if (enc_val(e, ktype, kargs, PyTuple_GET_ITEM(kv, 0)) < 0 ||
+            enc_val(e, vtype, vargs, PyTuple_GET_ITEM(kv, 1)) < 0) {
+          rc = -1;
+          break;
+        }
+      }
+      Py_DECREF(items);
+      break;
+    }
+    default:
+      raise_protocol_error("unexpected type in thrift_spec");
+      break;
+  }
+  Py_LeaveRecursiveCall();
+  return rc;
+}
+
+static PyObject *fastproto_encode(PyObject *self, PyObject *args, PyObject *kw) {
+  static char *kwlist[] = {"obj", "spec", "utf8strings", "protoid", NULL};
+  PyObject *obj, *spec_args, *spec, *union_flag, *ret = NULL;
+  int utf8strings = 0, protoid = PROTO_BINARY, is_union;
+  Encoder e;
+
+  if (!PyArg_ParseTupleAndKeywords(
+          args, kw, "OO|ii", kwlist, &obj, &spec_args, &utf8strings, &protoid)) {
+    return NULL;
+  }
+  if (protoid != PROTO_BINARY && protoid != PROTO_COMPACT) {
+    PyErr_Format(PyExc_ValueError, "unsupported protocol id %d", protoid);
+    return NULL;
+  }
+  if ((spec = seq_item(spec_args, 1)) == NULL ||
+      (union_flag = seq_item(spec_args, 2)) == NULL) {
+    return NULL;
+  }
+  is_union = PyObject_IsTrue(union_flag);
+  if (is_union < 0) {
+    return NULL;
+  }
+  memset(&e, 0, sizeof(e));
+  e.protoid = protoid;
+  e.utf8strings = utf8strings;
+  if (enc_struct(&e, obj, spec, is_union) == 0) {
+    ret = PyBytes_FromStringAndSize(e.buf, e.len);
+  }
+  PyMem_Free(e.buf);
+  return ret;
+}
+
+/* ------------------------------------------------------------------------ */
+/* module                                                                   */
+/* ------------------------------------------------------------------------ */
+
+static PyMethodDef fastproto_methods[] = {
+    {"decode", (PyCFunction)(void (*)(void))fastproto_decode,
+     METH_VARARGS | METH_KEYWORDS,
+     "decode(obj, trans, spec, utf8strings=0, protoid=0)\n\n"
+     "Decode a struct described by spec=[cls, thrift_spec, is_union] from the\n"
+     "cstringio_buf of a CReadableTransport into obj."},
+    {"offsets", (PyCFunction)(void (*)(void))fastproto_offsets,
+     METH_VARARGS | METH_KEYWORDS,
+     "offsets(trans, ttype, count, protoid=0) -> list\n\n"
+     "Skip count consecutive values of ttype from the cstringio_buf of a\n"
+     "CReadableTransport, returning the buffer position of each of them\n"
+     "followed by the position after the last one."},
+    {"decode_column", (PyCFunction)(void (*)(void))fastproto_decode_column,
+     METH_VARARGS | METH_KEYWORDS,
+     "decode_column(trans, count, field, index, ttype, args, utf8strings=0,\n"
+     "              protoid=0) -> list\n\n"
+     "For count consecutive structs, decode element index of their list\n"
+     "field `field` as ttype with the spec type args, None when missing, and\n"
+     "skip all the rest."},
+    {"encode", (PyCFunction)(void (*)(void))fastproto_encode,
+     METH_VARARGS | METH_KEYWORDS,
+     "encode(obj, spec, utf8strings=0, protoid=0) -> bytes\n\n"
+     "Encode obj as described by spec=[cls, thrift_spec, is_union]."},
+    {NULL, NULL, 0, NULL},
+};
+
+static struct PyModuleDef fastproto_module = {
+    PyModuleDef_HEAD_INIT,
+    "fastproto",
+    "Native thrift_spec driven codec for the binary and compact protocols.",
+    -1,
+    fastproto_methods,
+};
+
+PyMODINIT_FUNC PyInit_fastproto(void) {
+#define INTERN(var, s)                         \
+  if ((var = PyUnicode_InternFromString(s)) == NULL) { \
+    return NULL;                               \
+  }
+  INTERN(str_cstringio_buf, "cstringio_buf");
+  INTERN(str_cstringio_refill, "cstringio_refill");
+  INTERN(str_getbuffer, "getbuffer");
+  INTERN(str_tell, "tell");
+  INTERN(str_seek, "seek");
+  INTERN(str_read, "read");
+  INTERN(str_field, "field");
+  INTERN(str_value, "value");
+#undef INTERN
+  if ((empty_tuple = PyTuple_New(0)) == NULL) {
+    return NULL;
+  }
+  if ((int_zero = PyLong_FromLong(0)) == NULL) {
+    return NULL;
+  }
+  return PyModule_Create(&fastproto_module);
+}
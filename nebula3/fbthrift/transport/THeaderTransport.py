@@ -38,7 +38,7 @@ import zlib
 from nebula3.fbthrift.Thrift import TApplicationException
 from nebula3.fbthrift.protocol.TBinaryProtocol import TBinaryProtocol
 from nebula3.fbthrift.transport.TTransport import (
-    TTransportException, TTransportBase, CReadableTransport
+    TTransportException, TTransportBase, CReadableTransport, read_buffer
 )
 from nebula3.fbthrift.protocol.TCompactProtocol import (
     getVarint, readVarint, TCompactProtocol
@@ -108,6 +108,14 @@ class TRANSFORM:
     ZSTD = 0x05
 
 
+# The transforms that compress the payload, by name
+COMPRESSION_TRANSFORMS = {
+    'zlib': TRANSFORM.ZLIB,
+    'snappy': TRANSFORM.SNAPPY,
+    'zstd': TRANSFORM.ZSTD,
+}
+
+
 class INFO:
     NORMAL = 1
     PERSISTENT = 2
@@ -115,6 +123,12 @@ class INFO:
 
 T_BINARY_PROTOCOL = 0
 T_COMPACT_PROTOCOL = 2
+
+# The protocols the payload can be encoded with, by name
+PROTOCOLS = {
+    'binary': T_BINARY_PROTOCOL,
+    'compact': T_COMPACT_PROTOCOL,
+}
 HEADER_MAGIC = 0x0FFF0000
 PACKED_HEADER_MAGIC = pack(b'!H', HEADER_MAGIC >> 16)
 HEADER_MASK = 0xFFFF0000
@@ -149,6 +163,7 @@ class THeaderTransport(TTransportBase, CReadableTransport):
         self.__flags = 0
         self.__read_transforms = []
         self.__write_transforms = []
+        self.__min_compress_size = 0
         self.__supported_client_types = set(client_types or
                                             (CLIENT_TYPE.HEADER,))
         self.__proto_id = T_COMPACT_PROTOCOL  # default to compact like c++
@@ -204,6 +219,14 @@ class THeaderTransport(TTransportBase, CReadableTransport):
     def set_protocol_id(self, proto_id):
         self.__proto_id = proto_id
 
+    def set_protocol(self, name):
+        """Encode the requests with the protocol called name, one of
+        PROTOCOLS"""
+        if name not in PROTOCOLS:
+            raise ValueError('Unknown protocol: %s, expected one of %s' %
+                             (name, ', '.join(sorted(PROTOCOLS))))
+        self.__proto_id = PROTOCOLS[name]
+
     def set_header(self, str_key, str_value):
         self.__write_headers[str_key] = str_value
 
@@ -228,6 +251,23 @@ class THeaderTransport(TTransportBase, CReadableTransport):
     def add_transform(self, trans_id):
         self.__write_transforms.append(trans_id)
 
+    def set_min_compress_size(self, size):
+        """Send payloads smaller than size without the write transforms"""
+        self.__min_compress_size = size
+
+    def set_compression(self, name, min_size=0):
+        """Compress the payloads of at least min_size bytes with the
+        transform called name, one of COMPRESSION_TRANSFORMS"""
+        if name not in COMPRESSION_TRANSFORMS:
+            raise ValueError('Unknown compression: %s, expected one of %s' %
+                             (name, ', '.join(sorted(COMPRESSION_TRANSFORMS))))
+        trans_id = COMPRESSION_TRANSFORMS[name]
+        # fail now rather than on the first request if the module is missing
+        self.transform(b'', [trans_id])
+        if trans_id not in self.__write_transforms:
+            self.__write_transforms.append(trans_id)
+        self.__min_compress_size = min_size
+
     def _reset_protocol(self):
         # HTTP calls that are one way need to flush here.
         if self.__client_type == CLIENT_TYPE.HTTP_SERVER:
@@ -303,14 +343,12 @@ class THeaderTransport(TTransportBase, CReadableTransport):
                 self.__client_type = CLIENT_TYPE.FRAMED_COMPACT
                 self.__proto_id = T_COMPACT_PROTOCOL
                 _frame_size_check(sz, self.__max_frame_size, header=False)
-                self.__rbuf = StringIO(magic + self.getTransport().readAll(
-                    sz - 2))
+                self.__rbuf = read_buffer(self.getTransport(), magic, sz)
             elif proto_id == TBinaryProtocol.PROTOCOL_ID:
                 self.__client_type = CLIENT_TYPE.FRAMED_DEPRECATED
                 self.__proto_id = T_BINARY_PROTOCOL
                 _frame_size_check(sz, self.__max_frame_size, header=False)
-                self.__rbuf = StringIO(magic + self.getTransport().readAll(
-                    sz - 2))
+                self.__rbuf = read_buffer(self.getTransport(), magic, sz)
             elif magic == PACKED_HEADER_MAGIC:
                 self.__client_type = CLIENT_TYPE.HEADER
                 _frame_size_check(sz, self.__max_frame_size)
@@ -318,12 +356,16 @@ class THeaderTransport(TTransportBase, CReadableTransport):
                 n_header_meta = self.getTransport().readAll(8)
                 self.__flags, self.seq_id, header_size = unpack('!HIH',
                                                                 n_header_meta)
-                data = StringIO()
-                data.write(magic)
-                data.write(n_header_meta)
-                data.write(self.getTransport().readAll(sz - 10))
-                data.seek(10)
-                self.read_header_format(sz - 10, header_size, data)
+                # Only the (small) header goes through an intermediate
+                # string, the payload is received straight into the read
+                # buffer, see read_buffer.
+                if header_size * 4 > sz - 10:
+                    raise TTransportException(
+                        TTransportException.INVALID_FRAME_SIZE,
+                        "Header size is larger than frame")
+                data = StringIO(self.getTransport().readAll(header_size * 4))
+                self._read_header_info(sz - 10, header_size, data)
+                self.__rbuf = self._read_payload(sz - 10 - header_size * 4)
             else:
                 self.__client_type = CLIENT_TYPE.UNKNOWN
                 raise TTransportException(
@@ -336,6 +378,22 @@ class THeaderTransport(TTransportBase, CReadableTransport):
                                       .format(self.__client_type))
 
     def read_header_format(self, sz, header_size, data):
+        self._read_header_info(sz, header_size, data)
+        header_size = header_size * 4
+        payload = data.read(sz - header_size)
+
+        # Read the data section.
+        self.__rbuf = StringIO(self.untransform(payload))
+
+    def _read_payload(self, sz):
+        """Read the data section of a header frame from the transport"""
+        if not self.__read_transforms:
+            return read_buffer(self.getTransport(), b'', sz)
+        payload = bytearray(sz)
+        self.getTransport().readAllInto(payload)
+        return StringIO(self.untransform(payload))
+
+    def _read_header_info(self, sz, header_size, data):
         # clear out any previous transforms
         self.__read_transforms = []
 
@@ -389,16 +447,13 @@ class THeaderTransport(TTransportBase, CReadableTransport):
         # Skip the rest of the header
         data.seek(end_header)
 
-        payload = data.read(sz - header_size)
-
-        # Read the data section.
-        self.__rbuf = StringIO(self.untransform(payload))
-
     def write(self, buf):
         self.__wbuf.write(buf)
 
-    def transform(self, buf):
-        for trans_id in self.__write_transforms:
+    def transform(self, buf, transforms=None):
+        if transforms is None:
+            transforms = self.__write_transforms
+        for trans_id in transforms:
             if trans_id == TRANSFORM.ZLIB:
                 buf = zlib.compress(buf)
             elif trans_id == TRANSFORM.SNAPPY:
@@ -428,17 +483,22 @@ class THeaderTransport(TTransportBase, CReadableTransport):
     def onewayFlush(self):
         self.flushImpl(True)
 
-    def _flushHeaderMessage(self, buf, wout, wsz):
-        """Write a message for CLIENT_TYPE.HEADER
+    def _flushHeaderMessage(self, buf, wout, wsz, transforms=None):
+        """Write the framing and header of a message for CLIENT_TYPE.HEADER,
+        the payload itself is written by flushImpl
 
-        @param buf(StringIO): Buffer to write message to
+        @param buf(StringIO): Buffer to write the header to
         @param wout(str): Payload
         @param wsz(int): Payload length
+        @param transforms(list): Transforms applied to the payload, defaults
+                                 to all the write transforms
         """
+        if transforms is None:
+            transforms = self.__write_transforms
         transform_data = StringIO()
         # For now, all transforms don't require data.
-        num_transforms = len(self.__write_transforms)
-        for trans_id in self.__write_transforms:
+        num_transforms = len(transforms)
+        for trans_id in transforms:
             transform_data.write(getVarint(trans_id))
 
         # Add in special flags.
@@ -487,12 +547,13 @@ class THeaderTransport(TTransportBase, CReadableTransport):
         for _ in range(0, padding_size, 1):
             buf.write(pack("!c", b'\0'))
 
-        # Send data section
-        buf.write(wout)
-
     def flushImpl(self, oneway):
         wout = self.__wbuf.getvalue()
-        wout = self.transform(wout)
+        transforms = self.__write_transforms
+        if len(wout) < self.__min_compress_size:
+            # not worth compressing, the header lists no transform
+            transforms = []
+        wout = self.transform(wout, transforms)
         wsz = len(wout)
 
         # reset wbuf before write/flush to preserve state on underlying failure
@@ -503,32 +564,34 @@ class THeaderTransport(TTransportBase, CReadableTransport):
             raise TTransportException(TTransportException.INVALID_CLIENT_TYPE,
                                       "Trying to send JSON encoding over binary")
 
+        # buf only gets the framing and header, the payload is written to
+        # the transport on its own instead of being copied after them.
         buf = StringIO()
         if self.__client_type == CLIENT_TYPE.HEADER:
-            self._flushHeaderMessage(buf, wout, wsz)
+            self._flushHeaderMessage(buf, wout, wsz, transforms)
         elif self.__client_type in (CLIENT_TYPE.FRAMED_DEPRECATED,
                                     CLIENT_TYPE.FRAMED_COMPACT):
             buf.write(pack("!i", wsz))
-            buf.write(wout)
         elif self.__client_type in (CLIENT_TYPE.UNFRAMED_DEPRECATED,
                                     CLIENT_TYPE.UNFRAMED_COMPACT_DEPRECATED):
-            buf.write(wout)
+            pass
         elif self.__client_type == CLIENT_TYPE.HTTP_SERVER:
             # Reset the client type if we sent something -
             # oneway calls via HTTP expect a status response otherwise
             buf.write(self.header.getvalue())
-            buf.write(wout)
             self.__client_type == CLIENT_TYPE.HEADER
         elif self.__client_type == CLIENT_TYPE.UNKNOWN:
             raise TTransportException(TTransportException.INVALID_CLIENT_TYPE,
                                       "Unknown client type")
 
         # We don't include the framing bytes as part of the frame size check
-        frame_size = buf.tell() - (4 if wsz < MAX_FRAME_SIZE else 12)
+        frame_size = buf.tell() + wsz - (4 if wsz < MAX_FRAME_SIZE else 12)
         _frame_size_check(frame_size,
                           self.__max_frame_size,
                           header=self.__client_type == CLIENT_TYPE.HEADER)
-        self.getTransport().write(buf.getvalue())
+        if buf.tell():
+            self.getTransport().write(buf.getvalue())
+        self.getTransport().write(wout)
         if oneway:
             self.getTransport().onewayFlush()
         else:
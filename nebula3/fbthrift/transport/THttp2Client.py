@@ -5,8 +5,60 @@
 from nebula3.fbthrift.transport.TTransport import *
 import httpx
 
+import threading
+
 default_timeout = 60
 
+
+class THttp2Channels(object):
+  """HTTP/2 clients shared by many THttp2Client transports.
+
+  Every client holds one HTTP/2 connection per server, and the requests of
+  all the transports using it are sent as concurrent streams on it. At most
+  `size` clients are created for each url and handed out in turn.
+  """
+
+  def __init__(self, size=1):
+    if size < 1:
+      raise ValueError("size must be greater than 0")
+    self.size = size
+    self.__clients = {}
+    self.__pos = {}
+    self.__lock = threading.Lock()
+    self.__closed = False
+
+  def get(self, url, factory):
+    """get a client for the url, `factory` creates a new one when needed"""
+    with self.__lock:
+      # a client created after close() would never be closed
+      if self.__closed:
+        raise TTransportException(TTransportException.NOT_OPEN,
+                                  "The http2 channels are closed")
+      clients = self.__clients.setdefault(url, [])
+      clients[:] = [c for c in clients if not c.is_closed]
+      if len(clients) < self.size:
+        clients.append(factory())
+        return clients[-1]
+      pos = (self.__pos.get(url, -1) + 1) % len(clients)
+      self.__pos[url] = pos
+      return clients[pos]
+
+  def count(self, url=None):
+    with self.__lock:
+      if url is not None:
+        return len(self.__clients.get(url, []))
+      return sum(len(clients) for clients in self.__clients.values())
+
+  def close(self):
+    with self.__lock:
+      self.__closed = True
+      for clients in self.__clients.values():
+        for client in clients:
+          client.close()
+      self.__clients.clear()
+      self.__pos.clear()
+
+
 class THttp2Client(TTransportBase):
   def __init__(self, url, 
                timeout=None, 
@@ -15,13 +67,14 @@ class THttp2Client(TTransportBase):
                keyfile=None, 
                password=None,
                http_headers=None,
+               channels=None,
                ):
     self.__wbuf = StringIO()
     self.__rbuf = StringIO()
     self.__http = None
     if timeout is not None and timeout > 0 :
       self.timeout = timeout
-    if timeout is None:
+    else:
       self.timeout = default_timeout
 
     self.url = url
@@ -35,18 +88,27 @@ class THttp2Client(TTransportBase):
       self.cert = None
     self.response = None
     self.http_headers = http_headers
+    # a THttp2Channels to borrow the client from instead of owning one
+    self.channels = channels
   
   def isOpen(self):
     return self.__http is not None and self.__http.is_closed is False
 
-  def open(self):
+  def _new_client(self):
     if self.cert is None:
-      self.__http = httpx.Client(http1=False,http2=True, verify=False, timeout=self.timeout)
+      return httpx.Client(http1=False,http2=True, verify=False, timeout=self.timeout)
+    return httpx.Client(http1=False,http2=True, verify=self.verify, cert=self.cert, timeout=self.timeout)
+
+  def open(self):
+    if self.channels is not None:
+      self.__http = self.channels.get(self.url, self._new_client)
     else:
-      self.__http = httpx.Client(http1=False,http2=True, verify=self.verify, cert=self.cert, timeout=self.timeout)
+      self.__http = self._new_client()
 
   def close(self):
-    self.__http.close()
+    # a shared client is closed by its channels
+    if self.__http is not None and self.channels is None:
+      self.__http.close()
     self.__http = None
 
   def read(self, sz):
@@ -57,11 +119,12 @@ class THttp2Client(TTransportBase):
     self.__wbuf.write(buf)
 
   def flush(self):
-    if self.isOpen():
-      self.close()
-    self.open()
+    # Keep one client for the lifetime of the transport so that the
+    # connection and its HTTP/2 streams are reused between requests.
+    if not self.isOpen():
+      self.open()
 
-      # Pull data out of buffer
+    # Pull data out of buffer
     data = self.__wbuf.getvalue()
     self.__wbuf = StringIO()
 
@@ -74,8 +137,11 @@ class THttp2Client(TTransportBase):
     if self.http_headers is not None and isinstance(self.http_headers, dict):
       header.update(self.http_headers)
     try:
-      self.response= self.__http.post(self.url, headers=header, data=data)
+      self.response= self.__http.post(self.url, headers=header, content=data)
     except Exception as e:
+      # The connection state is unknown, drop the client so that the next
+      # flush reconnects.
+      self.close()
       raise TTransportException(TTransportException.UNKNOWN, str(e))
     # Get reply to flush the request
     self.code = self.response.status_code
@@ -318,23 +318,39 @@ class TSocket(TSocketBase):
             )
         return buff
 
+    def readInto(self, buf):
+        try:
+            sz = self.handle.recv_into(buf)
+            if sz == 0:
+                raise TTransportException(type=TTransportException.END_OF_FILE,
+                                          message='TSocket read 0 bytes')
+        except socket.error as e:
+            raise TTransportException(
+                type=TTransportException.END_OF_FILE,
+                message='Socket read failed: {}'.format(str(e))
+            )
+        return sz
+
     def write(self, buff):
         if not self.handle:
             raise TTransportException(TTransportException.NOT_OPEN,
                     'Transport not open')
-        sent = 0
-        have = len(buff)
-        while sent < have:
-            try:
-                plus = self.handle.send(buff)
-            except socket.error as e:
-                raise TTransportException(
-                    type=TTransportException.END_OF_FILE,
-                    message='Socket write failed: {}'.format(str(e))
-                )
-            assert plus > 0
-            sent += plus
-            buff = buff[plus:]
+        # Send from a memoryview so that a partial send does not copy the
+        # rest of the buffer.  sendall() is not used as it would turn the
+        # socket timeout into a deadline for the whole buffer.
+        with memoryview(buff) as view:
+            sent = 0
+            have = view.nbytes
+            while sent < have:
+                try:
+                    plus = self.handle.send(view[sent:])
+                except socket.error as e:
+                    raise TTransportException(
+                        type=TTransportException.END_OF_FILE,
+                        message='Socket write failed: {}'.format(str(e))
+                    )
+                assert plus > 0
+                sent += plus
 
     def flush(self):
         pass
@@ -77,6 +77,30 @@ class TTransportBase(object):
             need -= len(chunk)
         return b''.join(chunks)
 
+    def readInto(self, buf):
+        """Read at most len(buf) bytes into the writable buffer buf.
+
+        Returns the number of bytes read.  Transports that can receive data
+        in place (e.g. with socket.recv_into) override this to avoid the
+        intermediate string.
+        """
+        data = self.read(len(buf))
+        sz = len(data)
+        buf[:sz] = data
+        return sz
+
+    def readAllInto(self, buf):
+        """Fill the writable buffer buf completely."""
+        with memoryview(buf) as view:
+            have = 0
+            need = view.nbytes
+            while have < need:
+                sz = self.readInto(view[have:])
+                if not sz:
+                    raise TTransportException(TTransportException.END_OF_FILE,
+                                              "End of file reading from transport")
+                have += sz
+
     def write(self, buf):
         pass
 
@@ -87,6 +111,35 @@ class TTransportBase(object):
         self.flush()
 
 
+def read_buffer(trans, prefix, reqlen, size=0):
+    """Read from trans into a new StringIO that starts with prefix.
+
+    At least reqlen bytes (prefix included) and at most max(reqlen, size) are
+    held by the returned buffer, which is positioned at its start.  The data
+    is received with readInto straight into the storage of the StringIO, so
+    a large frame is not copied again before it is decoded.
+    """
+    cap = max(reqlen, size)
+    have = len(prefix)
+    buf = StringIO()
+    if have:
+        buf.write(bytes(prefix))
+    if have < reqlen:
+        # grow the buffer to its final size in one go
+        buf.seek(cap - 1)
+        buf.write(b'\0')
+        with buf.getbuffer() as view:
+            while have < reqlen:
+                sz = trans.readInto(view[have:])
+                if not sz:
+                    raise TTransportException(TTransportException.END_OF_FILE,
+                                              "End of file reading from transport")
+                have += sz
+        buf.truncate(have)
+    buf.seek(0)
+    return buf
+
+
 # This class should be thought of as an interface.
 class CReadableTransport:
     """base class for transports that are readable from C"""
@@ -183,6 +236,16 @@ class TBufferedTransport(TTransportBase, CReadableTransport):
         self.__rbuf = StringIO(self.__trans.read(max(sz, self.__rbuf_size)))
         return self.__rbuf.read(sz)
 
+    def readInto(self, buf):
+        sz = self.__rbuf.readinto(buf)
+        if sz:
+            return sz
+        if len(buf) >= self.__rbuf_size:
+            # large reads go straight to the caller's buffer
+            return self.__trans.readInto(buf)
+        self.__rbuf = read_buffer(self.__trans, b"", 1, self.__rbuf_size)
+        return self.__rbuf.readinto(buf)
+
     def write(self, buf):
         self.__wbuf.write(buf)
 
@@ -199,16 +262,10 @@ class TBufferedTransport(TTransportBase, CReadableTransport):
         return self.__rbuf
 
     def cstringio_refill(self, partialread, reqlen):
-        retstring = partialread
-        if reqlen < self.__rbuf_size:
-            # try to make a read of as much as we can.
-            retstring += self.__trans.read(self.__rbuf_size)
-
-        # but make sure we do read reqlen bytes.
-        if len(retstring) < reqlen:
-            retstring += self.__trans.readAll(reqlen - len(retstring))
-
-        self.__rbuf = StringIO(retstring)
+        # read at least reqlen bytes, and as much as fits in the buffer
+        # size if it is available.
+        self.__rbuf = read_buffer(
+            self.__trans, partialread, reqlen, len(partialread) + self.__rbuf_size)
         return self.__rbuf
 
 
@@ -248,6 +305,12 @@ class TMemoryBuffer(TTransportBase, CReadableTransport):
         else:
             raise RuntimeError("Buffer already closed!")
 
+    def readInto(self, buf):
+        if self._open:
+            return self._readBuffer.readinto(buf)
+        else:
+            raise RuntimeError("Buffer already closed!")
+
     def write(self, buf):
         if self._open:
             self._writeBuffer.write(buf)
@@ -314,7 +377,7 @@ class TFramedTransport(TTransportBase, CReadableTransport):
     def readFrame(self):
         buff = self.__trans.readAll(4)
         sz, = unpack(b'!i', buff)
-        self.__rbuf = StringIO(self.__trans.readAll(sz))
+        self.__rbuf = read_buffer(self.__trans, b"", sz)
 
     def write(self, buf):
         self.__wbuf.write(buf)
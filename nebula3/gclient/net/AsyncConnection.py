@@ -0,0 +1,340 @@
+# --coding:utf-8--
+#
+# Copyright (c) 2026 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License.
+
+
+import asyncio
+import ssl
+import struct
+import time
+
+from nebula3.fbthrift.protocol import THeaderProtocol
+from nebula3.fbthrift.transport import THeaderTransport
+from nebula3.fbthrift.transport.THeaderTransport import MAX_FRAME_SIZE
+from nebula3.fbthrift.util.async_common import TReadWriteBuffer, TWriteOnlyBuffer
+
+from nebula3.common.ttypes import ErrorCode
+from nebula3.graph import GraphService
+from nebula3.graph.ttypes import VerifyClientVersionReq
+from nebula3.logger import logger
+
+from nebula3.Exception import (
+    AuthFailedException,
+    IOErrorException,
+    ClientServerIncompatibleException,
+)
+
+from nebula3.gclient.net.AuthResult import AuthResult
+from nebula3.data.LazyDataSet import recv_execute_with_parameter
+
+
+def ssl_context(ssl_config):
+    """build the ssl.SSLContext of asyncio from a SSL_config
+
+    :param ssl_config: SSL_config
+    :return: ssl.SSLContext
+    """
+    context = ssl.create_default_context(cafile=ssl_config.ca_certs)
+    if ssl_config.certfile is not None:
+        context.load_cert_chain(ssl_config.certfile, ssl_config.keyfile)
+    if not ssl_config.verify_name or ssl_config.cert_reqs == ssl.CERT_NONE:
+        context.check_hostname = False
+    if ssl_config.cert_reqs is not None:
+        context.verify_mode = ssl_config.cert_reqs
+    return context
+
+
+class AsyncHeaderConnection(object):
+    """The header transport over the asyncio streams. The requests are
+    encoded and the replies decoded by a thrift client over memory buffers,
+    the frames are sent and received with the streams. A request cancelled
+    or timed out leaves its reply unread, the connection is closed then.
+    The subclasses serialize the requests.
+    """
+
+    def __init__(self):
+        self._reader = None
+        self._writer = None
+        self._client = None
+        self._sending = None
+        self._timeout = 0
+
+    def _peer(self):
+        """the address of the server for the messages"""
+        raise NotImplementedError
+
+    async def _connect(self, host, port, ssl=None, server_hostname=None):
+        try:
+            self._reader, self._writer = await self._wait(
+                asyncio.open_connection(
+                    host, port, ssl=ssl, server_hostname=server_hostname
+                )
+            )
+        except asyncio.TimeoutError:
+            raise IOErrorException(
+                IOErrorException.E_TIMEOUT,
+                "Connect {} timed out".format(self._peer()),
+            )
+        except OSError as e:
+            raise IOErrorException(IOErrorException.E_CONNECT_BROKEN, str(e))
+
+    def _header_client(
+        self, client_class, protocol=None, compression=None, compression_min_size=0
+    ):
+        """build the client that encodes the requests into self._sending"""
+        self._sending = TWriteOnlyBuffer()
+        header_transport = THeaderTransport.THeaderTransport(self._sending)
+        if protocol is not None:
+            header_transport.set_protocol(protocol)
+        if compression is not None:
+            header_transport.set_compression(compression, compression_min_size)
+        self._client = client_class(THeaderProtocol.THeaderProtocol(header_transport))
+
+    async def _wait(self, aw):
+        if self._timeout > 0:
+            return await asyncio.wait_for(aw, self._timeout / 1000.0)
+        return await aw
+
+    async def _exchange(self, name, *args, oneway=False):
+        """send the request of the method and read the frame of its reply,
+        the reply is decoded by the caller with self._reader_client
+
+        :return: the frame, or None for a oneway method
+        """
+        if self._writer is None:
+            raise IOErrorException(
+                IOErrorException.E_NOT_OPEN, "The connection is closed"
+            )
+        try:
+            getattr(self._client, 'send_' + name)(*args)
+            self._writer.write(self._sending.getvalue())
+            self._sending.reset()
+            if oneway:
+                await self._wait(self._writer.drain())
+                return None
+            return await self._wait(self._read_frame())
+        except asyncio.TimeoutError:
+            self.close()
+            raise IOErrorException(
+                IOErrorException.E_TIMEOUT,
+                "Call {} to {} timed out".format(name, self._peer()),
+            )
+        except (asyncio.CancelledError, IOErrorException):
+            self.close()
+            raise
+        except (OSError, asyncio.IncompleteReadError) as e:
+            self.close()
+            raise IOErrorException(IOErrorException.E_CONNECT_BROKEN, str(e))
+
+    async def _read_frame(self):
+        await self._writer.drain()
+        head = await self._reader.readexactly(4)
+        (size,) = struct.unpack('!I', head)
+        if size == 0 or size > MAX_FRAME_SIZE:
+            # out of step with the server, do not buffer what it claims
+            raise IOErrorException(
+                IOErrorException.E_CONNECT_BROKEN,
+                "Invalid frame size {} from {}".format(size, self._peer()),
+            )
+        return head + await self._reader.readexactly(size)
+
+    def _reader_client(self, frame):
+        """the client to decode the reply in frame, every reply is read from
+        its own buffer, a lazy result keeps it"""
+        self._client._iprot = THeaderProtocol.THeaderProtocol(TReadWriteBuffer(frame))
+        return self._client
+
+    def close(self):
+        """close the connection
+
+        :return: void
+        """
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+class AsyncConnection(AsyncHeaderConnection):
+    """The connection to graphd for asyncio, it speaks the header transport
+    as Connection does, see AsyncHeaderConnection. One request is on the
+    connection at a time.
+    """
+
+    is_used = False
+
+    def __init__(self):
+        super().__init__()
+        self._lock = asyncio.Lock()
+        self.start_use_time = time.time()
+        # the time of the last successful call, see Config.validation_policy
+        self.last_used_time = time.time()
+        self._ip = None
+        self._port = None
+        self.lazy_decode = False
+
+    def _peer(self):
+        return "{}:{}".format(self._ip, self._port)
+
+    async def open(
+        self,
+        ip,
+        port,
+        timeout,
+        ssl_config=None,
+        compression=None,
+        compression_min_size=0,
+        protocol=None,
+        lazy_decode=False,
+    ):
+        """open the connection
+
+        :param ip: the server ip
+        :param port: the server port
+        :param timeout: the timeout for connect and execute, unit ms
+        :param ssl_config: configs for SSL
+        :param compression: 'zlib', 'snappy' or 'zstd' to compress the requests
+        :param compression_min_size: the min size of the requests to compress
+        :param protocol: 'binary' or 'compact', the thrift protocol of the requests
+        :param lazy_decode: decode the rows of the results when they are used
+        :return: void
+        """
+        self._ip = ip
+        self._port = port
+        self._timeout = timeout
+        self.lazy_decode = lazy_decode
+        context = None
+        server_hostname = None
+        if ssl_config is not None:
+            context = ssl_context(ssl_config)
+            if isinstance(ssl_config.verify_name, str):
+                server_hostname = ssl_config.verify_name
+        await self._connect(ip, port, ssl=context, server_hostname=server_hostname)
+        self._header_client(
+            GraphService.Client, protocol, compression, compression_min_size
+        )
+        try:
+            resp = await self._call('verifyClientVersion', VerifyClientVersionReq())
+            if resp.error_code != ErrorCode.SUCCEEDED:
+                raise ClientServerIncompatibleException(resp.error_msg)
+        except BaseException:
+            self.close()
+            raise
+
+    async def _call(self, name, *args):
+        """send the request of the method and receive its reply"""
+        async with self._lock:
+            frame = await self._exchange(name, *args, oneway=name == 'signout')
+        if frame is None:
+            return None
+        client = self._reader_client(frame)
+        if name == 'executeWithParameter' and self.lazy_decode:
+            resp = recv_execute_with_parameter(client)
+        else:
+            resp = getattr(client, 'recv_' + name)()
+        self.last_used_time = time.time()
+        return resp
+
+    async def authenticate(self, user_name, password):
+        """authenticate to graphd
+
+        :param user_name: the user name
+        :param password: the password
+        :return: AuthResult
+        """
+        resp = await self._call('authenticate', user_name, password)
+        if resp.error_code != ErrorCode.SUCCEEDED:
+            raise AuthFailedException(resp.error_msg)
+        return AuthResult(
+            resp.session_id, resp.time_zone_offset_seconds, resp.time_zone_name
+        )
+
+    async def execute(self, session_id, stmt):
+        """execute interface with session_id and ngql
+
+        :param session_id: the session id get from result of authenticate interface
+        :param stmt: the ngql
+        :return: ExecutionResponse
+        """
+        return await self.execute_parameter(session_id, stmt, None)
+
+    async def execute_parameter(self, session_id, stmt, params):
+        """execute interface with session_id and ngql
+
+        :param session_id: the session id get from result of authenticate interface
+        :param stmt: the ngql
+        :param params: parameter map
+        :return: ExecutionResponse
+        """
+        return await self._call('executeWithParameter', session_id, stmt, params)
+
+    async def execute_json_with_parameter(self, session_id, stmt, params):
+        """execute_json interface with session_id and ngql with parameter
+
+        :param session_id: the session id get from result of authenticate interface
+        :param stmt: the ngql
+        :param params: parameter map
+        :return: json bytes representing the execution result
+        """
+        resp = await self._call('executeJsonWithParameter', session_id, stmt, params)
+        if not isinstance(resp, bytes):
+            raise TypeError("response is not bytes")
+        return resp
+
+    async def signout(self, session_id):
+        """tells the graphd can release the session info
+
+        :param session_id: the session id
+        :return: void
+        """
+        try:
+            await self._call('signout', session_id)
+        except IOErrorException as e:
+            logger.warning("Signout failed: {}".format(e))
+
+    async def ping(self):
+        """check the connection if ok
+
+        :return: True or False
+        """
+        try:
+            await self._call('executeWithParameter', 0, "YIELD 1;", None)
+            return True
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            return False
+
+    def is_closed(self):
+        return self._writer is None
+
+    def reset(self):
+        """reset the idletime
+
+        :return: void
+        """
+        self.start_use_time = time.time()
+
+    def idle_time(self):
+        """get idletime of connection
+
+        :return: idletime
+        """
+        if self.is_used:
+            return 0
+        return (time.time() - self.start_use_time) * 1000
+
+    def unused_time(self):
+        """get the time since the last successful call, unit ms
+
+        :return: float
+        """
+        return (time.time() - self.last_used_time) * 1000
+
+    def get_address(self):
+        """get the address of the connected service
+
+        :return: (ip, port)
+        """
+        return (self._ip, self._port)
@@ -0,0 +1,602 @@
+# --coding:utf-8--
+#
+# Copyright (c) 2026 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License.
+
+
+import asyncio
+import contextlib
+import socket
+import time
+
+from collections import deque
+from typing import Deque, Dict, List, Tuple
+
+from nebula3.Exception import NotValidConnectionException, InValidHostname
+
+from nebula3.gclient.net.AsyncConnection import AsyncConnection
+from nebula3.gclient.net.AsyncSession import AsyncSession
+from nebula3.gclient.net.ConnectionPool import IDLE_CHECK_WORKERS
+from nebula3.gclient.net.HealthCheck import CircuitBreaker
+from nebula3.gclient.net.LoadBalancer import create_load_balancer
+from nebula3.gclient.net.WaitQueue import AsyncWaitQueue
+from nebula3.Config import Config
+from nebula3.logger import logger
+
+
+class AsyncConnectionPool(object):
+    """The ConnectionPool of asyncio, all the network I/O is done in the event
+    loop: connecting, authenticating and the health checks. A task cancelled
+    while it waits for a connection or a reply leaves the pool consistent.
+    It takes the same Config, except http2 which is not supported.
+
+        pool = AsyncConnectionPool()
+        await pool.init([('127.0.0.1', 9669)], Config())
+        async with pool.session_context('root', 'nebula') as session:
+            result = await session.execute_py('YIELD $a', {'a': 1})
+        await pool.close()
+    """
+
+    S_OK = 0
+    S_BAD = 1
+
+    VALIDATION_POLICIES = ('always', 'idle', 'background', 'never')
+
+    def __init__(self):
+        # all addresses of servers
+        self._addresses: List[Tuple[str, int]] = list()
+
+        # server's status
+        self._addresses_status = dict()
+        # the circuit breakers of the servers, they decide the status
+        self._breakers: Dict[Tuple[str, int], CircuitBreaker] = dict()
+
+        # all connections
+        self._connections: Dict[Tuple[str, int], List[AsyncConnection]] = dict()
+        # the idle connections, the last returned is handed out first
+        self._idle_connections: Dict[Tuple[str, int], Deque[AsyncConnection]] = dict()
+        # the number of connections being opened, they count for the max size
+        self._opening: Dict[Tuple[str, int], int] = dict()
+        # the tasks waiting for a connection when the pool is full
+        self._waiters = AsyncWaitQueue()
+        self._configs = None
+        self._ssl_configs = None
+        self._load_balancer = None
+        self._close = False
+        # the tasks of the periodic check and of the background health check
+        self._detect_task = None
+        self._check_task = None
+
+    async def init(self, addresses, configs=None, ssl_conf=None):
+        """init the connection pool
+
+        :param addresses: the graphd servers' addresses
+        :param configs: the config of the pool
+        :param ssl_conf: the config of SSL socket
+        :return: if all addresses are ok, return True else return False.
+        """
+        if self._close:
+            logger.error("The pool has init or closed.")
+            raise RuntimeError("The pool has init or closed.")
+        if configs is None:
+            self._configs = Config()
+        else:
+            assert isinstance(
+                configs, Config
+            ), "wrong type of Config, try this: `from nebula3.Config import Config`"
+            self._configs = configs
+        if self._configs.use_http2:
+            raise ValueError("http2 is not supported by AsyncConnectionPool")
+        if self._configs.validation_policy not in self.VALIDATION_POLICIES:
+            raise ValueError(
+                "Unknown validation policy: {}".format(self._configs.validation_policy)
+            )
+        self._load_balancer = create_load_balancer(self._configs.load_balancer)
+        self._ssl_configs = ssl_conf
+        loop = asyncio.get_running_loop()
+        for address in addresses:
+            try:
+                ip = await loop.run_in_executor(None, socket.gethostbyname, address[0])
+            except Exception:
+                raise InValidHostname(str(address[0]))
+            ip_port = (ip, address[1])
+            if ip_port in self._addresses:
+                continue
+            self._addresses.append(ip_port)
+            self._addresses_status[ip_port] = self.S_BAD
+            self._breakers[ip_port] = CircuitBreaker(
+                self._configs.breaker_failure_threshold,
+                self._configs.breaker_reset_timeout,
+            )
+            self._connections[ip_port] = list()
+            self._idle_connections[ip_port] = deque()
+            self._opening[ip_port] = 0
+        await self.update_servers_status()
+
+        # detect the services
+        if self._configs.interval_check > 0:
+            self._detect_task = asyncio.ensure_future(self._period_detect())
+
+        ok_num = self.get_ok_servers_num()
+        if ok_num < len(self._addresses):
+            raise RuntimeError(
+                "The services status exception: {}".format(self._get_services_status())
+            )
+
+        conns_per_address = int(self._configs.min_connection_pool_size / ok_num)
+        await self._fill_idle_connections(
+            max(conns_per_address, self._configs.min_idle_size)
+        )
+        return True
+
+    async def get_session(self, user_name, password, retry_connect=True):
+        """get session
+
+        :param user_name: the user name to authenticate graphd
+        :param password: the password to authenticate graphd
+        :param retry_connect: get another connection when the connection is broken
+        :return: AsyncSession
+        """
+        connection = await self.get_connection()
+        if connection is None:
+            raise NotValidConnectionException()
+        try:
+            auth_result = await connection.authenticate(user_name, password)
+            return AsyncSession(connection, auth_result, self, retry_connect)
+        except BaseException:
+            self.return_connection(connection)
+            raise
+
+    @contextlib.asynccontextmanager
+    async def session_context(self, *args, **kwargs):
+        """get a session as get_session, it is released when the context exits
+
+        :param user_name: the user name to authenticate graphd
+        :param password: the password to authenticate graphd
+        :param retry_connect: if auto retry connect
+        :return: contextlib._AsyncGeneratorContextManager
+        """
+        session = await self.get_session(*args, **kwargs)
+        try:
+            yield session
+        finally:
+            await session.release()
+
+    async def get_connection(self):
+        """get available connection, it waits up to Config.acquire_timeout for
+        a connection given back when the pool is full
+
+        :return: AsyncConnection
+        """
+        if self._close:
+            logger.error("The pool is closed")
+            raise NotValidConnectionException()
+        waiter = None
+        try:
+            while True:
+                connection = await self._get_connection()
+                if connection is not None:
+                    return connection
+
+                if waiter is None:
+                    if not self._can_wait():
+                        logger.error("No available connection")
+                        return None
+                    if 0 < self._configs.max_waiters <= len(self._waiters):
+                        self._waiters.rejections += 1
+                        logger.error("Too many callers wait for a connection")
+                        return None
+                    waiter = self._waiters.push()
+                else:
+                    # another task took the room, wait again in the front
+                    self._waiters.push(waiter)
+                remaining = (
+                    waiter.start_time
+                    + self._configs.acquire_timeout / 1000.0
+                    - time.time()
+                )
+                signalled = remaining > 0 and await waiter.wait(remaining)
+                connection, waiter.item = waiter.item, None
+                if not signalled and connection is None:
+                    self._waiters.done(waiter, timed_out=True)
+                    waiter = None
+                    logger.error("Wait for an available connection timed out")
+                    return None
+                if connection is None:
+                    continue
+                if not self._need_validation(connection) or await self._ping_taken(
+                    connection
+                ):
+                    return connection
+        except asyncio.CancelledError:
+            if waiter is not None:
+                if waiter.item is not None:
+                    self.return_connection(waiter.item)
+                    waiter.item = None
+                self._waiters.done(waiter, timed_out=True)
+                waiter = None
+            raise
+        finally:
+            if waiter is not None:
+                self._waiters.done(waiter)
+
+    async def _get_connection(self):
+        tried = set()
+        while True:
+            if self._close:
+                logger.error("The pool is closed")
+                raise NotValidConnectionException()
+            ok_num = self.get_ok_servers_num()
+            if ok_num == 0:
+                logger.error("No available server")
+                return None
+            max_con_per_address = int(self._configs.max_connection_pool_size / ok_num)
+            candidates = [
+                addr
+                for addr in self._addresses
+                if self._addresses_status[addr] == self.S_OK and addr not in tried
+            ]
+            if not candidates:
+                return None
+            addr = self._load_balancer.select(candidates)
+            tried.add(addr)
+            idle = self._idle_connections[addr]
+            while idle:
+                connection = idle.pop()
+                connection.is_used = True
+                if not self._need_validation(connection) or await self._ping_taken(
+                    connection
+                ):
+                    logger.info("Get connection to {}".format(addr))
+                    return connection
+            if len(self._connections[addr]) + self._opening[addr] < max_con_per_address:
+                self._opening[addr] += 1
+                connection = await self._open_connection(addr)
+                if connection is not None:
+                    logger.info("Get connection to {}".format(addr))
+                    return connection
+
+    async def _ping_taken(self, connection):
+        """ping a connection taken out of the pool, it is removed if it is broken"""
+        try:
+            if await connection.ping():
+                return True
+        except asyncio.CancelledError:
+            self._remove_connection(connection)
+            raise
+        self._remove_connection(connection)
+        return False
+
+    async def _open_connection(self, addr):
+        """open a new connection to addr in the room reserved by the caller
+
+        :return: AsyncConnection or None
+        """
+        connection = AsyncConnection()
+        try:
+            await connection.open(
+                addr[0],
+                addr[1],
+                self._configs.timeout,
+                self._ssl_configs,
+                self._configs.compression,
+                self._configs.compression_min_size,
+                self._configs.protocol,
+                self._configs.lazy_decode,
+            )
+        except asyncio.CancelledError:
+            self._opening[addr] -= 1
+            self._waiters.wake()
+            raise
+        except Exception as ex:
+            logger.warning("Connect {}:{} failed: {}".format(addr[0], addr[1], ex))
+            self._opening[addr] -= 1
+            self._update_server_status(addr, False)
+            self._waiters.wake()
+            return None
+        self._opening[addr] -= 1
+        if self._close:
+            connection.close()
+            raise NotValidConnectionException()
+        connection.is_used = True
+        self._connections[addr].append(connection)
+        return connection
+
+    def _can_wait(self):
+        """a connection may be given back to the full pool"""
+        if self._configs.acquire_timeout <= 0:
+            return False
+        for addr in self._addresses:
+            in_use = len(self._connections[addr]) - len(self._idle_connections[addr])
+            if in_use + self._opening[addr] > 0:
+                return True
+        return False
+
+    def _need_validation(self, connection):
+        policy = self._configs.validation_policy
+        if policy == 'always':
+            return True
+        if policy == 'idle':
+            return connection.unused_time() > self._configs.validation_idle_time
+        return False
+
+    def return_connection(self, connection):
+        """give back a connection got by get_connection, it is handed out again
+
+        :param connection: the AsyncConnection
+        :return: void
+        """
+        connection.is_used = False
+        connection.reset()
+        addr = connection.get_address()
+        if self._close or connection not in self._connections.get(addr, ()):
+            connection.close()
+            return
+        if connection.is_closed() or self._addresses_status.get(addr) != self.S_OK:
+            self._remove_connection(connection)
+            return
+        if self._waiters.hand_off(connection):
+            connection.is_used = True
+            return
+        self._idle_connections[addr].append(connection)
+
+    def _remove_connection(self, connection):
+        connection.close()
+        conns = self._connections.get(connection.get_address(), ())
+        if connection in conns:
+            conns.remove(connection)
+            # the room of the connection is free
+            self._waiters.wake()
+
+    def _drop_idle_connections(self, addr):
+        idle = self._idle_connections[addr]
+        while idle:
+            connection = idle.pop()
+            self._connections[addr].remove(connection)
+            connection.close()
+
+    async def _fill_idle_connections(self, idle_size):
+        """open the connections, Config.open_workers at the same time, until
+        every ok server has idle_size idle connections, within the max size
+        of the pool
+
+        :param idle_size: the idle connections of each server
+        :return: void
+        """
+        ok_num = self.get_ok_servers_num()
+        if self._close or ok_num == 0:
+            return
+        max_con_per_address = int(self._configs.max_connection_pool_size / ok_num)
+        addresses = []
+        for addr in self._addresses:
+            if self._addresses_status[addr] != self.S_OK:
+                continue
+            count = min(
+                idle_size - len(self._idle_connections[addr]),
+                max_con_per_address - len(self._connections[addr]),
+            )
+            count -= self._opening[addr]
+            if count > 0:
+                self._opening[addr] += count
+                addresses.extend([addr] * count)
+        semaphore = asyncio.Semaphore(max(self._configs.open_workers, 1))
+
+        async def open_connection(addr):
+            async with semaphore:
+                return await self._open_connection(addr)
+
+        connections = await asyncio.gather(
+            *(open_connection(addr) for addr in addresses),
+            return_exceptions=True,
+        )
+        for connection in connections:
+            if isinstance(connection, AsyncConnection):
+                self.return_connection(connection)
+
+    async def ping(self, address):
+        """check the server is ok
+
+        :param address: the server address want to connect
+        :return: True or False
+        """
+        conn = AsyncConnection()
+        try:
+            await conn.open(address[0], address[1], 1000, self._ssl_configs)
+            conn.close()
+            return True
+        except asyncio.CancelledError:
+            raise
+        except Exception as ex:
+            conn.close()
+            logger.warning(
+                "Connect {}:{} failed: {}".format(address[0], address[1], ex)
+            )
+            return False
+
+    async def update_servers_status(self):
+        """update the servers' status, all the servers are checked at the same
+        time. A bad server is checked again after Config.breaker_reset_timeout
+        """
+        addresses = [
+            addr for addr in self._addresses if self._breakers[addr].allow_probe()
+        ]
+        results = await asyncio.gather(*(self._probe(addr) for addr in addresses))
+        for addr, ok in zip(addresses, results):
+            self._update_server_status(addr, ok)
+
+    def server_failed(self, address):
+        """a connection to the server is broken, update the servers' status in
+        a task of the background
+
+        :param address: (ip, port)
+        :return: void
+        """
+        if self._close or (
+            self._check_task is not None and not self._check_task.done()
+        ):
+            return
+        logger.warning("The connection to {} is broken".format(address))
+        self._check_task = asyncio.ensure_future(self.update_servers_status())
+
+    async def _probe(self, address):
+        """check the server with an idle connection to it, or with a new
+        connection when there is none, see ConnectionPool._probe
+        """
+        idle = self._idle_connections[address]
+        if idle:
+            connection = idle.popleft()
+            connection.is_used = True
+            if await self._ping_taken(connection):
+                self._give_back_idle(connection)
+                return True
+        return await self.ping(address)
+
+    def _update_server_status(self, address, ok):
+        """record a health check of the server on its breaker, the server is
+        ok when the check succeeds and bad when the breaker opens
+        """
+        if ok:
+            self._breakers[address].succeed()
+            self._addresses_status[address] = self.S_OK
+        elif self._breakers[address].fail():
+            self._addresses_status[address] = self.S_BAD
+            self._drop_idle_connections(address)
+
+    async def _remove_idle_unusable_connection(self):
+        if (
+            self._configs.idle_time == 0
+            and self._configs.validation_policy != 'background'
+        ):
+            return
+        checking = [c for idle in self._idle_connections.values() for c in idle]
+        if not checking:
+            return
+        # a few connections are out of the idle list at a time, the others
+        # are still handed out meanwhile
+        semaphore = asyncio.Semaphore(IDLE_CHECK_WORKERS)
+
+        async def check(connection):
+            async with semaphore:
+                await self._check_idle_connection(connection)
+
+        await asyncio.gather(*(check(connection) for connection in checking))
+
+    async def _check_idle_connection(self, connection):
+        """take the idle connection out of the pool to ping it, and give it
+        back as soon as the ping returns, see ConnectionPool._check_idle_connection
+        """
+        idle = self._idle_connections.get(connection.get_address())
+        if self._close or idle is None or connection not in idle:
+            # handed out meanwhile
+            return
+        idle.remove(connection)
+        connection.is_used = True
+        if (
+            self._configs.idle_time != 0
+            and connection.idle_time() > self._configs.idle_time
+            and len(idle) >= self._configs.min_idle_size
+        ):
+            self._remove_connection(connection)
+            return
+        if await self._ping_taken(connection):
+            self._give_back_idle(connection)
+
+    def _give_back_idle(self, connection):
+        """give back a connection taken out of the idle list, see
+        ConnectionPool._give_back_idle
+        """
+        addr = connection.get_address()
+        if self._close or connection not in self._connections.get(addr, ()):
+            connection.close()
+            return
+        if self._waiters.hand_off(connection):
+            return
+        connection.is_used = False
+        self._idle_connections[addr].appendleft(connection)
+
+    async def _period_detect(self):
+        while not self._close:
+            await asyncio.sleep(self._configs.interval_check)
+            try:
+                await self.update_servers_status()
+                await self._remove_idle_unusable_connection()
+                await self._fill_idle_connections(self._configs.min_idle_size)
+            except NotValidConnectionException:
+                return
+            except Exception as ex:
+                logger.error("Detect the services failed: {}".format(ex))
+
+    async def close(self):
+        """close all connections in pool
+
+        :return: void
+        """
+        self._close = True
+        for task in (self._detect_task, self._check_task):
+            if task is not None and not task.done():
+                task.cancel()
+        for addr in self._connections.keys():
+            for connection in self._connections[addr]:
+                if connection.is_used:
+                    logger.warning("Closing a connection that is in use")
+                connection.close()
+        for idle in self._idle_connections.values():
+            idle.clear()
+        self._waiters.wake(all=True)
+
+    def connects(self):
+        """get the number of existing connections
+
+        :return: the number of connections
+        """
+        return sum(len(conns) for conns in self._connections.values())
+
+    def in_used_connects(self):
+        """get the number of the used connections
+
+        :return: int
+        """
+        return self.connects() - self.idle_connects()
+
+    def idle_connects(self):
+        """get the number of the idle connections
+
+        :return: int
+        """
+        return sum(len(idle) for idle in self._idle_connections.values())
+
+    def load_balancer(self):
+        """get the load balancer, the sessions report their statements to it
+
+        :return: LoadBalancer
+        """
+        return self._load_balancer
+
+    def wait_stats(self):
+        """get the metrics of the tasks waiting for a connection, see
+        ConnectionPool.wait_stats
+
+        :return: dict
+        """
+        return self._waiters.stats()
+
+    def get_ok_servers_num(self):
+        """get the number of the ok servers
+
+        :return: int
+        """
+        count = 0
+        for addr in self._addresses_status.keys():
+            if self._addresses_status[addr] == self.S_OK:
+                count = count + 1
+        return count
+
+    def _get_services_status(self):
+        msg_list = []
+        for addr in self._addresses_status.keys():
+            status = "OK"
+            if self._addresses_status[addr] != self.S_OK:
+                status = "BAD"
+            msg_list.append("[services: {}, status: {}]".format(addr, status))
+        return ", ".join(msg_list)
@@ -0,0 +1,193 @@
+# --coding:utf-8--
+#
+# Copyright (c) 2026 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License.
+
+
+import time
+
+from typing import Any, Dict, Optional, TYPE_CHECKING
+
+from nebula3.Exception import (
+    IOErrorException,
+    NotValidConnectionException,
+)
+from nebula3.data.ResultSet import ResultSet
+from nebula3.gclient.net.AuthResult import AuthResult
+from nebula3.gclient.net.base import ExecuteError, _build_byte_param
+from nebula3.logger import logger
+
+if TYPE_CHECKING:
+    from nebula3.gclient.net.AsyncConnection import AsyncConnection
+
+
+class AsyncSession(object):
+    """The Session of asyncio, got from AsyncConnectionPool.get_session, its
+    methods are coroutines. Release it with `await session.release()`.
+    """
+
+    def __init__(
+        self,
+        connection: "AsyncConnection",
+        auth_result: AuthResult,
+        pool,
+        retry_connect=True,
+    ):
+        """
+        :param connection: the AsyncConnection of the session
+        :param auth_result: the result of the authentication
+        :param pool: the AsyncConnectionPool or AsyncSessionPool of the session
+        :param retry_connect: get another connection from the pool when the
+        connection is broken
+        """
+        self._session_id = auth_result.get_session_id()
+        self._timezone_offset = auth_result.get_timezone_offset()
+        self._connection = connection
+        self._pool = pool
+        self._retry_connect = retry_connect
+        # the time stamp when the session was added to the idle list of the session pool
+        self._idle_time_start = 0
+        # the load balancer of the pool, told the latency of every statement
+        self._load_balancer = pool.load_balancer()
+
+    async def execute(self, stmt: str) -> ResultSet:
+        """execute statement
+
+        :param stmt: the ngql
+        :return: ResultSet
+        """
+        return await self.execute_parameter(stmt, None)
+
+    async def execute_parameter(self, stmt: str, params) -> ResultSet:
+        """execute statement
+
+        :param stmt: the ngql
+        :param params: parameter map
+        :return: ResultSet
+        """
+        start_time = time.time()
+        resp = await self._track(
+            self._connection_call, 'execute_parameter', stmt, params
+        )
+        return ResultSet(
+            resp,
+            all_latency=int((time.time() - start_time) * 1000000),
+            timezone_offset=self._timezone_offset,
+        )
+
+    async def execute_py(
+        self,
+        stmt: str,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> ResultSet:
+        """**Recommended** Execute a statement with parameters in Python type instead of thrift type."""
+        if params is None:
+            result = await self.execute_parameter(stmt, None)
+        else:
+            result = await self.execute_parameter(stmt, _build_byte_param(params))
+
+        if not result.is_succeeded():
+            raise ExecuteError(stmt, params, result.error_code(), result.error_msg())
+
+        return result
+
+    async def execute_json(self, stmt: str) -> bytes:
+        """execute statement and return the result as a JSON bytes, see
+        Session.execute_json
+
+        :param stmt: the ngql
+        :return: JSON bytes
+        """
+        return await self.execute_json_with_parameter(stmt, None)
+
+    async def execute_json_with_parameter(self, stmt: str, params) -> bytes:
+        """execute statement and return the result as a JSON bytes
+
+        :param stmt: the ngql
+        :param params: parameter map
+        :return: JSON bytes
+        """
+        return await self._track(
+            self._connection_call, 'execute_json_with_parameter', stmt, params
+        )
+
+    async def _track(self, call, method, stmt, params):
+        """call and report the statement to the load balancer of the pool"""
+        if self._connection is None:
+            raise RuntimeError("The session has been released")
+        address = self._connection.get_address()
+        self._load_balancer.begin(address)
+        start_time = time.time()
+        succeeded = False
+        try:
+            resp = await call(method, stmt, params)
+            succeeded = True
+            return resp
+        finally:
+            self._load_balancer.end(address, time.time() - start_time, succeeded)
+
+    async def _connection_call(self, method, stmt, params):
+        try:
+            return await getattr(self._connection, method)(
+                self._session_id, stmt, params
+            )
+        except IOErrorException as ie:
+            if ie.type != IOErrorException.E_CONNECT_BROKEN:
+                raise
+            self._pool.server_failed(self._connection.get_address())
+            if not self._retry_connect:
+                raise
+            if not await self._reconnect():
+                logger.warning("Retry connect failed")
+                raise IOErrorException(IOErrorException.E_ALL_BROKEN, ie.message)
+            return await getattr(self._connection, method)(
+                self._session_id, stmt, params
+            )
+
+    async def release(self):
+        """release the connection to pool, and the session couldn't been use again
+
+        :return: void
+        """
+        if self._connection is None:
+            return
+        connection, self._connection = self._connection, None
+        try:
+            await connection.signout(self._session_id)
+        finally:
+            self._pool.return_connection(connection)
+
+    async def ping(self):
+        """ping at connection level check the connection is valid
+
+        :return: True or False
+        """
+        if self._connection is None:
+            return False
+        return await self._connection.ping()
+
+    async def ping_session(self):
+        """ping at session level, check whether the session is usable"""
+        resp = await self.execute(r'RETURN "NEBULA PYTHON SESSION PING"')
+        if resp.is_succeeded():
+            return True
+        logger.error(
+            "failed to ping the session: error code:{}, error message:{}".format(
+                resp.error_code(), resp.error_msg()
+            )
+        )
+        return False
+
+    async def _reconnect(self):
+        try:
+            # the pool drops the broken connection instead of handing it out
+            self._connection.close()
+            self._pool.return_connection(self._connection)
+            conn = await self._pool.get_connection()
+            if conn is None:
+                return False
+            self._connection = conn
+        except NotValidConnectionException:
+            return False
+        return True
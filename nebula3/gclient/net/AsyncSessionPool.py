@@ -0,0 +1,643 @@
+# --coding:utf-8--
+#
+# Copyright (c) 2026 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License.
+
+
+import asyncio
+import socket
+import time
+
+from typing import Any, Dict, Optional
+
+from nebula3.common.ttypes import ErrorCode
+from nebula3.Exception import (
+    AuthFailedException,
+    NoValidSessionException,
+    InValidHostname,
+)
+
+from nebula3.data.ResultSet import ResultSet
+from nebula3.gclient.net.AsyncConnection import AsyncConnection
+from nebula3.gclient.net.AsyncSession import AsyncSession
+from nebula3.gclient.net.base import (
+    ExecuteError,
+    _build_byte_param,
+    _json_session_error,
+    _may_switch_space,
+)
+from nebula3.gclient.net.HealthCheck import CircuitBreaker
+from nebula3.gclient.net.IdleSessions import IdleSessions
+from nebula3.gclient.net.LoadBalancer import create_load_balancer
+from nebula3.gclient.net.WaitQueue import AsyncWaitQueue
+from nebula3.logger import logger
+from nebula3.Config import SessionPoolConfig, SSL_config
+
+
+class AsyncSessionPool(object):
+    """The SessionPool of asyncio, the sessions are bound to one space and
+    shared by the tasks, see SessionPool. All the network I/O is done in the
+    event loop.
+
+        pool = AsyncSessionPool('root', 'nebula', 'nba', [('127.0.0.1', 9669)])
+        await pool.init(SessionPoolConfig())
+        result = await pool.execute_py('MATCH (v) WHERE id(v) == $id RETURN v', {'id': 'a'})
+        await pool.close()
+    """
+
+    S_OK = 0
+    S_BAD = 1
+
+    def __init__(self, username, password, space_name, addresses):
+        # user name and password of the session
+        self._username = username
+        self._password = password
+
+        # space name bonded to the session
+        self._space_name = space_name
+
+        # the addresses given, resolved by init
+        self._hosts = list(addresses)
+        # all addresses of servers
+        self._addresses = list()
+
+        # server's status
+        self._addresses_status = dict()
+        # the circuit breakers of the servers, they decide the status
+        self._breakers = dict()
+
+        # sessions that are currently in use
+        self._active_sessions = set()
+        # sessions that are currently available, per address
+        self._idle_sessions = IdleSessions()
+        # sessions left in another space by a statement, see SessionPool
+        self._unbound_sessions = set()
+        # the number of sessions being created, they count for the max size
+        self._creating = 0
+        # the tasks waiting for a session when the pool is full
+        self._waiters = AsyncWaitQueue()
+
+        self._configs = SessionPoolConfig()
+        self._ssl_configs = None
+
+        # pick the address of the new sessions and the idle sessions
+        self._load_balancer = None
+
+        # the flag of whether the pool is closed
+        self._close = False
+
+        # the tasks of the periodic check and of the background health check
+        self._detect_task = None
+        self._check_task = None
+
+    async def init(
+        self,
+        configs: Optional[SessionPoolConfig] = None,
+        ssl_configs: Optional[SSL_config] = None,
+    ):
+        """init the session pool
+
+        :param configs: the config of the pool
+        :param ssl_configs: the config of SSL socket
+        :return: if all addresses are valid, return True else return False.
+        """
+        if configs is not None:
+            assert isinstance(
+                configs, SessionPoolConfig
+            ), "wrong type of SessionPoolConfig, try this: `from nebula3.Config import SessionPoolConfig`"
+            self._configs = configs
+        self._ssl_configs = ssl_configs
+        # check configs
+        try:
+            self._check_configs()
+            self._load_balancer = create_load_balancer(self._configs.load_balancer)
+        except Exception as e:
+            logger.error("Invalid configs: {}".format(e))
+            return False
+
+        if self._close:
+            logger.error("The pool has init or closed.")
+            raise RuntimeError("The pool has init or closed.")
+
+        loop = asyncio.get_running_loop()
+        for address in self._hosts:
+            try:
+                ip = await loop.run_in_executor(None, socket.gethostbyname, address[0])
+            except Exception:
+                raise InValidHostname(str(address[0]))
+            ip_port = (ip, address[1])
+            self._addresses.append(ip_port)
+            self._addresses_status[ip_port] = self.S_BAD
+            self._breakers[ip_port] = CircuitBreaker(
+                self._configs.breaker_failure_threshold,
+                self._configs.breaker_reset_timeout,
+            )
+
+        # ping all servers
+        await self.update_servers_status()
+
+        # check services status in the background
+        if self._configs.interval_check > 0:
+            self._detect_task = asyncio.ensure_future(self._period_detect())
+
+        ok_num = self.get_ok_servers_num()
+        if ok_num < len(self._addresses):
+            raise RuntimeError(
+                "The services status exception: {}".format(self._get_services_status())
+            )
+
+        # create the sessions of min_size at the same time, up to
+        # SessionPoolConfig.create_workers of them
+        semaphore = asyncio.Semaphore(self._configs.create_workers)
+
+        async def new_session():
+            async with semaphore:
+                return await self._new_session()
+
+        self._creating += self._configs.min_size
+        try:
+            sessions = await asyncio.gather(
+                *(new_session() for _ in range(self._configs.min_size)),
+                return_exceptions=True,
+            )
+        finally:
+            self._creating -= self._configs.min_size
+        errors = [e for e in sessions if isinstance(e, BaseException)]
+        for session in sessions:
+            if isinstance(session, AsyncSession):
+                self._add_session_to_idle(session)
+        if errors:
+            raise RuntimeError("Get session failed: {}".format(errors[0]))
+        return True
+
+    async def execute(self, stmt: str) -> ResultSet:
+        """execute the given query, see SessionPool.execute
+
+        :param stmt: the query string
+        :return: ResultSet
+        """
+        return await self.execute_parameter(stmt, None)
+
+    async def execute_parameter(self, stmt: str, params) -> ResultSet:
+        """execute statement
+
+        :param stmt: the query string
+        :param params: parameter map
+        :return: ResultSet
+        """
+        session = await self._get_bound_session()
+        try:
+            resp = await session.execute_parameter(stmt, params)
+        except BaseException as e:
+            logger.error("Execute failed: {}".format(e))
+            # remove the session from the pool if it is invalid
+            self._drop_session(session)
+            raise
+
+        if resp.error_code() in [
+            ErrorCode.E_SESSION_INVALID,
+            ErrorCode.E_SESSION_TIMEOUT,
+        ]:
+            logger.warning("Session invalid or timeout, removed from the pool")
+            self._drop_session(session)
+        else:
+            self._return_session(
+                session,
+                _may_switch_space(stmt) and resp.space_name() != self._space_name,
+            )
+        return resp
+
+    async def execute_py(
+        self,
+        stmt: str,
+        params: Optional[Dict[str, Any]] = None,
+    ) -> ResultSet:
+        """**Recommended** Execute a statement with parameters in Python type instead of thrift type."""
+        if params is None:
+            result = await self.execute_parameter(stmt, None)
+        else:
+            result = await self.execute_parameter(stmt, _build_byte_param(params))
+
+        if not result.is_succeeded():
+            raise ExecuteError(stmt, params, result.error_code(), result.error_msg())
+
+        return result
+
+    async def execute_json(self, stmt: str) -> bytes:
+        """execute statement and return the result as a JSON bytes, see
+        Session.execute_json
+
+        :param stmt: the ngql
+        :return: JSON bytes
+        """
+        return await self.execute_json_with_parameter(stmt, None)
+
+    async def execute_json_with_parameter(self, stmt: str, params) -> bytes:
+        session = await self._get_bound_session()
+        try:
+            resp = await session.execute_json_with_parameter(stmt, params)
+        except BaseException as e:
+            logger.error("Execute failed: {}".format(e))
+            self._drop_session(session)
+            raise
+
+        if _json_session_error(resp):
+            logger.warning("Session invalid or timeout, removed from the pool")
+            self._drop_session(session)
+        else:
+            self._return_session(session, _may_switch_space(stmt))
+        return resp
+
+    async def close(self):
+        """log out all sessions and close all connections
+
+        :return: void
+        """
+        self._close = True
+        for task in (self._detect_task, self._check_task):
+            if task is not None and not task.done():
+                task.cancel()
+        sessions = list(self._idle_sessions) + list(self._active_sessions)
+        self._idle_sessions.clear()
+        self._unbound_sessions.clear()
+        self._active_sessions.clear()
+        self._waiters.wake(all=True)
+        await asyncio.gather(
+            *(session.release() for session in sessions), return_exceptions=True
+        )
+
+    def get_ok_servers_num(self):
+        """get the number of the ok servers
+
+        :return: int
+        """
+        count = 0
+        for addr in self._addresses_status.keys():
+            if self._addresses_status[addr] == self.S_OK:
+                count = count + 1
+        return count
+
+    def _get_services_status(self):
+        msg_list = []
+        for addr in self._addresses_status.keys():
+            status = "OK"
+            if self._addresses_status[addr] != self.S_OK:
+                status = "BAD"
+            msg_list.append("[services: {}, status: {}]".format(addr, status))
+        return ", ".join(msg_list)
+
+    async def ping(self, address):
+        """check the server is ok
+
+        :param address: the server address want to connect
+        :return: True or False
+        """
+        conn = AsyncConnection()
+        try:
+            await conn.open(address[0], address[1], 1000, self._ssl_configs)
+            conn.close()
+            return True
+        except asyncio.CancelledError:
+            raise
+        except Exception as ex:
+            conn.close()
+            logger.warning(
+                "Connect {}:{} failed: {}".format(address[0], address[1], ex)
+            )
+            return False
+
+    async def update_servers_status(self):
+        """update the servers' status, all the servers are checked at the same
+        time. A bad server is checked again after
+        SessionPoolConfig.breaker_reset_timeout
+        """
+        addresses = [
+            addr for addr in self._addresses if self._breakers[addr].allow_probe()
+        ]
+        results = await asyncio.gather(*(self.ping(addr) for addr in addresses))
+        for addr, ok in zip(addresses, results):
+            if ok:
+                self._breakers[addr].succeed()
+                self._addresses_status[addr] = self.S_OK
+            elif self._breakers[addr].fail():
+                self._addresses_status[addr] = self.S_BAD
+
+    def server_failed(self, address):
+        """a connection to the server is broken, update the servers' status in
+        a task of the background
+
+        :param address: (ip, port)
+        :return: void
+        """
+        if self._close or (
+            self._check_task is not None and not self._check_task.done()
+        ):
+            return
+        logger.warning("The connection to {} is broken".format(address))
+        self._check_task = asyncio.ensure_future(self.update_servers_status())
+
+    def load_balancer(self):
+        """get the load balancer, the sessions report their statements to it
+
+        :return: LoadBalancer
+        """
+        return self._load_balancer
+
+    def return_connection(self, connection):
+        """the connection of a released session is closed, every session of
+        the pool owns its connection
+        """
+        connection.close()
+
+    def wait_stats(self):
+        """get the metrics of the tasks waiting for a session, see
+        SessionPool.wait_stats
+
+        :return: dict
+        """
+        return self._waiters.stats()
+
+    async def _get_idle_session(self):
+        """get a valid session from the pool idle list, and add it to the
+        active list.
+        When the pool is full, it waits up to SessionPoolConfig.acquire_timeout
+        for a session given back, the waiters are served in FIFO order.
+
+        :return: AsyncSession
+        """
+        waiter = None
+        try:
+            while True:
+                if self._close:
+                    raise NoValidSessionException("The pool is closed")
+                if len(self._idle_sessions) > 0:
+                    session = self._pop_idle_session()
+                    self._add_session_to_active(session)
+                    return session
+                total = len(self._active_sessions) + self._creating
+                if total < self._configs.max_size:
+                    self._creating += 1
+                    try:
+                        session = await self._new_session()
+                    finally:
+                        self._creating -= 1
+                        self._waiters.wake()
+                    self._add_session_to_active(session)
+                    return session
+                if self._configs.acquire_timeout <= 0:
+                    raise NoValidSessionException(
+                        "The total number of sessions reaches the pool max size {}".format(
+                            self._configs.max_size
+                        )
+                    )
+                if waiter is None:
+                    if 0 < self._configs.max_waiters <= len(self._waiters):
+                        self._waiters.rejections += 1
+                        raise NoValidSessionException(
+                            "Too many callers wait for a session, the max is {}".format(
+                                self._configs.max_waiters
+                            )
+                        )
+                    waiter = self._waiters.push()
+                else:
+                    # another task took the room, wait again in the front
+                    self._waiters.push(waiter)
+
+                remaining = (
+                    waiter.start_time
+                    + self._configs.acquire_timeout / 1000.0
+                    - time.time()
+                )
+                signalled = remaining > 0 and await waiter.wait(remaining)
+                # a session handed off is in the active list already
+                session, waiter.item = waiter.item, None
+                if session is not None:
+                    return session
+                if not signalled:
+                    self._waiters.done(waiter, timed_out=True)
+                    waiter = None
+                    raise NoValidSessionException(
+                        "Wait for a session timed out after {} ms".format(
+                            self._configs.acquire_timeout
+                        )
+                    )
+        except asyncio.CancelledError:
+            if waiter is not None:
+                if waiter.item is not None:
+                    self._return_session(waiter.item)
+                    waiter.item = None
+                self._waiters.done(waiter, timed_out=True)
+                waiter = None
+            raise
+        finally:
+            if waiter is not None:
+                self._waiters.done(waiter)
+
+    def _pop_idle_session(self):
+        """take an idle session to the address the load balancer selects
+
+        :return: AsyncSession
+        """
+        addresses = self._idle_sessions.addresses()
+        if len(addresses) > 1:
+            return self._idle_sessions.pop(self._load_balancer.select(addresses))
+        return self._idle_sessions.pop()
+
+    async def _new_session(self):
+        """construct a new session with the username and password in the pool.
+            also, the session is bound to the space specified in the configs.
+
+        :return: AsyncSession
+        """
+        candidates = []
+        for addr in self._addresses:
+            # if the address is bad, skip it
+            if self._addresses_status[addr] == self.S_BAD:
+                logger.warning("The graph service {} is not available".format(addr))
+            else:
+                candidates.append(addr)
+        if not candidates:
+            raise RuntimeError(
+                "Failed to get a valid session, no graph service is available"
+            )
+        addr = self._load_balancer.select(candidates)
+
+        connection = AsyncConnection()
+        try:
+            await connection.open(
+                addr[0],
+                addr[1],
+                self._configs.timeout,
+                self._ssl_configs,
+                self._configs.compression,
+                self._configs.compression_min_size,
+                self._configs.protocol,
+                self._configs.lazy_decode,
+            )
+            auth_result = await connection.authenticate(self._username, self._password)
+        except AuthFailedException as e:
+            connection.close()
+            logger.error("Authentication failed: {}".format(e))
+            raise
+        except BaseException:
+            connection.close()
+            raise
+        session = AsyncSession(connection, auth_result, self, False)
+
+        # switch to the space specified in the configs
+        try:
+            resp = await session.execute("USE {}".format(self._space_name))
+        except BaseException:
+            await session.release()
+            raise
+        if not resp.is_succeeded():
+            await session.release()
+            raise RuntimeError(
+                "Failed to get session, cannot set the session space to {} error: {} {}".format(
+                    self._space_name, resp.error_code(), resp.error_msg()
+                )
+            )
+        return session
+
+    async def _get_bound_session(self):
+        """get a session as _get_idle_session, a session left in another
+        space is switched back to the space of the pool first, or dropped for
+        another one if it fails
+
+        :return: AsyncSession
+        """
+        while True:
+            session = await self._get_idle_session()
+            if session not in self._unbound_sessions:
+                return session
+            self._unbound_sessions.discard(session)
+            try:
+                if await self._set_space_to_default(session):
+                    return session
+            except BaseException:
+                self._drop_session(session)
+                raise
+
+    def _return_session(self, session, unbound=False):
+        """return the session to the pool idle list when query finished.
+
+        :param session: the session to return
+        :param unbound: the session may be in another space than the pool's
+        :return: void
+        """
+        if self._close:
+            self._drop_session(session)
+            return
+        if unbound:
+            self._unbound_sessions.add(session)
+        if self._waiters.hand_off(session):
+            return
+        self._active_sessions.discard(session)
+        self._idle_sessions.append(session)
+        session._idle_time_start = time.time()
+
+    def _add_session_to_idle(self, session):
+        """add the session to the pool idle list
+
+        :param session: the session to add
+        :return: void
+        """
+        if self._waiters.hand_off(session):
+            self._add_session_to_active(session)
+            return
+        self._idle_sessions.append(session)
+        session._idle_time_start = time.time()
+
+    def _add_session_to_active(self, session):
+        """add the session to the pool active list
+
+        :param session: the session to add
+        :return: void
+        """
+        self._active_sessions.add(session)
+        session._idle_time_start = 0
+
+    def _drop_session(self, session):
+        """remove the session from the pool active list and close its
+        connection, its room is free
+        """
+        self._active_sessions.discard(session)
+        self._unbound_sessions.discard(session)
+        if session._connection is not None:
+            session._connection.close()
+            session._connection = None
+        self._waiters.wake()
+
+    async def _set_space_to_default(self, session):
+        """set the space to the default space in the pool
+
+        :param session: the session to set
+        :return: False if the session has been dropped
+        """
+        try:
+            resp = await session.execute("USE {}".format(self._space_name))
+            if not resp.is_succeeded():
+                raise RuntimeError(
+                    "Failed to set the session space to {}".format(self._space_name)
+                )
+            return True
+        except Exception:
+            logger.warning(
+                "Failed to set the session space to {}, the current session has been dropped".format(
+                    self._space_name
+                )
+            )
+            self._drop_session(session)
+            return False
+
+    async def _remove_idle_unusable_session(self):
+        if self._configs.idle_time == 0:
+            return
+        now = time.time()
+        for session in list(self._idle_sessions):
+            total = len(self._idle_sessions) + len(self._active_sessions)
+            if total <= self._configs.min_size:
+                return
+            if (now - session._idle_time_start) * 1000 > self._configs.idle_time:
+                self._idle_sessions.remove(session)
+                self._unbound_sessions.discard(session)
+                await session.release()
+
+    async def _period_detect(self):
+        """periodically detect the services status and remove the sessions from the idle list if they expire"""
+        while not self._close:
+            await asyncio.sleep(self._configs.interval_check)
+            try:
+                await self.update_servers_status()
+                await self._remove_idle_unusable_session()
+            except Exception as ex:
+                logger.error("Detect the services failed: {}".format(ex))
+
+    def _check_configs(self):
+        """validate the configs"""
+        if self._configs.min_size < 0:
+            raise RuntimeError("The min_size must be greater than 0")
+        if self._configs.max_size < 0:
+            raise RuntimeError("The max_size must be greater than 0")
+        if self._configs.min_size > self._configs.max_size:
+            raise RuntimeError(
+                "The min_size must be less than or equal to the max_size"
+            )
+        if self._configs.idle_time < 0:
+            raise RuntimeError("The idle_time must be greater or equal to 0")
+        if self._configs.timeout < 0:
+            raise RuntimeError("The timeout must be greater or equal to 0")
+        if self._configs.use_http2:
+            raise RuntimeError("http2 is not supported by AsyncSessionPool")
+        if self._configs.create_workers <= 0:
+            raise RuntimeError("The create_workers must be greater than 0")
+
+        if self._space_name == "":
+            raise RuntimeError("The space_name must be set")
+        if self._username == "":
+            raise RuntimeError("The username must be set")
+        if self._password == "":
+            raise RuntimeError("The password must be set")
+        if self._hosts is None or len(self._hosts) == 0:
+            raise RuntimeError("The addresses must be set")
@@ -16,6 +16,7 @@ from nebula3.fbthrift.transport import (
     THttp2Client,
 )
 from nebula3.fbthrift.transport.TTransport import TTransportException
+from nebula3.fbthrift.Thrift import TApplicationException
 from nebula3.fbthrift.protocol import THeaderProtocol, TBinaryProtocol
 
 from nebula3.common.ttypes import ErrorCode
@@ -30,6 +31,7 @@ from nebula3.Exception import (
 )
 
 from nebula3.gclient.net.AuthResult import AuthResult
+from nebula3.data.LazyDataSet import recv_execute_with_parameter
 
 
 class Connection(object):
@@ -38,15 +40,34 @@ class Connection(object):
     def __init__(self):
         self._connection = None
         self.start_use_time = time.time()
+        # the time of the last successful call, see Config.validation_policy
+        self.last_used_time = time.time()
         self._ip = None
         self._port = None
         self._timeout = 0
         self._ssl_conf = None
         self.use_http2 = False
         self.http_headers = None
+        self._http2_channels = None
+        self._compression = None
+        self._compression_min_size = 0
+        self._protocol = None
+        self.lazy_decode = False
         self._closed = True
 
-    def open(self, ip, port, timeout, use_http2=False, http_headers=None):
+    def open(
+        self,
+        ip,
+        port,
+        timeout,
+        use_http2=False,
+        http_headers=None,
+        http2_channels=None,
+        compression=None,
+        compression_min_size=0,
+        protocol=None,
+        lazy_decode=False,
+    ):
         """open the connection
 
         :param ip: the server ip
@@ -54,12 +75,40 @@ class Connection(object):
         :param timeout: the timeout for connect and execute
         :param use_http2: use http2 or not
         :param http_headers: http headers
+        :param http2_channels: THttp2Channels to share http2 connections with
+        :param compression: 'zlib', 'snappy' or 'zstd' to compress the requests
+        :param compression_min_size: the min size of the requests to compress
+        :param protocol: 'binary' or 'compact', the thrift protocol of the requests
+        :param lazy_decode: decode the rows of the results when they are used
         :return: void
         """
-        self.open_SSL(ip, port, timeout, None, use_http2, http_headers)
+        self.open_SSL(
+            ip,
+            port,
+            timeout,
+            None,
+            use_http2,
+            http_headers,
+            http2_channels,
+            compression,
+            compression_min_size,
+            protocol,
+            lazy_decode,
+        )
 
     def open_SSL(
-        self, ip, port, timeout, ssl_config=None, use_http2=False, http_headers=None
+        self,
+        ip,
+        port,
+        timeout,
+        ssl_config=None,
+        use_http2=False,
+        http_headers=None,
+        http2_channels=None,
+        compression=None,
+        compression_min_size=0,
+        protocol=None,
+        lazy_decode=False,
     ):
         """open the SSL connection
 
@@ -69,6 +118,11 @@ class Connection(object):
         :ssl_config: configs for SSL
         :param use_http2: use http2 or not
         :param http_headers: http headers
+        :param http2_channels: THttp2Channels to share http2 connections with
+        :param compression: 'zlib', 'snappy' or 'zstd' to compress the requests
+        :param compression_min_size: the min size of the requests to compress
+        :param protocol: 'binary' or 'compact', the thrift protocol of the requests
+        :param lazy_decode: decode the rows of the results when they are used
         :return: void
         """
         self._ip = ip
@@ -77,11 +131,18 @@ class Connection(object):
         self._ssl_conf = ssl_config
         self.use_http2 = use_http2
         self.http_headers = http_headers
+        self._http2_channels = http2_channels
+        self._compression = compression
+        self._compression_min_size = compression_min_size
+        self._protocol = protocol
+        self.lazy_decode = lazy_decode
         try:
             if use_http2 is False:
                 protocol = self.__get_protocol(timeout, ssl_config)
             else:
-                protocol = self.__get_protocal_http2(timeout, ssl_config, http_headers)
+                protocol = self.__get_protocal_http2(
+                    timeout, ssl_config, http_headers, http2_channels
+                )
             self._connection = GraphService.Client(protocol)
             resp = self._connection.verifyClientVersion(VerifyClientVersionReq())
             if resp.error_code != ErrorCode.SUCCEEDED:
@@ -91,6 +152,7 @@ class Connection(object):
             self.close()
             raise
         self._closed = False
+        self.last_used_time = time.time()
 
     def __get_protocol(self, timeout, ssl_config):
         try:
@@ -114,13 +176,21 @@ class Connection(object):
 
             buffered_transport = TTransport.TBufferedTransport(s)
             header_transport = THeaderTransport.THeaderTransport(buffered_transport)
+            if self._protocol is not None:
+                header_transport.set_protocol(self._protocol)
+            if self._compression is not None:
+                header_transport.set_compression(
+                    self._compression, self._compression_min_size
+                )
             protocol = THeaderProtocol.THeaderProtocol(header_transport)
             header_transport.open()
         except Exception as e:
             raise
         return protocol
 
-    def __get_protocal_http2(self, timeout, ssl_config, http_headers):
+    def __get_protocal_http2(
+        self, timeout, ssl_config, http_headers, http2_channels=None
+    ):
         verify, certfile, keyfile, password = None, None, None, None
         if ssl_config is not None:
             # verify could be a boolean or ssl.SSLContext in httpx.
@@ -132,7 +202,14 @@ class Connection(object):
             url = "http://" + self._ip + ":" + str(self._port)
         try:
             transport = THttp2Client.THttp2Client(
-                url, timeout, verify, certfile, keyfile, password, http_headers
+                url,
+                timeout,
+                verify,
+                certfile,
+                keyfile,
+                password,
+                http_headers,
+                http2_channels,
             )
             transport.open()
             protocol = TBinaryProtocol.TBinaryProtocol(transport)
@@ -154,11 +231,25 @@ class Connection(object):
                 self._ssl_conf,
                 self.use_http2,
                 self.http_headers,
+                self._http2_channels,
+                self._compression,
+                self._compression_min_size,
+                self._protocol,
+                self.lazy_decode,
             )
             self._closed = False
         else:
             self.open(
-                self._ip, self._port, self._timeout, self.use_http2, self.http_headers
+                self._ip,
+                self._port,
+                self._timeout,
+                self.use_http2,
+                self.http_headers,
+                self._http2_channels,
+                self._compression,
+                self._compression_min_size,
+                self._protocol,
+                self.lazy_decode,
             )
 
     def authenticate(self, user_name, password):
@@ -173,6 +264,7 @@ class Connection(object):
             if resp.error_code != ErrorCode.SUCCEEDED:
                 self._connection.is_used = False
                 raise AuthFailedException(resp.error_msg)
+            self.last_used_time = time.time()
             return AuthResult(
                 resp.session_id, resp.time_zone_offset_seconds, resp.time_zone_name
             )
@@ -200,7 +292,12 @@ class Connection(object):
         :return: ExecutionResponse
         """
         try:
-            resp = self._connection.executeWithParameter(session_id, stmt, params)
+            if self.lazy_decode:
+                self._connection.send_executeWithParameter(session_id, stmt, params)
+                resp = recv_execute_with_parameter(self._connection)
+            else:
+                resp = self._connection.executeWithParameter(session_id, stmt, params)
+            self.last_used_time = time.time()
             return resp
         except Exception as te:
             if isinstance(te, TTransportException):
@@ -217,6 +314,85 @@ class Connection(object):
                     raise IOErrorException(IOErrorException.E_UNKNOWN, te.message)
             raise
 
+    def execute_pipeline(self, session_id, requests, window=128, replies=None):
+        """execute the statements with their parameters back to back, the
+        requests are sent without waiting for the replies of the former ones,
+        so they cost about one round trip instead of one each. The replies are
+        matched to the requests by the seq id of the header transport, http2
+        sends the requests one by one.
+
+        :param session_id: the session id get from result of authenticate interface
+        :param requests: the list of (stmt, params)
+        :param window: the max number of the requests sent and not replied
+        :param replies: a list of the size of the requests to put the replies in
+            as they are received, or the TApplicationException of a request,
+            the requests not replied when an error stops the pipeline are None
+        :return: the list of ExecutionResponse in the order of the requests
+        """
+        responses = [None] * len(requests) if replies is None else replies
+        if self.use_http2:
+            for index, (stmt, params) in enumerate(requests):
+                responses[index] = self.execute_parameter(session_id, stmt, params)
+            return responses
+        client = self._connection
+        replied = [False] * len(requests)
+        error = None
+        sent = 0
+        received = 0
+        try:
+            while received < len(requests):
+                while sent < len(requests) and sent - received < window:
+                    stmt, params = requests[sent]
+                    sent += 1
+                    client._seqid = sent
+                    client.send_executeWithParameter(session_id, stmt, params)
+                resp = None
+                try:
+                    if self.lazy_decode:
+                        resp = recv_execute_with_parameter(client)
+                    else:
+                        resp = client.recv_executeWithParameter()
+                except TApplicationException as e:
+                    # keep reading the other replies, the connection stays in step
+                    if error is None:
+                        error = e
+                    resp = e
+                seq_id = client._iprot.trans.seq_id
+                if not 1 <= seq_id <= sent or replied[seq_id - 1]:
+                    raise IOErrorException(
+                        IOErrorException.E_CONNECT_BROKEN,
+                        "Unexpected reply seq id {} in the pipeline".format(seq_id),
+                    )
+                replied[seq_id - 1] = True
+                responses[seq_id - 1] = resp
+                received += 1
+            if error is None and None in responses:
+                raise IOErrorException(
+                    IOErrorException.E_CONNECT_BROKEN, "Missing replies in the pipeline"
+                )
+        except Exception as te:
+            if isinstance(te, TTransportException) and te.message.find("timed out") > 0:
+                self._reopen()
+                raise IOErrorException(IOErrorException.E_TIMEOUT, te.message)
+            # the replies left unread would be taken for the next requests
+            self.close()
+            if isinstance(te, TTransportException):
+                if te.type == TTransportException.END_OF_FILE:
+                    raise IOErrorException(
+                        IOErrorException.E_CONNECT_BROKEN, te.message
+                    )
+                elif te.type == TTransportException.NOT_OPEN:
+                    raise IOErrorException(IOErrorException.E_NOT_OPEN, te.message)
+                else:
+                    raise IOErrorException(IOErrorException.E_UNKNOWN, te.message)
+            raise
+        finally:
+            client._seqid = 0
+        if error is not None:
+            raise error
+        self.last_used_time = time.time()
+        return responses
+
     def execute_json(self, session_id, stmt):
         """execute_json interface with session_id and ngql
         :param session_id: the session id get from result of authenticate interface
@@ -237,6 +413,7 @@ class Connection(object):
             if not isinstance(resp, bytes):
                 raise TypeError("response is not bytes")
             else:
+                self.last_used_time = time.time()
                 return resp
         except Exception as te:
             if isinstance(te, TTransportException):
@@ -259,6 +436,8 @@ class Connection(object):
         :param session_id:the session id
         :return: void
         """
+        if self._closed:
+            return
         try:
             self._connection.signout(session_id)
         except TTransportException as te:
@@ -272,19 +451,23 @@ class Connection(object):
         """
         try:
             if not self._closed:
-                self._connection._iprot.trans.close()
                 self._closed = True
+                self._connection._iprot.trans.close()
         except Exception as e:
             logger.error(
                 "Close connection to {}:{} failed:{}".format(self._ip, self._port, e)
             )
 
+    def is_closed(self):
+        return self._closed
+
     def ping(self):
         """check the connection if ok
         :return: True or False
         """
         try:
             resp = self._connection.execute(0, "YIELD 1;")
+            self.last_used_time = time.time()
             return True
         except Exception:
             return False
@@ -305,6 +488,13 @@ class Connection(object):
             return 0
         return (time.time() - self.start_use_time) * 1000
 
+    def unused_time(self):
+        """get the time since the last successful call of connection
+
+        :return: unused time in ms
+        """
+        return (time.time() - self.last_used_time) * 1000
+
     def get_address(self):
         """get the address of the connected service
 
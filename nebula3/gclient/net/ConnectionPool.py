@@ -7,37 +7,63 @@
 
 import contextlib
 import socket
+import time
 
 from collections import deque
-from threading import RLock, Timer
+from concurrent.futures import ThreadPoolExecutor
+from threading import RLock, Thread, Timer
 
 from nebula3.Exception import NotValidConnectionException, InValidHostname
 
+from nebula3.fbthrift.transport.THttp2Client import THttp2Channels
+
 from nebula3.gclient.net.Session import Session
 from nebula3.gclient.net.Connection import Connection
+from nebula3.gclient.net.HealthCheck import CircuitBreaker, probe_in_parallel
+from nebula3.gclient.net.LoadBalancer import create_load_balancer
+from nebula3.gclient.net.WaitQueue import WaitQueue
 from nebula3.Config import Config
 from nebula3.logger import logger
-from typing import Dict, List, Tuple
+from typing import Deque, Dict, List, Tuple
+
+# the idle connections pinged at the same time by the background check
+IDLE_CHECK_WORKERS = 8
 
 
 class ConnectionPool(object):
     S_OK = 0
     S_BAD = 1
 
+    VALIDATION_POLICIES = ('always', 'idle', 'background', 'never')
+
     def __init__(self):
         # all addresses of servers
         self._addresses: List[Tuple[str, int]] = list()
 
         # server's status
         self._addresses_status = dict()
+        # the circuit breakers of the servers, they decide the status
+        self._breakers: Dict[Tuple[str, int], CircuitBreaker] = dict()
+        # a health check is running in the background
+        self._checking = False
+        # the idle connections are being opened in the background
+        self._filling = False
 
         # all connections
         self._connections: Dict[Tuple[str, int], List[Connection]] = dict()
+        # the idle connections, the last returned is handed out first
+        self._idle_connections: Dict[Tuple[str, int], Deque[Connection]] = dict()
+        # the number of connections being opened, they count for the max size
+        self._opening: Dict[Tuple[str, int], int] = dict()
+        # the callers waiting for a connection when the pool is full
+        self._waiters = WaitQueue()
         self._configs = None
         self._ssl_configs = None
         self._lock = RLock()
-        self._pos = -1
+        self._load_balancer = None
         self._close = False
+        # the http2 connections shared by all connections, see Config.http2_channels
+        self._http2_channels = None
 
     def __del__(self):
         self.close()
@@ -60,6 +86,11 @@ class ConnectionPool(object):
                 configs, Config
             ), "wrong type of Config, try this: `from nebula3.Config import Config`"
             self._configs = configs
+        if self._configs.validation_policy not in self.VALIDATION_POLICIES:
+            raise ValueError(
+                "Unknown validation policy: {}".format(self._configs.validation_policy)
+            )
+        self._load_balancer = create_load_balancer(self._configs.load_balancer)
         self._ssl_configs = ssl_conf
         for address in addresses:
             if address not in self._addresses:
@@ -70,8 +101,16 @@ class ConnectionPool(object):
                 ip_port = (ip, address[1])
                 self._addresses.append(ip_port)
                 self._addresses_status[ip_port] = self.S_BAD
+                self._breakers[ip_port] = CircuitBreaker(
+                    self._configs.breaker_failure_threshold,
+                    self._configs.breaker_reset_timeout,
+                )
                 self._connections[ip_port] = deque()
+                self._idle_connections[ip_port] = deque()
+                self._opening[ip_port] = 0
         self._ssl_configs = ssl_conf
+        if self._configs.use_http2 and self._configs.http2_channels > 0:
+            self._http2_channels = THttp2Channels(self._configs.http2_channels)
         self.update_servers_status()
 
         # detect the services
@@ -85,19 +124,7 @@ class ConnectionPool(object):
             )
 
         conns_per_address = int(self._configs.min_connection_pool_size / ok_num)
-
-        for addr in self._addresses:
-            for i in range(0, conns_per_address):
-                connection = Connection()
-                connection.open_SSL(
-                    addr[0],
-                    addr[1],
-                    self._configs.timeout,
-                    self._ssl_configs,
-                    self._configs.use_http2,
-                    self._configs.http_headers,
-                )
-                self._connections[addr].append(connection)
+        self._fill_idle_connections(max(conns_per_address, self._configs.min_idle_size))
         return True
 
     def get_session(self, user_name, password, retry_connect=True):
@@ -115,6 +142,7 @@ class ConnectionPool(object):
             auth_result = connection.authenticate(user_name, password)
             return Session(connection, auth_result, self, retry_connect)
         except Exception:
+            self.return_connection(connection)
             raise
 
     @contextlib.contextmanager
@@ -144,6 +172,12 @@ class ConnectionPool(object):
     def get_connection(self):
         """get available connection
 
+        The pool lock is held only to take an idle connection or to reserve
+        the room for a new one, the idle connection is checked and the new
+        one is opened after the lock is released.
+        When the pool is full, it waits up to Config.acquire_timeout for a
+        connection given back, the waiters are served in FIFO order.
+
         :return: Connection
         """
         with self._lock:
@@ -151,7 +185,68 @@ class ConnectionPool(object):
                 logger.error("The pool is closed")
                 raise NotValidConnectionException()
 
-            try:
+        try:
+            waiter = None
+            while True:
+                connection = self._get_connection()
+                if connection is not None:
+                    if waiter is not None:
+                        with self._lock:
+                            self._waiters.done(waiter)
+                    self._keep_idle_connections()
+                    return connection
+
+                with self._lock:
+                    # a connection given back or a room freed after
+                    # _get_connection released the lock finds no waiter,
+                    # check again before waiting
+                    if self._has_available():
+                        continue
+                    if waiter is None:
+                        if not self._can_wait():
+                            logger.error("No available connection")
+                            return None
+                        if 0 < self._configs.max_waiters <= len(self._waiters):
+                            self._waiters.rejections += 1
+                            logger.error("Too many callers wait for a connection")
+                            return None
+                        waiter = self._waiters.push()
+                    else:
+                        # another caller took the room, wait again in the front
+                        self._waiters.push(waiter)
+                remaining = (
+                    waiter.start_time
+                    + self._configs.acquire_timeout / 1000.0
+                    - time.time()
+                )
+                signalled = remaining > 0 and waiter.wait(remaining)
+                with self._lock:
+                    connection, waiter.item = waiter.item, None
+                    if not signalled and connection is None:
+                        self._waiters.done(waiter, timed_out=True)
+                        logger.error("Wait for an available connection timed out")
+                        return None
+                if connection is None:
+                    continue
+                if not self._need_validation(connection) or connection.ping():
+                    with self._lock:
+                        self._waiters.done(waiter)
+                    logger.info("Get connection to {}".format(connection.get_address()))
+                    return connection
+                self._remove_connection(connection)
+        except NotValidConnectionException:
+            raise
+        except Exception as ex:
+            logger.error("Get connection failed: {}".format(ex))
+            return None
+
+    def _get_connection(self):
+        tried = set()
+        while True:
+            with self._lock:
+                if self._close:
+                    logger.error("The pool is closed")
+                    raise NotValidConnectionException()
                 ok_num = self.get_ok_servers_num()
                 if ok_num == 0:
                     logger.error("No available server")
@@ -159,59 +254,283 @@ class ConnectionPool(object):
                 max_con_per_address = int(
                     self._configs.max_connection_pool_size / ok_num
                 )
-                try_count = 0
-                while try_count <= len(self._addresses):
-                    self._pos = (self._pos + 1) % len(self._addresses)
-                    addr = self._addresses[self._pos]
-                    if self._addresses_status[addr] == self.S_OK:
-                        invalid_connections = list()
-
-                        # iterate all connections to find an available connection
-                        for connection in self._connections[addr]:
-                            if not connection.is_used:
-                                # ping to check the connection is valid
-                                if connection.ping():
-                                    connection.is_used = True
-                                    logger.info("Get connection to {}".format(addr))
-                                    return connection
-                                else:
-                                    invalid_connections.append(connection)
-
-                        # remove invalid connections
-                        for connection in invalid_connections:
-                            self._connections[addr].remove(connection)
-
-                        # check if the server is still alive
-                        if not self.ping(addr):
-                            self._addresses_status[addr] = self.S_BAD
-                            continue
-
-                        # create new connection if the number of connections is less than max_con_per_address
-                        if len(self._connections[addr]) < max_con_per_address:
-                            connection = Connection()
-                            connection.open_SSL(
-                                addr[0],
-                                addr[1],
-                                self._configs.timeout,
-                                self._ssl_configs,
-                                self._configs.use_http2,
-                                self._configs.http_headers,
-                            )
-                            connection.is_used = True
-                            self._connections[addr].append(connection)
-                            logger.info("Get connection to {}".format(addr))
-                            return connection
-                    else:
-                        for connection in list(self._connections[addr]):
-                            if not connection.is_used:
-                                self._connections[addr].remove(connection)
-                    try_count = try_count + 1
+                candidates = [
+                    addr
+                    for addr in self._addresses
+                    if self._addresses_status[addr] == self.S_OK and addr not in tried
+                ]
+                if not candidates:
+                    return None
+                addr = self._load_balancer.select(candidates)
+                tried.add(addr)
+                connection, can_open = self._take_connection(addr, max_con_per_address)
+
+            while connection is not None:
+                # ping to check the connection is valid
+                if not self._need_validation(connection) or connection.ping():
+                    logger.info("Get connection to {}".format(addr))
+                    return connection
+                self._remove_connection(connection)
+                with self._lock:
+                    connection, can_open = self._take_connection(
+                        addr, max_con_per_address
+                    )
+
+            if can_open:
+                connection = self._open_connection(addr)
+                if connection is not None:
+                    logger.info("Get connection to {}".format(addr))
+                    return connection
+
+    def _has_available(self):
+        """an ok server has an idle connection or the room to open one,
+        called with the lock held
+        """
+        ok_num = self.get_ok_servers_num()
+        if ok_num == 0:
+            return False
+        max_con_per_address = int(self._configs.max_connection_pool_size / ok_num)
+        for addr in self._addresses:
+            if self._addresses_status[addr] != self.S_OK:
+                continue
+            if not self._idle_connections[addr]:
+                self._reclaim_released(addr)
+            if self._idle_connections[addr]:
+                return True
+            if len(self._connections[addr]) + self._opening[addr] < max_con_per_address:
+                return True
+        return False
+
+    def _can_wait(self):
+        """a connection may be given back to the full pool, called with
+        the lock held
+        """
+        if self._configs.acquire_timeout <= 0:
+            return False
+        for addr in self._addresses:
+            in_use = len(self._connections[addr]) - len(self._idle_connections[addr])
+            if in_use + self._opening[addr] > 0:
+                return True
+        return False
+
+    def load_balancer(self):
+        """get the load balancer, the sessions report their statements to it
+
+        :return: LoadBalancer
+        """
+        return self._load_balancer
+
+    def wait_stats(self):
+        """get the metrics of the callers waiting for a connection: the number
+        of the callers waiting now, that waited, timed out and were rejected,
+        the total and max wait time in ms
+
+        :return: dict
+        """
+        with self._lock:
+            return self._waiters.stats()
+
+    def _need_validation(self, connection):
+        policy = self._configs.validation_policy
+        if policy == 'always':
+            return True
+        if policy == 'idle':
+            return connection.unused_time() > self._configs.validation_idle_time
+        return False
+
+    def return_connection(self, connection):
+        """give back a connection got by get_connection, it is handed out again
+
+        :param connection: the Connection
+        :return: void
+        """
+        with self._lock:
+            addr = connection.get_address()
+            if not connection.is_used and connection in self._idle_connections[addr]:
+                # released with is_used = False and taken back already
+                return
+            connection.is_used = False
+            connection.reset()
+            if self._close or connection not in self._connections.get(addr, ()):
+                return
+            if connection.is_closed() or self._addresses_status.get(addr) != self.S_OK:
+                self._connections[addr].remove(connection)
+                connection.close()
+                self._waiters.wake()
+                return
+            if self._waiters.hand_off(connection):
+                connection.is_used = True
+                return
+            self._idle_connections[addr].append(connection)
+
+    def _take_connection(self, addr, max_con_per_address):
+        """take an idle connection to addr, or reserve the room to open one,
+        called with the lock held
+
+        :return: (Connection or None, whether to open a new connection)
+        """
+        if self._addresses_status[addr] != self.S_OK:
+            self._drop_idle_connections(addr)
+            return None, False
+        idle = self._idle_connections[addr]
+        if not idle:
+            self._reclaim_released(addr)
+        if idle:
+            connection = idle.pop()
+            connection.is_used = True
+            return connection, False
+        if len(self._connections[addr]) + self._opening[addr] < max_con_per_address:
+            self._opening[addr] += 1
+            return None, True
+        return None, False
+
+    def _reclaim_released(self, addr):
+        """take back the connections to addr released the old way, by setting
+        their is_used to False instead of calling return_connection, called
+        with the lock held when addr has no idle connection
+        """
+        idle = self._idle_connections[addr]
+        for connection in list(self._connections[addr]):
+            if connection.is_used or connection in idle:
+                continue
+            logger.warning(
+                "A connection to {} was released by setting is_used to False, "
+                "give it back with ConnectionPool.return_connection".format(addr)
+            )
+            if connection.is_closed():
+                self._connections[addr].remove(connection)
+                continue
+            connection.reset()
+            idle.append(connection)
+
+    def _drop_idle_connections(self, addr):
+        idle = self._idle_connections[addr]
+        while idle:
+            connection = idle.pop()
+            self._connections[addr].remove(connection)
+            connection.close()
+
+    def _keep_idle_connections(self):
+        """open the idle connections in the background when a server has less
+        than Config.min_idle_size
+        """
+        if self._configs.min_idle_size <= 0:
+            return
+        with self._lock:
+            if self._close or self._filling:
+                return
+            for addr in self._addresses:
+                if (
+                    self._addresses_status[addr] == self.S_OK
+                    and len(self._idle_connections[addr]) + self._opening[addr]
+                    < self._configs.min_idle_size
+                ):
+                    break
+            else:
+                return
+            self._filling = True
+        thread = Thread(target=self._fill_in_background, daemon=True)
+        thread.start()
+
+    def _fill_in_background(self):
+        opened = 0
+        try:
+            opened = self._fill_idle_connections(self._configs.min_idle_size)
+        finally:
+            with self._lock:
+                self._filling = False
+        # more connections may be handed out meanwhile
+        if opened > 0:
+            self._keep_idle_connections()
+
+    def _fill_idle_connections(self, idle_size):
+        """open the connections, Config.open_workers at the same time, until
+        every ok server has idle_size idle connections, within the max size
+        of the pool
+
+        :param idle_size: the idle connections of each server
+        :return: the number of the connections opened
+        """
+        with self._lock:
+            if self._close:
+                return 0
+            ok_num = self.get_ok_servers_num()
+            if ok_num == 0:
+                return 0
+            max_con_per_address = int(self._configs.max_connection_pool_size / ok_num)
+            addresses = []
+            for addr in self._addresses:
+                if self._addresses_status[addr] != self.S_OK:
+                    continue
+                count = min(
+                    idle_size - len(self._idle_connections[addr]),
+                    max_con_per_address - len(self._connections[addr]),
+                )
+                count -= self._opening[addr]
+                if count > 0:
+                    self._opening[addr] += count
+                    addresses.extend([addr] * count)
+        if not addresses:
+            return 0
+        workers = min(max(self._configs.open_workers, 1), len(addresses))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return sum(executor.map(self._warm_connection, addresses))
+
+    def _warm_connection(self, addr):
+        try:
+            connection = self._open_connection(addr)
+        except NotValidConnectionException:
+            # the pool is closed
+            return False
+        if connection is None:
+            return False
+        self.return_connection(connection)
+        return True
+
+    def _remove_connection(self, connection):
+        connection.close()
+        with self._lock:
+            conns = self._connections[connection.get_address()]
+            if connection in conns:
+                conns.remove(connection)
+                # the room of the connection is free
+                self._waiters.wake()
 
-                logger.error("No available connection")
-                return None
-            except Exception as ex:
-                logger.error("Get connection failed: {}".format(ex))
-                return None
+    def _open_connection(self, addr):
+        """open a new connection to addr in the room reserved by
+        _take_connection, the server is marked bad if it fails
+
+        :return: Connection or None
+        """
+        connection = Connection()
+        try:
+            connection.open_SSL(
+                addr[0],
+                addr[1],
+                self._configs.timeout,
+                self._ssl_configs,
+                self._configs.use_http2,
+                self._configs.http_headers,
+                self._http2_channels,
+                self._configs.compression,
+                self._configs.compression_min_size,
+                self._configs.protocol,
+                self._configs.lazy_decode,
+            )
+        except Exception as ex:
+            logger.warning("Connect {}:{} failed: {}".format(addr[0], addr[1], ex))
+            with self._lock:
+                self._opening[addr] -= 1
+                self._update_server_status(addr, False)
+            return None
+        with self._lock:
+            self._opening[addr] -= 1
+            if self._close:
+                connection.close()
+                raise NotValidConnectionException()
+            connection.is_used = True
+            self._connections[addr].append(connection)
+        return connection
 
     def ping(self, address):
         """check the server is ok
@@ -251,6 +570,11 @@ class ConnectionPool(object):
                     if connection.is_used:
                         logger.warning("Closing a connection that is in use")
                     connection.close()
+            for idle in self._idle_connections.values():
+                idle.clear()
+            self._waiters.wake(all=True)
+            if self._http2_channels is not None:
+                self._http2_channels.close()
             self._close = True
 
     def connects(self):
@@ -277,6 +601,15 @@ class ConnectionPool(object):
                         count = count + 1
             return count
 
+    def idle_connects(self):
+        """get the number of the idle connections, they are handed out without
+        opening a connection
+
+        :return: int
+        """
+        with self._lock:
+            return sum(len(idle) for idle in self._idle_connections.values())
+
     def get_ok_servers_num(self):
         """get the number of the ok servers
 
@@ -298,45 +631,133 @@ class ConnectionPool(object):
         return ", ".join(msg_list)
 
     def update_servers_status(self):
-        """update the servers' status"""
-        for address in self._addresses:
-            if self.ping(address):
-                self._addresses_status[address] = self.S_OK
-            else:
-                self._addresses_status[address] = self.S_BAD
+        """update the servers' status, all the servers are checked at the same
+        time. A bad server is checked again after Config.breaker_reset_timeout
+        """
+        with self._lock:
+            addresses = [
+                addr for addr in self._addresses if self._breakers[addr].allow_probe()
+            ]
+        results = probe_in_parallel(self._probe, addresses)
+        with self._lock:
+            for addr, ok in results.items():
+                self._update_server_status(addr, ok)
+
+    def server_failed(self, address):
+        """a connection to the server is broken, update the servers' status in
+        the background, so the caller is not blocked by the health check
+
+        :param address: (ip, port)
+        :return: void
+        """
+        with self._lock:
+            if self._close or self._checking:
+                return
+            self._checking = True
+        logger.warning("The connection to {} is broken".format(address))
+        thread = Thread(target=self._check_in_background, daemon=True)
+        thread.start()
+
+    def _check_in_background(self):
+        try:
+            self.update_servers_status()
+        finally:
+            with self._lock:
+                self._checking = False
+
+    def _probe(self, address):
+        """check the server with an idle connection to it, or with a new
+        connection when there is none. The oldest idle connection is taken
+        and given back with its idle time, the probe does not use it
+        """
+        with self._lock:
+            idle = self._idle_connections[address]
+            connection = idle.popleft() if idle else None
+            if connection is not None:
+                connection.is_used = True
+        if connection is not None:
+            if connection.ping():
+                self._give_back_idle(connection)
+                return True
+            self._remove_connection(connection)
+        return self.ping(address)
+
+    def _update_server_status(self, address, ok):
+        """record a health check of the server on its breaker, the server is
+        ok when the check succeeds and bad when the breaker opens, called with
+        the lock held
+        """
+        if ok:
+            self._breakers[address].succeed()
+            self._addresses_status[address] = self.S_OK
+        elif self._breakers[address].fail():
+            self._addresses_status[address] = self.S_BAD
+            self._drop_idle_connections(address)
 
     def _remove_idle_unusable_connection(self):
-        if self._configs.idle_time == 0:
+        if (
+            self._configs.idle_time == 0
+            and self._configs.validation_policy != 'background'
+        ):
             return
         with self._lock:
-            for addr in self._connections.keys():
-                conns = self._connections[addr]
-                for connection in list(conns):
-                    if not connection.is_used:
-                        if not connection.ping():
-                            logger.debug(
-                                "Remove the unusable connection to {}".format(
-                                    connection.get_address()
-                                )
-                            )
-                            conns.remove(connection)
-                            continue
-                        if (
-                            self._configs.idle_time != 0
-                            and connection.idle_time() > self._configs.idle_time
-                        ):
-                            logger.debug(
-                                "Remove the idle connection to {}".format(
-                                    connection.get_address()
-                                )
-                            )
-                            conns.remove(connection)
+            checking = [c for idle in self._idle_connections.values() for c in idle]
+        if not checking:
+            return
+        # a few connections are out of the idle list at a time, the others
+        # are still handed out meanwhile
+        workers = min(IDLE_CHECK_WORKERS, len(checking))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            list(executor.map(self._check_idle_connection, checking))
+
+    def _check_idle_connection(self, connection):
+        """take the idle connection out of the pool to ping it without the
+        lock, and give it back as soon as the ping returns. It is closed if
+        it is broken, or idle longer than Config.idle_time while the server
+        has min_idle_size idle connections besides it
+        """
+        addr = connection.get_address()
+        with self._lock:
+            idle = self._idle_connections[addr]
+            if self._close or connection not in idle:
+                # handed out meanwhile
+                return
+            idle.remove(connection)
+            expired = (
+                self._configs.idle_time != 0
+                and connection.idle_time() > self._configs.idle_time
+                and len(idle) >= self._configs.min_idle_size
+            )
+            connection.is_used = True
+        if expired:
+            logger.debug("Remove the idle connection to {}".format(addr))
+            self._remove_connection(connection)
+        elif not connection.ping():
+            logger.debug("Remove the unusable connection to {}".format(addr))
+            self._remove_connection(connection)
+        else:
+            self._give_back_idle(connection)
+
+    def _give_back_idle(self, connection):
+        """give back a connection taken out of the idle list, to a waiter or
+        to the oldest end of the idle list, its idle time is kept
+        """
+        with self._lock:
+            addr = connection.get_address()
+            if self._close or connection not in self._connections.get(addr, ()):
+                connection.close()
+                return
+            if self._waiters.hand_off(connection):
+                return
+            connection.is_used = False
+            self._idle_connections[addr].appendleft(connection)
 
     def _period_detect(self):
         if self._close or self._configs.interval_check < 0:
             return
         self.update_servers_status()
         self._remove_idle_unusable_connection()
+        self._fill_idle_connections(self._configs.min_idle_size)
         timer = Timer(self._configs.interval_check, self._period_detect)
         timer.daemon = True
         timer.start()
@@ -0,0 +1,82 @@
+# --coding:utf-8--
+#
+# Copyright (c) 2026 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License.
+
+
+import time
+
+from concurrent.futures import ThreadPoolExecutor
+
+
+class CircuitBreaker(object):
+    """The circuit breaker of a graphd address.
+    closed: the address is probed by every health check.
+    open: the probes of the address failed failure_threshold times in a row,
+    it is not used and not probed until reset_timeout has passed.
+    half_open: one probe is let through, the breaker closes if it succeeds
+    and opens again if it fails.
+    All the methods are called with the lock of the pool held.
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=1, reset_timeout=10000):
+        """
+        :param failure_threshold: the failures in a row to open the breaker
+        :param reset_timeout: the time an open breaker waits to let a probe
+        through, unit ms
+        """
+        self.state = self.CLOSED
+        self.failures = 0
+        self._failure_threshold = max(1, failure_threshold)
+        self._reset_timeout = reset_timeout
+        self._open_time = 0
+
+    def allow_probe(self):
+        """the address may be probed now, an open breaker turns half open
+        when reset_timeout has passed
+
+        :return: True or False
+        """
+        if self.state == self.CLOSED:
+            return True
+        if (
+            self.state == self.OPEN
+            and (time.time() - self._open_time) * 1000 >= self._reset_timeout
+        ):
+            self.state = self.HALF_OPEN
+            return True
+        return False
+
+    def succeed(self):
+        self.failures = 0
+        self.state = self.CLOSED
+
+    def fail(self):
+        """record a failed probe
+
+        :return: True if the breaker is open
+        """
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self._failure_threshold:
+            self.state = self.OPEN
+            self._open_time = time.time()
+        return self.state == self.OPEN
+
+
+def probe_in_parallel(probe, addresses):
+    """call probe on the addresses at the same time, so a health check takes
+    as long as the slowest address instead of all of them
+
+    :param probe: the function to check an address, returns True or False
+    :param addresses: the addresses to check
+    :return: dict of address to the result of the probe
+    """
+    if len(addresses) <= 1:
+        return {address: probe(address) for address in addresses}
+    with ThreadPoolExecutor(max_workers=len(addresses)) as executor:
+        return dict(zip(addresses, executor.map(probe, addresses)))
@@ -0,0 +1,145 @@
+# --coding:utf-8--
+#
+# Copyright (c) 2026 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License.
+
+
+from collections import OrderedDict, deque
+
+# any space, for the sessions of a pool with one space
+ANY_SPACE = object()
+
+
+class IdleSessions(object):
+    """The idle sessions of a session pool, a deque per space and graphd
+    address. A session is taken from the address the load balancer selects
+    and from any address in O(1), the oldest idle one first, so the sessions
+    of the pool are used in turn. The spaces are kept in LRU order, the space
+    given a session back least recently is the first to give up its sessions.
+    Iterating yields all the sessions in that order.
+    """
+
+    def __init__(self):
+        # space to the dict of address to sessions
+        self._spaces = OrderedDict()
+        self._size = 0
+
+    def __len__(self):
+        return self._size
+
+    def __iter__(self):
+        for addresses in list(self._spaces.values()):
+            for sessions in list(addresses.values()):
+                yield from list(sessions)
+
+    def addresses(self, space=ANY_SPACE):
+        """get the addresses which have idle sessions
+
+        :param space: the space of the sessions, any space by default
+        :return: list of (ip, port)
+        """
+        if space is not ANY_SPACE:
+            return list(self._spaces.get(space, ()))
+        addresses = []
+        for sessions in self._spaces.values():
+            for address in sessions:
+                if address not in addresses:
+                    addresses.append(address)
+        return addresses
+
+    def append(self, session, space=None, used=True):
+        """add the session, its space becomes the most recently used
+
+        :param session: the session
+        :param space: the space the session is in, None if it is not known
+        :param used: False to keep the space in its place, a new space becomes
+            the least recently used, for a session given back unused
+        :return: void
+        """
+        addresses = self._spaces.get(space)
+        if addresses is None:
+            addresses = self._spaces[space] = dict()
+            if not used:
+                self._spaces.move_to_end(space, last=False)
+        elif used:
+            self._spaces.move_to_end(space)
+        address = session._connection.get_address()
+        sessions = addresses.get(address)
+        if sessions is None:
+            sessions = addresses[address] = deque()
+        sessions.append(session)
+        self._size += 1
+
+    def appendleft(self, session, space=None):
+        """add back a session taken by pop and not used, as the oldest idle
+        session of its address, its space keeps its place
+
+        :param session: the session
+        :param space: the space the session is in, None if it is not known
+        :return: void
+        """
+        addresses = self._spaces.get(space)
+        if addresses is None:
+            addresses = self._spaces[space] = dict()
+            self._spaces.move_to_end(space, last=False)
+        address = session._connection.get_address()
+        sessions = addresses.get(address)
+        if sessions is None:
+            sessions = addresses[address] = deque()
+        sessions.appendleft(session)
+        self._size += 1
+
+    def pop(self, address=None, space=ANY_SPACE):
+        """take the oldest idle session, of the address and of the space if
+        given, from the least recently used space otherwise
+
+        :param address: (ip, port)
+        :param space: the space of the session
+        :return: Session or None
+        """
+        if space is ANY_SPACE:
+            spaces = list(self._spaces)
+        else:
+            spaces = [space]
+        for space in spaces:
+            addresses = self._spaces.get(space)
+            if not addresses:
+                continue
+            if address is None:
+                key = next(iter(addresses))
+            elif address in addresses:
+                key = address
+            else:
+                continue
+            sessions = addresses[key]
+            session = sessions.popleft()
+            if not sessions:
+                del addresses[key]
+                if not addresses:
+                    del self._spaces[space]
+            self._size -= 1
+            return session
+        return None
+
+    def remove(self, session):
+        """remove the session, it is O(n) of the sessions of its address
+
+        :return: True if the session was idle
+        """
+        address = session._connection.get_address()
+        for space, addresses in list(self._spaces.items()):
+            sessions = addresses.get(address)
+            if sessions is not None and session in sessions:
+                sessions.remove(session)
+                if not sessions:
+                    del addresses[address]
+                    if not addresses:
+                        del self._spaces[space]
+                self._size -= 1
+                return True
+        return False
+
+    def clear(self):
+        self._spaces.clear()
+        self._size = 0
@@ -0,0 +1,161 @@
+# --coding:utf-8--
+#
+# Copyright (c) 2026 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License.
+
+
+import random
+
+from abc import ABC, abstractmethod
+from itertools import count
+from threading import Lock
+
+
+class LoadBalancer(ABC):
+    """Select the graphd address for a new connection or session.
+    The sessions report each statement to it with begin and end, so it knows
+    the requests in flight and the latency of every address.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._in_flight = dict()
+        self._latency = dict()
+
+    @abstractmethod
+    def select(self, addresses):
+        """select one of the addresses
+
+        :param addresses: the addresses of the ok servers, not empty
+        :return: the address
+        """
+        pass
+
+    def begin(self, address):
+        """a statement is sent to the address
+
+        :param address: (ip, port)
+        :return: void
+        """
+        with self._lock:
+            self._in_flight[address] = self._in_flight.get(address, 0) + 1
+
+    def end(self, address, latency, succeeded=True):
+        """the statement sent to the address is finished
+
+        :param address: (ip, port)
+        :param latency: the time it took, unit second
+        :param succeeded: False if it failed with an error of the connection
+        :return: void
+        """
+        with self._lock:
+            self._in_flight[address] = max(0, self._in_flight.get(address, 0) - 1)
+            self._update_latency(address, latency, succeeded)
+
+    def _update_latency(self, address, latency, succeeded):
+        self._latency[address] = latency
+
+    def in_flight(self, address):
+        return self._in_flight.get(address, 0)
+
+    def latency(self, address):
+        return self._latency.get(address, 0.0)
+
+    def stats(self):
+        """get the requests in flight and the latency in ms of every address
+
+        :return: dict
+        """
+        with self._lock:
+            return {
+                address: {
+                    'in_flight': self.in_flight(address),
+                    'latency': self.latency(address) * 1000,
+                }
+                for address in set(self._in_flight) | set(self._latency)
+            }
+
+
+class RoundRobinLoadBalancer(LoadBalancer):
+    """Select the addresses in turn"""
+
+    def __init__(self):
+        super().__init__()
+        self._counter = count()
+
+    def select(self, addresses):
+        return addresses[next(self._counter) % len(addresses)]
+
+
+class LeastInFlightLoadBalancer(LoadBalancer):
+    """Select the address with the least requests in flight, in turn when
+    several have the least
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._counter = count()
+
+    def select(self, addresses):
+        least = min(self.in_flight(address) for address in addresses)
+        candidates = [
+            address for address in addresses if self.in_flight(address) == least
+        ]
+        return candidates[next(self._counter) % len(candidates)]
+
+
+class EwmaLoadBalancer(LoadBalancer):
+    """Select the cheaper of two random addresses, the power of two choices,
+    the cost of an address is the exponentially weighted moving average of
+    its latency times its requests in flight plus one.
+    The addresses not measured yet cost nothing, so they are tried first.
+    """
+
+    def __init__(self, alpha=0.3, failure_latency=1.0):
+        """
+        :param alpha: the weight of the newest latency
+        :param failure_latency: the latency counted for a failed statement,
+        unit second
+        """
+        super().__init__()
+        self._alpha = alpha
+        self._failure_latency = failure_latency
+
+    def _update_latency(self, address, latency, succeeded):
+        if not succeeded:
+            latency = max(latency, self._failure_latency)
+        if address not in self._latency:
+            self._latency[address] = latency
+        else:
+            self._latency[address] += self._alpha * (latency - self._latency[address])
+
+    def _cost(self, address):
+        return self.latency(address) * (self.in_flight(address) + 1)
+
+    def select(self, addresses):
+        if len(addresses) == 1:
+            return addresses[0]
+        first, second = random.sample(addresses, 2)
+        return first if self._cost(first) <= self._cost(second) else second
+
+
+LOAD_BALANCERS = {
+    'round_robin': RoundRobinLoadBalancer,
+    'least_in_flight': LeastInFlightLoadBalancer,
+    'ewma': EwmaLoadBalancer,
+}
+
+
+def create_load_balancer(load_balancer):
+    """create the load balancer of a pool
+
+    :param load_balancer: 'round_robin', 'least_in_flight', 'ewma'
+    or a LoadBalancer
+    :return: LoadBalancer
+    """
+    if isinstance(load_balancer, LoadBalancer):
+        return load_balancer
+    if load_balancer not in LOAD_BALANCERS:
+        raise ValueError("Unknown load balancer: {}".format(load_balancer))
+    return LOAD_BALANCERS[load_balancer]()
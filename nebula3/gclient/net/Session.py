@@ -15,9 +15,10 @@ from nebula3.Exception import (
     NotValidConnectionException,
 )
 from nebula3.common.ttypes import ErrorCode
+from nebula3.fbthrift.Thrift import TApplicationException
 from nebula3.data.ResultSet import ResultSet
 from nebula3.gclient.net.AuthResult import AuthResult
-from nebula3.gclient.net.base import BaseExecutor
+from nebula3.gclient.net.base import BaseExecutor, _build_request, _result_or_error
 from nebula3.logger import logger
 
 if TYPE_CHECKING:
@@ -56,6 +57,12 @@ class Session(BaseExecutor, object):
         self._retry_interval_seconds = retry_interval_seconds
         # the time stamp when the session was added to the idle list of the session pool
         self._idle_time_start = 0
+        # the time stamp when the session pool pinged the idle session
+        self._keep_alive_time = 0
+        # the load balancer of the pool, told the latency of every statement
+        self._load_balancer = None
+        if hasattr(pool, 'load_balancer'):
+            self._load_balancer = pool.load_balancer()
 
     def execute(self, stmt):
         """execute statement
@@ -71,6 +78,26 @@ class Session(BaseExecutor, object):
         :param params: parameter map
         :return: ResultSet
         """
+        return self._track(self._execute_parameter, stmt, params)
+
+    def _track(self, execute, stmt, params):
+        """execute and report the statement to the load balancer of the pool"""
+        if self._connection is None:
+            raise RuntimeError("The session has been released")
+        if self._load_balancer is None:
+            return execute(stmt, params)
+        address = self._connection.get_address()
+        self._load_balancer.begin(address)
+        start_time = time.time()
+        succeeded = False
+        try:
+            resp = execute(stmt, params)
+            succeeded = True
+            return resp
+        finally:
+            self._load_balancer.end(address, time.time() - start_time, succeeded)
+
+    def _execute_parameter(self, stmt, params):
         if self._connection is None:
             raise RuntimeError("The session has been released")
         try:
@@ -100,7 +127,7 @@ class Session(BaseExecutor, object):
             )
         except IOErrorException as ie:
             if ie.type == IOErrorException.E_CONNECT_BROKEN:
-                self._pool.update_servers_status()
+                self._server_failed()
                 if self._retry_connect:
                     if not self._reconnect():
                         logger.warning("Retry connect failed")
@@ -120,6 +147,112 @@ class Session(BaseExecutor, object):
         except Exception:
             raise
 
+    def execute_pipeline(self, requests, window=128):
+        """execute the statements back to back on the connection of the
+        session, without waiting for the reply of one to send the next, see
+        Connection.execute_pipeline. It suits many small independent
+        statements, e.g. fetching the properties of vertices one by one.
+        The statements are not sent again when the connection breaks, some of
+        them may have been executed, the session reconnects for the next ones.
+
+        :param requests: the list of the ngql or (ngql, parameter map)
+        :param window: the max number of the requests sent and not replied
+        :return: the list of ResultSet in the order of the requests
+        """
+        requests = [
+            (request, None) if isinstance(request, str) else tuple(request)
+            for request in requests
+        ]
+        results = self._track(self._execute_pipeline, requests, window)
+        for result in results:
+            if isinstance(result, Exception):
+                raise result
+        return results
+
+    def execute_many(self, stmts_or_params, concurrency=8):
+        """execute a list of statements, see BaseExecutor.execute_many. They are
+        pipelined on the connection of the session, concurrency is the window
+        of the pipeline. When the connection breaks, the statements not
+        replied yet get the error and are not sent again, see execute_pipeline
+
+        :param stmts_or_params: the statements, or the (statement, parameters)
+        :param concurrency: the max number of the statements sent and not replied
+        :return: the results in the order of the statements, a ResultSet, or
+        the exception of a statement that failed
+        """
+        results = []
+        requests = []
+        for request in stmts_or_params:
+            try:
+                requests.append(_build_request(request))
+                results.append(None)
+            except Exception as e:
+                results.append(e)
+        try:
+            resps = iter(
+                self._track(
+                    self._execute_pipeline,
+                    [(stmt, byte_params) for stmt, _, byte_params in requests],
+                    max(concurrency, 1),
+                )
+            )
+        except Exception as e:
+            return [e if result is None else result for result in results]
+        requests = iter(requests)
+        for index, result in enumerate(results):
+            if result is None:
+                stmt, params, _ = next(requests)
+                resp = next(resps)
+                if not isinstance(resp, Exception):
+                    resp = _result_or_error(resp, stmt, params)
+                results[index] = resp
+        return results
+
+    def _execute_pipeline(self, requests, window):
+        """run the pipeline, the requests not replied when the connection
+        fails get its error
+
+        :return: the list of ResultSet, or the exception of a request
+        """
+        if self._connection is None:
+            raise RuntimeError("The session has been released")
+        start_time = time.time()
+        replies = [None] * len(requests)
+        error = None
+        try:
+            self._connection.execute_pipeline(
+                self._session_id, requests, window, replies
+            )
+        except TApplicationException:
+            # in the replies of its requests
+            pass
+        except IOErrorException as ie:
+            error = ie
+            if ie.type == IOErrorException.E_CONNECT_BROKEN:
+                self._server_failed()
+                # the session is usable again, the requests are not sent again
+                if self._retry_connect and not self._reconnect():
+                    logger.warning("Retry connect failed")
+                    error = IOErrorException(IOErrorException.E_ALL_BROKEN, ie.message)
+        except Exception as e:
+            error = e
+        latency = int((time.time() - start_time) * 1000000)
+        results = []
+        for reply in replies:
+            if reply is None:
+                results.append(error)
+            elif isinstance(reply, Exception):
+                results.append(reply)
+            else:
+                results.append(
+                    ResultSet(
+                        reply,
+                        all_latency=latency,
+                        timezone_offset=self._timezone_offset,
+                    )
+                )
+        return results
+
     def execute_json(self, stmt):
         """execute statement and return the result as a JSON bytes
             Date and Datetime will be returned in UTC
@@ -245,6 +378,9 @@ class Session(BaseExecutor, object):
         :param params: parameter map
         :return: JSON bytes
         """
+        return self._track(self._execute_json_with_parameter, stmt, params)
+
+    def _execute_json_with_parameter(self, stmt, params):
         if self._connection is None:
             raise RuntimeError("The session has been released")
         try:
@@ -273,7 +409,7 @@ class Session(BaseExecutor, object):
 
         except IOErrorException as ie:
             if ie.type == IOErrorException.E_CONNECT_BROKEN:
-                self._pool.update_servers_status()
+                self._server_failed()
                 if self._retry_connect:
                     if not self._reconnect():
                         logger.warning("Retry connect failed")
@@ -296,7 +432,7 @@ class Session(BaseExecutor, object):
         if self._connection is None:
             return
         self._connection.signout(self._session_id)
-        self._connection.is_used = False
+        self._return_connection()
         self._connection = None
 
     def ping(self):
@@ -323,7 +459,9 @@ class Session(BaseExecutor, object):
 
     def _reconnect(self):
         try:
-            self._connection.is_used = False
+            # the pool drops the broken connection instead of handing it out
+            self._connection.close()
+            self._return_connection()
             conn = self._pool.get_connection()
             if conn is None:
                 return False
@@ -332,6 +470,20 @@ class Session(BaseExecutor, object):
             return False
         return True
 
+    def _return_connection(self):
+        # the connection pool hands out the returned connections again
+        if hasattr(self._pool, 'return_connection'):
+            self._pool.return_connection(self._connection)
+        else:
+            self._connection.is_used = False
+
+    def _server_failed(self):
+        # the pools check the servers in the background
+        if hasattr(self._pool, 'server_failed'):
+            self._pool.server_failed(self._connection.get_address())
+        else:
+            self._pool.update_servers_status()
+
     def __del__(self):
         self.release()
 
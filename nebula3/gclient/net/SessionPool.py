@@ -5,11 +5,11 @@
 # This source code is licensed under Apache 2.0 License.
 
 
-import json
 import socket
 
-from threading import RLock, Timer
-from typing import List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from threading import RLock, Thread, Timer
+from typing import Dict, Optional, Set
 import time
 
 from nebula3.common.ttypes import ErrorCode
@@ -19,13 +19,56 @@ from nebula3.Exception import (
     InValidHostname,
 )
 
+from nebula3.fbthrift.transport.THttp2Client import THttp2Channels
 from nebula3.gclient.net.Session import Session
 from nebula3.gclient.net.Connection import Connection
-from nebula3.gclient.net.base import BaseExecutor
+from nebula3.gclient.net.base import (
+    BaseExecutor,
+    _json_session_error,
+    _may_switch_space,
+)
+from nebula3.gclient.net.HealthCheck import CircuitBreaker, probe_in_parallel
+from nebula3.gclient.net.IdleSessions import IdleSessions
+from nebula3.gclient.net.LoadBalancer import create_load_balancer
+from nebula3.gclient.net.WaitQueue import WaitQueue
 from nebula3.logger import logger
 from nebula3.Config import SessionPoolConfig, SSL_config
 
 
+class SessionPoolSpace(BaseExecutor):
+    """The executor of the statements in a space with the sessions of a
+    SessionPool, see SessionPool.space
+    """
+
+    def __init__(self, pool, space_name):
+        self._pool = pool
+        self._space_name = space_name
+
+    def execute_parameter(self, stmt, params):
+        """execute statement in the space
+
+        :param stmt: the query string
+        :param params: parameter map
+        :return: ResultSet
+        """
+        return self._pool._execute_parameter(stmt, params, self._space_name)
+
+    def execute_json_with_parameter(self, stmt, params):
+        """execute statement in the space and return the result as a JSON bytes
+
+        :param stmt: the query string
+        :param params: parameter map
+        :return: JSON bytes
+        """
+        return self._pool._execute_json_with_parameter(stmt, params, self._space_name)
+
+    def execute_many(self, stmts_or_params, concurrency=8):
+        """see SessionPool.execute_many"""
+        return super().execute_many(
+            stmts_or_params, min(concurrency, self._pool._configs.max_size)
+        )
+
+
 class SessionPool(BaseExecutor, object):
     S_OK = 0
     S_BAD = 1
@@ -54,21 +97,38 @@ class SessionPool(BaseExecutor, object):
             self._addresses.append(ip_port)
             self._addresses_status[ip_port] = self.S_BAD
 
+        # the circuit breakers of the servers, they decide the status
+        self._breakers = dict()
+        # a health check is running in the background
+        self._checking = False
+
         # sessions that are currently in use
-        self._active_sessions: List[Session] = list()
-        # sessions that are currently available
-        self._idle_sessions: List[Session] = list()
+        self._active_sessions: Set[Session] = set()
+        # sessions that are currently available, per address
+        self._idle_sessions = IdleSessions()
+        # the space every session is in, None when a statement may have left
+        # it in another space. A session is switched to the space of the
+        # caller when it is checked out
+        self._session_spaces: Dict[Session, Optional[str]] = dict()
+        # the number of sessions being created out of the lock, they count
+        # for the max size
+        self._creating = 0
+        # the callers waiting for a session when the pool is full
+        self._waiters = WaitQueue()
 
         self._configs = SessionPoolConfig()
         self._ssl_configs = None
         self._lock = RLock()
 
-        # the index of the next address to connect
-        self._pos = -1
+        # pick the address of the new sessions and the idle sessions
+        self._load_balancer = None
 
         # the flag of whether the pool is closed
         self._close = False
 
+        # the http2 connections shared by all sessions, see SessionPoolConfig.http2_channels
+        self._http2_channels = None
+
     def __del__(self):
         if hasattr(self, '_lock'):
             self.close()
@@ -99,14 +159,23 @@ class SessionPool(BaseExecutor, object):
         # check configs
         try:
             self._check_configs()
+            self._load_balancer = create_load_balancer(self._configs.load_balancer)
         except Exception as e:
             logger.error("Invalid configs: {}".format(e))
             return False
+        for address in self._addresses:
+            self._breakers[address] = CircuitBreaker(
+                self._configs.breaker_failure_threshold,
+                self._configs.breaker_reset_timeout,
+            )
 
         if self._close:
             logger.error("The pool has init or closed.")
             raise RuntimeError("The pool has init or closed.")
 
+        if self._configs.use_http2 and self._configs.http2_channels > 0:
+            self._http2_channels = THttp2Channels(self._configs.http2_channels)
+
         # ping all servers
         self.update_servers_status()
 
@@ -119,12 +188,29 @@ class SessionPool(BaseExecutor, object):
                 "The services status exception: {}".format(self._get_services_status())
             )
 
-        # iterate all addresses and create sessions to fullfil the min_size
-        for i in range(self._configs.min_size):
-            session = self._new_session()
-            if session is None:
-                raise RuntimeError("Get session failed")
-            self._add_session_to_idle(session)
+        # create the sessions of min_size at the same time
+        if self._configs.min_size > 0:
+            workers = min(self._configs.create_workers, self._configs.min_size)
+            with self._lock:
+                self._creating += self._configs.min_size
+            try:
+                with ThreadPoolExecutor(max_workers=workers) as executor:
+                    futures = [
+                        executor.submit(self._new_session)
+                        for _ in range(self._configs.min_size)
+                    ]
+            finally:
+                with self._lock:
+                    self._creating -= self._configs.min_size
+            errors = [f.exception() for f in futures if f.exception() is not None]
+            for future in futures:
+                if future.exception() is None:
+                    self._add_session_to_idle(future.result())
+            if errors:
+                raise errors[0]
+
+        # ping the idle sessions in the background
+        self._period_keep_alive()
 
         return True
 
@@ -167,7 +253,7 @@ class SessionPool(BaseExecutor, object):
         1. The query should not be a plain space switch statement, e.g. "USE test_space",
         but queries like "use space xxx; match (v) return v" are accepted.
         2. If the query contains statements like "USE <space name>", the space will be set to the
-        one in the pool config after the execution of the query.
+        one in the pool config before the session runs the next query.
         3. The query should not change the user password nor drop a user.
 
         :param stmt: the query string
@@ -182,10 +268,24 @@ class SessionPool(BaseExecutor, object):
         :param params: parameter map
         :return: ResultSet
         """
-        session = self._get_idle_session()
-        if session is None:
-            raise RuntimeError("Get session failed")
-        self._add_session_to_active(session)
+        return self._execute_parameter(stmt, params, self._space_name)
+
+    def space(self, space_name):
+        """get the executor of the statements in another space, they run
+        with the sessions of the pool, so the spaces share its connections
+        and SessionPoolConfig.max_size. An idle session of the space is used
+        first, an idle session of the least recently used space is switched
+        to the space when there is none and the pool is full.
+
+            result = pool.space('tenant_1').execute_py('MATCH (v) RETURN v LIMIT 1')
+
+        :param space_name: the space name
+        :return: SessionPoolSpace
+        """
+        return SessionPoolSpace(self, space_name)
+
+    def _execute_parameter(self, stmt, params, space_name):
+        session = self._get_bound_session(space_name)
 
         try:
             resp = session.execute_parameter(stmt, params)
@@ -195,31 +295,35 @@ class SessionPool(BaseExecutor, object):
                 ErrorCode.E_SESSION_INVALID,
                 ErrorCode.E_SESSION_TIMEOUT,
             ]:
-                self._active_sessions.remove(session)
-                session = self._get_idle_session()
-                if session is None:
-                    logger.warning(
-                        "Session invalid or timeout, removed from the pool, but failed to get a new session."
-                    )
-                    return resp
-                logger.warning("Session invalid or timeout, session has been recycled")
-                self._add_session_to_idle(session)
-
+                self._recycle_session(session, space_name)
             else:
-                # reset the space name to the pool config
-                if resp.space_name() != self._space_name:
-                    self._set_space_to_default(session)
-
-                # move the session back to the idle list
-                self._return_session(session)
-
+                # only a statement like USE may leave the session in another
+                # space, it is switched back when the session is checked out
+                self._return_session(
+                    session,
+                    _may_switch_space(stmt) and resp.space_name() != space_name,
+                )
             return resp
         except Exception as e:
             logger.error("Execute failed: {}".format(e))
             # remove the session from the pool if it is invalid
-            self._active_sessions.remove(session)
+            self._remove_active_session(session)
             raise e
 
+    def execute_many(self, stmts_or_params, concurrency=8):
+        """execute a list of statements concurrently with the sessions of the
+        pool, see BaseExecutor.execute_many. The concurrency is at most the
+        max size of the pool
+
+        :param stmts_or_params: the statements, or the (statement, parameters)
+        :param concurrency: the max number of the statements executed at the same time
+        :return: the results in the order of the statements, a ResultSet, or
+        the exception of a statement that failed
+        """
+        return super().execute_many(
+            stmts_or_params, min(concurrency, self._configs.max_size)
+        )
+
     def execute_json(self, stmt):
         """execute statement and return the result as a JSON bytes
             Date and Datetime will be returned in UTC
@@ -284,42 +388,26 @@ class SessionPool(BaseExecutor, object):
         return super().execute_json(stmt)
 
     def execute_json_with_parameter(self, stmt, params):
-        session = self._get_idle_session()
-        if session is None:
-            raise RuntimeError("Get session failed")
-        self._add_session_to_active(session)
+        return self._execute_json_with_parameter(stmt, params, self._space_name)
+
+    def _execute_json_with_parameter(self, stmt, params, space_name):
+        session = self._get_bound_session(space_name)
 
         try:
             resp = session.execute_json_with_parameter(stmt, params)
-            json_obj = json.loads(resp)
-            # Check for session validity based on error code
-            if json_obj.get("errors", [{}])[0].get("code") in [
-                ErrorCode.E_SESSION_INVALID,
-                ErrorCode.E_SESSION_TIMEOUT,
-            ]:
-                self._active_sessions.remove(session)
-                session = self._get_idle_session()
-                if session is None:
-                    logger.warning(
-                        "Session invalid or timeout, removed from the pool, but failed to get a new session."
-                    )
-                    return resp
-                self._add_session_to_idle(session)
-                logger.warning("Session invalid or timeout, session has been recycled")
-
+            # Check for session validity based on error code, the response
+            # is parsed only when it may carry the error
+            if _json_session_error(resp):
+                self._recycle_session(session, space_name)
             else:
-                # reset the space name to the pool config
-                if json_obj["results"][0]["spaceName"] != self._space_name:
-                    self._set_space_to_default(session)
-
-                # move the session back to the idle list
-                self._return_session(session)
-
+                # the space name is not read from the response, a statement
+                # like USE always gets its session switched back
+                self._return_session(session, _may_switch_space(stmt))
             return resp
         except Exception as e:
             logger.error("Execute failed: {}".format(e))
             # remove the session from the pool if it is invalid
-            self._active_sessions.remove(session)
+            self._remove_active_session(session)
             raise e
 
     def close(self):
@@ -335,6 +423,10 @@ class SessionPool(BaseExecutor, object):
                 session._sign_out()
                 session._connection.close()
             self._idle_sessions.clear()
+            self._session_spaces.clear()
+            self._waiters.wake(all=True)
+            if self._http2_channels is not None:
+                self._http2_channels.close()
             self._close = True
 
     def get_ok_servers_num(self):
@@ -358,133 +450,458 @@ class SessionPool(BaseExecutor, object):
         return ", ".join(msg_list)
 
     def update_servers_status(self):
-        """update the servers' status"""
-        for address in self._addresses:
-            if self.ping(address):
-                self._addresses_status[address] = self.S_OK
-            else:
-                self._addresses_status[address] = self.S_BAD
+        """update the servers' status, all the servers are checked at the same
+        time. A bad server is checked again after
+        SessionPoolConfig.breaker_reset_timeout
+        """
+        with self._lock:
+            addresses = [
+                addr for addr in self._addresses if self._breakers[addr].allow_probe()
+            ]
+        results = probe_in_parallel(self._probe, addresses)
+        with self._lock:
+            for addr, ok in results.items():
+                if ok:
+                    self._breakers[addr].succeed()
+                    self._addresses_status[addr] = self.S_OK
+                elif self._breakers[addr].fail():
+                    self._addresses_status[addr] = self.S_BAD
+
+    def server_failed(self, address):
+        """a connection to the server is broken, update the servers' status in
+        the background, so the caller is not blocked by the health check
+
+        :param address: (ip, port)
+        :return: void
+        """
+        with self._lock:
+            if self._close or self._checking:
+                return
+            self._checking = True
+        logger.warning("The connection to {} is broken".format(address))
+        thread = Thread(target=self._check_in_background, daemon=True)
+        thread.start()
+
+    def _check_in_background(self):
+        try:
+            self.update_servers_status()
+        finally:
+            with self._lock:
+                self._checking = False
+
+    def _probe(self, address):
+        """check the server with the connection of an idle session to it, or
+        with a new connection when there is none. The session is given back
+        where it was, with its idle time, the probe does not use it
+        """
+        with self._lock:
+            session = self._idle_sessions.pop(address)
+            if session is not None:
+                idle_time_start = session._idle_time_start
+                self._add_session_to_active(session)
+        if session is not None:
+            if session._connection.ping():
+                self._give_back_idle(session, idle_time_start)
+                return True
+            self._remove_active_session(session)
+            session._connection.close()
+        return self.ping(address)
 
     def ping_sessions(self):
-        """ping all sessions in the pool"""
+        """ping all idle sessions in the pool in parallel, the dead ones are
+        replaced by new sessions
+        """
+        self._keep_alive(0)
+
+    def _keep_alive(self, idle_time):
+        """ping the idle sessions not used on graphd for idle_time in
+        parallel, out of the lock, and replace the dead ones. They are taken
+        from the idle list meanwhile, and put back in the order of the spaces
+        and with the idle time they had
+
+        :param idle_time: unit ms
+        :return: void
+        """
+        sessions = []
         with self._lock:
+            now = time.time()
             for session in self._idle_sessions:
-                session.execute(r'RETURN "SESSION PING"')
+                last_time = max(session._idle_time_start, session._keep_alive_time)
+                if (now - last_time) * 1000 >= idle_time:
+                    sessions.append((session, session._idle_time_start))
+            for session, _ in sessions:
+                self._idle_sessions.remove(session)
+                self._add_session_to_active(session)
+        if len(sessions) == 0:
+            return
 
-    def _get_idle_session(self):
-        """get a valid session from the pool idle list.
+        workers = min(self._configs.keep_alive_workers, len(sessions))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            alive = list(executor.map(self._keep_alive_session, sessions))
+        for session, idle_time_start in alive:
+            if session is None:
+                continue
+            with self._lock:
+                if self._waiters.hand_off(session):
+                    continue
+                self._active_sessions.discard(session)
+                self._idle_sessions.append(
+                    session, self._session_spaces.get(session), used=False
+                )
+                session._idle_time_start = idle_time_start
 
-        :return: Session
+    def _keep_alive_session(self, item):
+        """ping the session, a dead session is replaced by a new session in
+        its space
+
+        :param item: the session and the time it was added to the idle list
+        :return: the session or its replacement and the idle time start,
+            the session is None if the replacement failed
         """
+        session, idle_time_start = item
+        try:
+            resp = session.execute(r'RETURN "SESSION PING"')
+            if resp.error_code() not in [
+                ErrorCode.E_SESSION_INVALID,
+                ErrorCode.E_SESSION_TIMEOUT,
+            ]:
+                session._keep_alive_time = time.time()
+                return session, idle_time_start
+        except Exception as e:
+            logger.warning("Failed to ping the session: {}".format(e))
+        session._connection.close()
+
+        replacement = None
         with self._lock:
-            if len(self._idle_sessions) > 0:
-                return self._idle_sessions.pop(0)
-            elif len(self._active_sessions) < self._configs.max_size:
-                return self._new_session()
-            else:
-                raise NoValidSessionException(
-                    "The total number of sessions reaches the pool max size {}".format(
-                        self._configs.max_size
-                    )
+            space_name = self._session_spaces.get(session)
+        try:
+            if not self._close:
+                replacement = self._new_session(space_name)
+        except Exception as e:
+            logger.warning(
+                "The idle session is dead, removed from the pool, but failed to get a new session: {}".format(
+                    e
                 )
+            )
+        with self._lock:
+            closed = self._close
+            # the replacement takes the room of the dead session
+            if replacement is not None and not closed:
+                self._add_session_to_active(replacement)
+            self._remove_active_session(session)
+        if replacement is not None and closed:
+            conn = replacement._connection
+            replacement.release()
+            conn.close()
+            replacement = None
+        return replacement, time.time()
 
-    def _new_session(self):
-        """construct a new session with the username and password in the pool.
-            also, the session is bound to the space specified in the configs.
+    def load_balancer(self):
+        """get the load balancer, the sessions report their statements to it
+
+        :return: LoadBalancer
+        """
+        return self._load_balancer
+
+    def wait_stats(self):
+        """get the metrics of the callers waiting for a session: the number of
+        the callers waiting now, that waited, timed out and were rejected, the
+        total and max wait time in ms
+
+        :return: dict
+        """
+        with self._lock:
+            return self._waiters.stats()
 
+    def _get_idle_session(self, space_name=None):
+        """get a valid session from the pool idle list, and add it to the
+        active list, see _take_session. The caller switches the session to the
+        space if it is in another one, see _get_bound_session.
+        When the pool is full, it waits up to SessionPoolConfig.acquire_timeout
+        for a session given back, the waiters are served in FIFO order.
+
+        :param space_name: the space of the session, the space of the pool by default
         :return: Session
         """
-        self._pos = (self._pos + 1) % len(self._addresses)
-        next_addr_index = self._pos
+        if space_name is None:
+            space_name = self._space_name
+        waiter = None
+        while True:
+            with self._lock:
+                if waiter is not None and self._close:
+                    self._waiters.done(waiter)
+                    raise NoValidSessionException("The pool is closed")
+                session = self._take_session(space_name)
+                if session is not None or self._has_room():
+                    if waiter is not None:
+                        self._waiters.done(waiter)
+                    if session is not None:
+                        self._add_session_to_active(session)
+                        return session
+                    # the room is kept for the session created out of the lock
+                    self._creating += 1
+                    break
+                if self._configs.acquire_timeout <= 0:
+                    raise NoValidSessionException(
+                        "The total number of sessions reaches the pool max size {}".format(
+                            self._configs.max_size
+                        )
+                    )
+                if waiter is None:
+                    if 0 < self._configs.max_waiters <= len(self._waiters):
+                        self._waiters.rejections += 1
+                        raise NoValidSessionException(
+                            "Too many callers wait for a session, the max is {}".format(
+                                self._configs.max_waiters
+                            )
+                        )
+                    waiter = self._waiters.push()
+                else:
+                    # another caller took the room, wait again in the front
+                    self._waiters.push(waiter)
 
-        # try to connect with a valid service address, the worst case it to iterate all addresses
-        retries = len(self._addresses)
+            remaining = (
+                waiter.start_time + self._configs.acquire_timeout / 1000.0 - time.time()
+            )
+            signalled = remaining > 0 and waiter.wait(remaining)
+            with self._lock:
+                # a session handed off is in the active list already
+                session, waiter.item = waiter.item, None
+                if session is not None:
+                    self._waiters.done(waiter)
+                    return session
+                if not signalled:
+                    self._waiters.done(waiter, timed_out=True)
+                    raise NoValidSessionException(
+                        "Wait for a session timed out after {} ms".format(
+                            self._configs.acquire_timeout
+                        )
+                    )
+
+        return self._create_active_session(space_name)
+
+    def _take_session(self, space_name):
+        """take an idle session for the space with the lock held: a session
+        of the space, or one which may be in another space, or when the pool
+        is full, the oldest idle session of the least recently used space
+
+        :param space_name: the space of the session
+        :return: Session or None
+        """
+        session = self._pop_idle_session(space_name)
+        if session is None:
+            session = self._idle_sessions.pop(space=None)
+        if session is None and not self._has_room():
+            session = self._idle_sessions.pop()
+        return session
+
+    def _has_room(self):
+        """check whether a new session fits in the max size with the lock held
+
+        :return: True or False
+        """
+        total = len(self._active_sessions) + len(self._idle_sessions) + self._creating
+        return total < self._configs.max_size
+
+    def _create_active_session(self, space_name):
+        """create a session out of the lock in the room kept by
+        _get_idle_session, and add it to the active list
 
-        while retries > 0:
-            addr = self._addresses[next_addr_index]
+        :param space_name: the space of the session
+        :return: Session
+        """
+        try:
+            session = self._new_session(space_name)
+        except BaseException:
+            with self._lock:
+                self._creating -= 1
+                # the room is free for a waiter
+                self._waiters.wake()
+            raise
+        with self._lock:
+            self._creating -= 1
+            closed = self._close
+            if not closed:
+                self._add_session_to_active(session)
+        if closed:
+            conn = session._connection
+            session.release()
+            conn.close()
+            raise NoValidSessionException("The pool is closed")
+        return session
+
+    def _pop_idle_session(self, space_name):
+        """take an idle session of the space to the address the load balancer
+        selects
 
+        :param space_name: the space of the session
+        :return: Session or None
+        """
+        addresses = self._idle_sessions.addresses(space_name)
+        if len(addresses) > 1:
+            address = self._load_balancer.select(addresses)
+            return self._idle_sessions.pop(address, space_name)
+        return self._idle_sessions.pop(space=space_name)
+
+    def _new_session(self, space_name=None):
+        """construct a new session with the username and password in the pool.
+            also, the session is bound to the space specified in the configs.
+
+        :param space_name: the space of the session, the space of the pool by default
+        :return: Session
+        """
+        if space_name is None:
+            space_name = self._space_name
+        candidates = []
+        for addr in self._addresses:
             # if the address is bad, skip it
             if self._addresses_status[addr] == self.S_BAD:
                 logger.warning("The graph service {} is not available".format(addr))
-                retries = retries - 1
-                next_addr_index = (next_addr_index + 1) % len(self._addresses)
-                continue
+            else:
+                candidates.append(addr)
+        if not candidates:
+            raise RuntimeError(
+                "Failed to get a valid session, no graph service is available"
+            )
+        addr = self._load_balancer.select(candidates)
 
-            # connect to the valid service
-            connection = Connection()
+        # connect to the valid service
+        connection = Connection()
+        try:
+            if self._ssl_configs is None:
+                connection.open(
+                    addr[0],
+                    addr[1],
+                    self._configs.timeout,
+                    self._configs.use_http2,
+                    self._configs.http_headers,
+                    self._http2_channels,
+                    self._configs.compression,
+                    self._configs.compression_min_size,
+                    self._configs.protocol,
+                    self._configs.lazy_decode,
+                )
+            else:
+                connection.open_SSL(
+                    addr[0],
+                    addr[1],
+                    self._configs.timeout,
+                    self._ssl_configs,
+                    self._configs.use_http2,
+                    self._configs.http_headers,
+                    self._http2_channels,
+                    self._configs.compression,
+                    self._configs.compression_min_size,
+                    self._configs.protocol,
+                    self._configs.lazy_decode,
+                )
+            auth_result = connection.authenticate(self._username, self._password)
+            session = Session(connection, auth_result, self, False)
+
+            # switch to the space specified in the configs
             try:
-                if self._ssl_configs is None:
-                    connection.open(
-                        addr[0],
-                        addr[1],
-                        self._configs.timeout,
-                        self._configs.use_http2,
-                        self._configs.http_headers,
-                    )
-                else:
-                    connection.open_SSL(
-                        addr[0],
-                        addr[1],
-                        self._configs.timeout,
-                        self._ssl_configs,
-                        self._configs.use_http2,
-                        self._configs.http_headers,
-                    )
-                auth_result = connection.authenticate(self._username, self._password)
-                session = Session(connection, auth_result, self, False)
-
-                # switch to the space specified in the configs
-                try:
-                    resp = session.execute("USE {}".format(self._space_name))
-                except Exception:
-                    session.release()
-                    connection.close()
-                    raise RuntimeError(
-                        "Failed to get session, execute `use {}` failed.".format(
-                            self._space_name
-                        )
-                    )
-                if not resp.is_succeeded():
-                    session.release()
-                    connection.close()
-                    raise RuntimeError(
-                        "Failed to get session, cannot set the session space to {} error: {} {}".format(
-                            self._space_name, resp.error_code(), resp.error_msg()
-                        )
+                resp = session.execute("USE {}".format(space_name))
+            except Exception:
+                session.release()
+                connection.close()
+                raise RuntimeError(
+                    "Failed to get session, execute `use {}` failed.".format(space_name)
+                )
+            if not resp.is_succeeded():
+                session.release()
+                connection.close()
+                raise RuntimeError(
+                    "Failed to get session, cannot set the session space to {} error: {} {}".format(
+                        space_name, resp.error_code(), resp.error_msg()
                     )
-                return session
-            except AuthFailedException as e:
-                # if auth failed because of credentials, close the pool
-                if e.message.find("Invalid password") or e.message.find(
-                    "User not exist"
-                ):
-                    logger.error(
-                        "Authentication failed, because of bad credentials, close the pool {}".format(
-                            e
-                        )
+                )
+            with self._lock:
+                self._session_spaces[session] = space_name
+            return session
+        except AuthFailedException as e:
+            # if auth failed because of credentials, close the pool
+            if e.message.find("Invalid password") or e.message.find("User not exist"):
+                logger.error(
+                    "Authentication failed, because of bad credentials, close the pool {}".format(
+                        e
                     )
-                    self.close()
-                else:
-                    connection.close()
-                raise e
-            except Exception:
+                )
+                self.close()
+            else:
                 connection.close()
-                raise
+            raise e
+        except Exception:
+            connection.close()
+            raise
 
-        raise RuntimeError(
-            "Failed to get a valid session, no graph service is available"
-        )
+    def _get_bound_session(self, space_name=None):
+        """get a session as _get_idle_session, a session in another space is
+        switched to the space first, or dropped for another one if it fails
+
+        :param space_name: the space of the session, the space of the pool by default
+        :return: Session
+        """
+        if space_name is None:
+            space_name = self._space_name
+        while True:
+            session = self._get_idle_session(space_name)
+            with self._lock:
+                if self._session_spaces.get(session) == space_name:
+                    return session
+            if self._set_space(session, space_name):
+                return session
+
+    def _recycle_session(self, session, space_name=None):
+        """drop the invalid or timed out session, and get a session to the
+        idle list in its place
+
+        :param session: the session to drop
+        :param space_name: the space of the session
+        :return: void
+        """
+        self._remove_active_session(session)
+        session._connection.close()
+        try:
+            self._return_session(self._get_idle_session(space_name))
+        except Exception as e:
+            logger.warning(
+                "Session invalid or timeout, removed from the pool, but failed to get a new session: {}".format(
+                    e
+                )
+            )
+            return
+        logger.warning("Session invalid or timeout, session has been recycled")
 
-    def _return_session(self, session):
+    def _return_session(self, session, unbound=False):
         """return the session to the pool idle list when query finished.
 
         :param session: the session to return
+        :param unbound: the session may be in another space than the pool's
         :return: void
         """
         with self._lock:
-            self._active_sessions.remove(session)
-            self._idle_sessions.append(session)
-            session.idle_time_start = time.time()
+            if unbound:
+                self._session_spaces[session] = None
+            if self._waiters.hand_off(session):
+                return
+            self._active_sessions.discard(session)
+            self._idle_sessions.append(session, self._session_spaces.get(session))
+            session._idle_time_start = time.time()
+
+    def _give_back_idle(self, session, idle_time_start):
+        """give back a session taken out of the idle list and not used, to a
+        waiter or to the oldest end of the idle list, its idle time is kept
+
+        :param session: the session
+        :param idle_time_start: the time it was added to the idle list
+        :return: void
+        """
+        with self._lock:
+            if self._waiters.hand_off(session):
+                return
+            self._active_sessions.discard(session)
+            self._idle_sessions.appendleft(session, self._session_spaces.get(session))
+            session._idle_time_start = idle_time_start
 
     def _add_session_to_idle(self, session):
         """add the session to the pool idle list
@@ -493,59 +910,81 @@ class SessionPool(BaseExecutor, object):
         :return: void
         """
         with self._lock:
-            self._idle_sessions.append(session)
-            session.idle_time_start = time.time()
+            if self._waiters.hand_off(session):
+                self._add_session_to_active(session)
+                return
+            self._idle_sessions.append(session, self._session_spaces.get(session))
+            session._idle_time_start = time.time()
+
+    def _remove_active_session(self, session):
+        """remove the session from the pool active list, its room is free
+
+        :param session: the session to remove
+        :return: void
+        """
+        with self._lock:
+            self._active_sessions.discard(session)
+            self._session_spaces.pop(session, None)
+            self._waiters.wake()
 
     def _add_session_to_active(self, session):
-        """add the session to the pool active list
+        """add the session to the pool active list, called with the lock held
 
         :param session: the session to add
         :return: void
         """
-        with self._lock:
-            self._active_sessions.append(session)
-            # reset the idle time start
-            session.idle_time_start = 0
+        self._active_sessions.add(session)
+        # reset the idle time start
+        session._idle_time_start = 0
 
-    def _set_space_to_default(self, session):
-        """set the space to the default space in the pool
+    def _set_space(self, session, space_name):
+        """switch the session to the space
 
         :param session: the session to set
-        :return: void
+        :param space_name: the space name
+        :return: False if the session has been dropped
         """
         try:
-            resp = session.execute("USE {}".format(self._space_name))
+            resp = session.execute("USE {}".format(space_name))
             if not resp.is_succeeded():
                 raise RuntimeError(
-                    "Failed to set the session space to {}".format(self._space_name)
+                    "Failed to set the session space to {}".format(space_name)
                 )
+            with self._lock:
+                self._session_spaces[session] = space_name
+            return True
         except Exception:
             logger.warning(
                 "Failed to set the session space to {}, the current session has been dropped".format(
-                    self._space_name
+                    space_name
                 )
             )
             session._connection.close()
-            with self._lock:
-                self._active_sessions.remove(session)
+            self._remove_active_session(session)
+            return False
 
     def _remove_idle_unusable_session(self):
         if self._configs.idle_time == 0:
             return
+        expired = []
         with self._lock:
             total_sessions = len(self._idle_sessions) + len(self._active_sessions)
-            if total_sessions <= self._configs.min_size:
-                return
+            now = time.time()
             for session in self._idle_sessions:
-                # calc session idle time
-                idle_time = time.time() - session._idle_time_start
-
-                # release idle session and remove from the pool
+                if total_sessions - len(expired) <= self._configs.min_size:
+                    break
+                # calc session idle time, unit ms
+                idle_time = (now - session._idle_time_start) * 1000
                 if idle_time > self._configs.idle_time:
-                    conn = session._connection
-                    session.release()
-                    conn.close()
                     self._idle_sessions.remove(session)
+                    self._session_spaces.pop(session, None)
+                    expired.append(session)
+
+        # release idle session out of the lock
+        for session in expired:
+            conn = session._connection
+            session.release()
+            conn.close()
 
     def _period_detect(self):
         """periodically detect the services status and remove the sessions from the idle list if they expire"""
@@ -554,7 +993,20 @@ class SessionPool(BaseExecutor, object):
         self.update_servers_status()
         self._remove_idle_unusable_session()
         timer = Timer(self._configs.interval_check, self._period_detect)
-        timer.setDaemon(True)
+        timer.daemon = True
+        timer.start()
+
+    def _period_keep_alive(self):
+        """periodically ping the idle sessions, see SessionPoolConfig.keep_alive_interval"""
+        if self._close or self._configs.keep_alive_interval <= 0:
+            return
+        # a session not used for half of the interval is pinged, and checked
+        # again after the other half at the latest
+        self._keep_alive(self._configs.keep_alive_interval / 2)
+        timer = Timer(
+            self._configs.keep_alive_interval / 2000.0, self._period_keep_alive
+        )
+        timer.daemon = True
         timer.start()
 
     def _check_configs(self):
@@ -571,6 +1023,12 @@ class SessionPool(BaseExecutor, object):
             raise RuntimeError("The idle_time must be greater or equal to 0")
         if self._configs.timeout < 0:
             raise RuntimeError("The timeout must be greater or equal to 0")
+        if self._configs.keep_alive_interval < 0:
+            raise RuntimeError("The keep_alive_interval must be greater or equal to 0")
+        if self._configs.keep_alive_workers <= 0:
+            raise RuntimeError("The keep_alive_workers must be greater than 0")
+        if self._configs.create_workers <= 0:
+            raise RuntimeError("The create_workers must be greater than 0")
 
         if self._space_name == "":
             raise RuntimeError("The space_name must be set")
@@ -0,0 +1,158 @@
+# --coding:utf-8--
+#
+# Copyright (c) 2026 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License.
+
+
+import asyncio
+import time
+
+from collections import deque
+from threading import Event
+
+
+class Waiter(object):
+    def __init__(self):
+        self._event = Event()
+        # what was handed to the waiter, None when it is woken up to retry
+        self.item = None
+        self.start_time = time.time()
+
+    def wait(self, timeout):
+        """wait for a hand off or a wake up
+
+        :param timeout: the time to wait, unit second
+        :return: True if signalled, False if timed out
+        """
+        return self._event.wait(timeout)
+
+    def signal(self, item=None):
+        self.item = item
+        self._event.set()
+
+
+class AsyncWaiter(object):
+    """The Waiter of a task of asyncio"""
+
+    def __init__(self):
+        self._event = asyncio.Event()
+        # what was handed to the waiter, None when it is woken up to retry
+        self.item = None
+        self.start_time = time.time()
+
+    async def wait(self, timeout):
+        """wait for a hand off or a wake up
+
+        :param timeout: the time to wait, unit second
+        :return: True if signalled, False if timed out
+        """
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    def signal(self, item=None):
+        self.item = item
+        self._event.set()
+
+
+class WaitQueue(object):
+    """The callers waiting for a connection or session of a full pool.
+    They are signalled in FIFO order, what a pool gives back is handed to the
+    first waiter directly, so a new caller can not take it over.
+    All the methods are called with the lock of the pool held.
+    """
+
+    waiter_class = Waiter
+
+    def __init__(self):
+        self._waiters = deque()
+        # the metrics, the times are in ms
+        self.waits = 0
+        self.timeouts = 0
+        self.rejections = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    def __len__(self):
+        return len(self._waiters)
+
+    def push(self, waiter=None):
+        """add a new waiter to the end, or put a waiter woken up to retry back
+        to the front
+
+        :param waiter: the waiter to put back
+        :return: Waiter
+        """
+        if waiter is None:
+            waiter = self.waiter_class()
+            self._waiters.append(waiter)
+            self.waits += 1
+        else:
+            waiter._event.clear()
+            self._waiters.appendleft(waiter)
+        return waiter
+
+    def hand_off(self, item):
+        """hand the item to the first waiter
+
+        :param item: the connection or session
+        :return: True if a waiter took it
+        """
+        if not self._waiters:
+            return False
+        self._waiters.popleft().signal(item)
+        return True
+
+    def wake(self, all=False):
+        """wake up the first waiter, or all of them, to retry
+
+        :param all: wake up all the waiters
+        :return: void
+        """
+        while self._waiters:
+            self._waiters.popleft().signal()
+            if not all:
+                return
+
+    def done(self, waiter, timed_out=False):
+        """record the wait time of the waiter, remove it if it timed out
+
+        :param waiter: the Waiter
+        :param timed_out: the waiter is not signalled
+        :return: void
+        """
+        if timed_out:
+            self.timeouts += 1
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+            elif waiter._event.is_set():
+                # woken up just as it timed out, pass the wake up on
+                self.wake()
+        cost = (time.time() - waiter.start_time) * 1000
+        self.wait_time_total += cost
+        self.wait_time_max = max(self.wait_time_max, cost)
+
+    def stats(self):
+        """get the metrics
+
+        :return: dict
+        """
+        return {
+            'waiting': len(self._waiters),
+            'waits': self.waits,
+            'timeouts': self.timeouts,
+            'rejections': self.rejections,
+            'wait_time_total': self.wait_time_total,
+            'wait_time_max': self.wait_time_max,
+        }
+
+
+class AsyncWaitQueue(WaitQueue):
+    """The tasks of asyncio waiting for a connection or session of a full
+    pool, the methods are called in the event loop
+    """
+
+    waiter_class = AsyncWaiter
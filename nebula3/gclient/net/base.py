@@ -1,6 +1,9 @@
 import datetime
+import json
+import re
 from abc import abstractmethod
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterable, List, Optional, Tuple, Union
 from nebula3.data.ResultSet import ResultSet
 from nebula3.common.ttypes import ErrorCode, Value, NList, Date, Time, DateTime
 
@@ -55,6 +58,74 @@ class BaseExecutor:
 
         return result
 
+    def execute_many(
+        self,
+        stmts_or_params: Iterable[Union[str, Tuple[str, Optional[Dict[str, Any]]]]],
+        concurrency: int = 8,
+    ) -> List[Union[ResultSet, Exception]]:
+        """Execute a list of statements concurrently, a statement may come with its parameters in Python type as in execute_py.
+        A failed statement does not stop the others, its error is reported in its place of the results.
+
+        :param stmts_or_params: the statements, or the (statement, parameters)
+        :param concurrency: the max number of the statements executed at the same time
+        :return: the results in the order of the statements, a ResultSet, or the exception of a statement that failed,
+        ExecuteError if graphd reports the error
+        """
+        requests = list(stmts_or_params)
+
+        def execute(request):
+            try:
+                stmt, params, byte_params = _build_request(request)
+                result = self.execute_parameter(stmt, byte_params)
+                return _result_or_error(result, stmt, params)
+            except Exception as e:
+                return e
+
+        if concurrency <= 1 or len(requests) <= 1:
+            return [execute(request) for request in requests]
+        with ThreadPoolExecutor(
+            max_workers=min(concurrency, len(requests))
+        ) as executor:
+            return list(executor.map(execute, requests))
+
+
+def _build_request(request) -> tuple:
+    """get the statement, the parameters and the parameters in thrift type of a request of execute_many"""
+    if isinstance(request, str):
+        return request, None, None
+    stmt, params = request
+    if params is None:
+        return stmt, None, None
+    return stmt, params, _build_byte_param(params)
+
+
+def _result_or_error(result: ResultSet, stmt: str, params: Any):
+    if not result.is_succeeded():
+        return ExecuteError(stmt, params, result.error_code(), result.error_msg())
+    return result
+
+
+# the statements which may change the space of the session, false positives
+# only cost a USE statement
+_SWITCH_SPACE = re.compile(r'\bUSE\b\s*[`\w]|\bDROP\s+SPACE\b', re.IGNORECASE)
+# E_SESSION_INVALID or E_SESSION_TIMEOUT in a JSON response
+_JSON_SESSION_ERROR = re.compile(rb'"code"\s*:\s*-100[23]\b')
+
+
+def _may_switch_space(stmt: str) -> bool:
+    """whether the statement may leave its session in another space"""
+    return _SWITCH_SPACE.search(stmt) is not None
+
+
+def _json_session_error(resp: bytes) -> bool:
+    """whether the JSON response is E_SESSION_INVALID or E_SESSION_TIMEOUT,
+    it is parsed only when the bytes may carry one of the codes
+    """
+    if _JSON_SESSION_ERROR.search(resp) is None:
+        return False
+    code = json.loads(resp).get("errors", [{}])[0].get("code")
+    return code in [ErrorCode.E_SESSION_INVALID, ErrorCode.E_SESSION_TIMEOUT]
+
 
 def _build_byte_param(params: dict) -> dict:
     byte_params = {}
@@ -28,16 +28,23 @@ from nebula3.meta.ttypes import (
 )
 from nebula3.meta import ttypes, MetaService
 
-from nebula3.fbthrift.transport import TSocket, TTransport
-from nebula3.fbthrift.protocol import TBinaryProtocol
+from nebula3.fbthrift.transport import TSocket, TTransport, THeaderTransport
+from nebula3.fbthrift.protocol import TBinaryProtocol, THeaderProtocol
 from nebula3.logger import logger
 
 
 class MetaClient(object):
-    def __init__(self, addresses, timeout):
+    def __init__(self, addresses, timeout, protocol=None):
+        """
+        :param addresses: the metad addresses
+        :param timeout: the timeout for connect and execute, unit ms
+        :param protocol: 'binary' or 'compact', the thrift protocol over the
+        header transport, None means binary without the header transport
+        """
         if len(addresses) == 0:
             raise RuntimeError('Input empty addresses')
         self._timeout = timeout
+        self._protocol = protocol
         self._connection = None
         self._retry_count = 3
         self._addresses = addresses
@@ -60,7 +67,12 @@ class MetaClient(object):
             if self._timeout > 0:
                 s.setTimeout(self._timeout)
             transport = TTransport.TBufferedTransport(s)
-            protocol = TBinaryProtocol.TBinaryProtocol(transport)
+            if self._protocol is None:
+                protocol = TBinaryProtocol.TBinaryProtocol(transport)
+            else:
+                transport = THeaderTransport.THeaderTransport(transport)
+                transport.set_protocol(self._protocol)
+                protocol = THeaderProtocol.THeaderProtocol(transport)
             transport.open()
             self._connection = MetaService.Client(protocol)
         except Exception:
@@ -267,7 +279,14 @@ class MetaCache(object):
                 self.parts_alloc,
             )
 
-    def __init__(self, meta_addrs, timeout=2000, load_period=10, decode_type='utf-8'):
+    def __init__(
+        self,
+        meta_addrs,
+        timeout=2000,
+        load_period=10,
+        decode_type='utf-8',
+        protocol=None,
+    ):
         self._decode_type = decode_type
         self._load_period = load_period
         self._lock = RLock()
@@ -276,7 +295,7 @@ class MetaCache(object):
         self._storage_addrs = []
         self._storage_leader = {}
         self._close = False
-        self._meta_client = MetaClient(meta_addrs, timeout)
+        self._meta_client = MetaClient(meta_addrs, timeout, protocol)
         self._meta_client.open()
 
         # load meta data
@@ -11,11 +11,14 @@ The client to scan vertex and edge from storage,
 the return data is from thr graph database
 """
 
+import asyncio
+import copy
 import sys
 import concurrent.futures
 
-from nebula3.sclient.ScanResult import ScanResult
-from nebula3.sclient.net import GraphStorageConnection
+from nebula3.common.ttypes import ErrorCode
+from nebula3.sclient.ScanResult import ScanResult, VertexResult, EdgeResult
+from nebula3.sclient.net import AsyncGraphStorageConnection, GraphStorageConnection
 from nebula3.storage.ttypes import (
     ScanCursor,
     ScanEdgeRequest,
@@ -39,10 +42,32 @@ class GraphStorageClient(object):
     user = ""
     passwd = ""
 
-    def __init__(self, meta_cache, storage_addrs=None, time_out=60000):
+    def __init__(
+        self,
+        meta_cache,
+        storage_addrs=None,
+        time_out=60000,
+        compression=None,
+        compression_min_size=0,
+        protocol=None,
+    ):
+        """
+        :param meta_cache: the MetaCache to find the storaged addresses and leaders
+        :param storage_addrs: the storaged addresses, default from meta_cache
+        :param time_out: the timeout for connect and scan, unit ms
+        :param compression: 'zlib', 'snappy' or 'zstd' to compress the scan
+        requests and responses, None means no compression
+        :param compression_min_size: the requests smaller than it in bytes are
+        sent uncompressed, and so are their responses
+        :param protocol: 'binary' or 'compact', the thrift protocol of the scan
+        requests and responses, None means compact
+        """
         self._meta_cache = meta_cache
         self._storage_addrs = storage_addrs
         self._time_out = time_out
+        self._compression = compression
+        self._compression_min_size = compression_min_size
+        self._protocol = protocol
         self._connections = []
         self._create_connection()
 
@@ -86,7 +111,14 @@ class GraphStorageClient(object):
             raise RuntimeError('Get storage address from meta cache is empty')
         try:
             for addr in self._storage_addrs:
-                conn = GraphStorageConnection(addr, self._time_out, self._meta_cache)
+                conn = GraphStorageConnection(
+                    addr,
+                    self._time_out,
+                    self._meta_cache,
+                    self._compression,
+                    self._compression_min_size,
+                    self._protocol,
+                )
                 conn.open()
                 self._connections.append(conn)
         except Exception as e:
@@ -257,6 +289,87 @@ class GraphStorageClient(object):
                     batch = scan_result.next()
                     yield part, batch
 
+    async def ascan_vertex(
+        self,
+        space_name,
+        tag_name,
+        prop_names=[],
+        start_time=DEFAULT_START_TIME,
+        end_time=DEFAULT_END_TIME,
+        where=None,
+        only_latest_version=False,
+        enable_read_from_follower=True,
+        partial_success=False,
+        batch_size=1000,
+        parts_per_storage=2,
+        max_pending_batches=8,
+    ):
+        """scan vertex in asyncio, the partitions are scanned at the same time
+        and every page is yielded as soon as it arrives:
+
+            async for part, batch in client.ascan_vertex('nba', 'player'):
+                ...
+
+        A consumer leaving the loop early must aclose() the generator, or the
+        scans stay blocked on the pages nobody consumes until the generator is
+        garbage collected:
+
+            scanning = client.ascan_vertex('nba', 'player')
+            try:
+                async for part, batch in scanning:
+                    break
+            finally:
+                await scanning.aclose()
+
+        A storaged has at most parts_per_storage partitions in flight, and at
+        most max_pending_batches pages wait for the consumer, the scan stops
+        requesting pages while the consumer is behind. So the memory is bounded
+        whatever the size of the space.
+
+        :param space_name: the space name
+        :param tag_name: the tag name
+        :param prop_names: if given empty, return all property
+        :param start_time: the min version of vertex
+        :param end_time: the max version of vertex
+        :param where: now is unsupported
+        :param only_latest_version: when storage enable multi versions and only_latest_version is true,
+        only return latest version.
+        when storage disable multi versions, just use the default value.
+        :param enable_read_from_follower: if set to false, forbid follower read
+        :param partial_success: if set true, the failed partitions are skipped
+        :param batch_size: the max number of vertexes of a page
+        :param parts_per_storage: the partitions in flight per storaged
+        :param max_pending_batches: the pages received and not consumed yet
+        :yield: part_id, VertexResult
+        """
+        part_leaders = self._meta_cache.get_part_leaders(space_name)
+        req = self._scan_vertex_request(
+            space_name,
+            part_leaders,
+            tag_name,
+            prop_names,
+            batch_size,
+            start_time,
+            end_time,
+            where,
+            only_latest_version,
+            enable_read_from_follower,
+        )
+        scanning = self._ascan(
+            req,
+            part_leaders,
+            True,
+            partial_success,
+            parts_per_storage,
+            max_pending_batches,
+        )
+        try:
+            async for part, batch in scanning:
+                yield part, batch
+        finally:
+            # closing this generator does not close the one it iterates
+            await scanning.aclose()
+
     def _scan_vertex(
         self,
         space_name,
@@ -270,6 +383,39 @@ class GraphStorageClient(object):
         only_latest_version,
         enable_read_from_follower,
         partial_success=False,
+    ):
+        req = self._scan_vertex_request(
+            space_name,
+            part_leaders,
+            tag_name,
+            prop_names,
+            limit,
+            start_time,
+            end_time,
+            where,
+            only_latest_version,
+            enable_read_from_follower,
+        )
+        return ScanResult(
+            self,
+            req=req,
+            part_addrs=part_leaders,
+            is_vertex=True,
+            partial_success=partial_success,
+        )
+
+    def _scan_vertex_request(
+        self,
+        space_name,
+        part_leaders,
+        tag_name,
+        prop_names,
+        limit,
+        start_time,
+        end_time,
+        where,
+        only_latest_version,
+        enable_read_from_follower,
     ):
         space_id = self._meta_cache.get_space_id(space_name)
         tag_id = self._meta_cache.get_tag_id(space_name, tag_name)
@@ -302,13 +448,7 @@ class GraphStorageClient(object):
         req.username = self.user.encode('utf-8')
         req.password = self.passwd.encode('utf-8')
         req.need_authenticate = True
-        return ScanResult(
-            self,
-            req=req,
-            part_addrs=part_leaders,
-            is_vertex=True,
-            partial_success=partial_success,
-        )
+        return req
 
     def scan_edge(
         self,
@@ -461,6 +601,87 @@ class GraphStorageClient(object):
                     batch = scan_result.next()
                     yield part, batch
 
+    async def ascan_edge(
+        self,
+        space_name,
+        edge_name,
+        prop_names=[],
+        start_time=DEFAULT_START_TIME,
+        end_time=DEFAULT_END_TIME,
+        where=None,
+        only_latest_version=False,
+        enable_read_from_follower=True,
+        partial_success=False,
+        batch_size=1000,
+        parts_per_storage=2,
+        max_pending_batches=8,
+    ):
+        """scan edge in asyncio, the partitions are scanned at the same time
+        and every page is yielded as soon as it arrives:
+
+            async for part, batch in client.ascan_edge('nba', 'follow'):
+                ...
+
+        A consumer leaving the loop early must aclose() the generator, or the
+        scans stay blocked on the pages nobody consumes until the generator is
+        garbage collected:
+
+            scanning = client.ascan_edge('nba', 'follow')
+            try:
+                async for part, batch in scanning:
+                    break
+            finally:
+                await scanning.aclose()
+
+        A storaged has at most parts_per_storage partitions in flight, and at
+        most max_pending_batches pages wait for the consumer, the scan stops
+        requesting pages while the consumer is behind. So the memory is bounded
+        whatever the size of the space.
+
+        :param space_name: the space name
+        :param edge_name: the edge name
+        :param prop_names: if given empty, return all property
+        :param start_time: the min version of edge
+        :param end_time: the max version of edge
+        :param where: now is unsupported
+        :param only_latest_version: when storage enable multi versions and only_latest_version is true,
+        only return latest version.
+        when storage disable multi versions, just use the default value.
+        :param enable_read_from_follower: if set to false, forbid follower read
+        :param partial_success: if set true, the failed partitions are skipped
+        :param batch_size: the max number of edges of a page
+        :param parts_per_storage: the partitions in flight per storaged
+        :param max_pending_batches: the pages received and not consumed yet
+        :yield: part_id, EdgeResult
+        """
+        part_leaders = self._meta_cache.get_part_leaders(space_name)
+        req = self._scan_edge_request(
+            space_name,
+            part_leaders,
+            edge_name,
+            prop_names,
+            batch_size,
+            start_time,
+            end_time,
+            where,
+            only_latest_version,
+            enable_read_from_follower,
+        )
+        scanning = self._ascan(
+            req,
+            part_leaders,
+            False,
+            partial_success,
+            parts_per_storage,
+            max_pending_batches,
+        )
+        try:
+            async for part, batch in scanning:
+                yield part, batch
+        finally:
+            # closing this generator does not close the one it iterates
+            await scanning.aclose()
+
     def _scan_edge(
         self,
         space_name,
@@ -474,6 +695,39 @@ class GraphStorageClient(object):
         only_latest_version,
         enable_read_from_follower,
         partial_success,
+    ):
+        req = self._scan_edge_request(
+            space_name,
+            part_leaders,
+            edge_name,
+            prop_names,
+            limit,
+            start_time,
+            end_time,
+            where,
+            only_latest_version,
+            enable_read_from_follower,
+        )
+        return ScanResult(
+            self,
+            req=req,
+            part_addrs=part_leaders,
+            is_vertex=False,
+            partial_success=partial_success,
+        )
+
+    def _scan_edge_request(
+        self,
+        space_name,
+        part_leaders,
+        edge_name,
+        prop_names,
+        limit,
+        start_time,
+        end_time,
+        where,
+        only_latest_version,
+        enable_read_from_follower,
     ):
         space_id = self._meta_cache.get_space_id(space_name)
         edge_type = self._meta_cache.get_edge_type(space_name, edge_name)
@@ -507,10 +761,123 @@ class GraphStorageClient(object):
         req.username = self.user.encode('utf-8')
         req.password = self.passwd.encode('utf-8')
         req.need_authenticate = True
-        return ScanResult(
-            self,
-            req=req,
-            part_addrs=part_leaders,
-            is_vertex=False,
-            partial_success=partial_success,
-        )
+        return req
+
+    async def _ascan(
+        self,
+        req,
+        part_leaders,
+        is_vertex,
+        partial_success,
+        parts_per_storage,
+        max_pending_batches,
+    ):
+        """scan the partitions of req with the tasks of every storaged, they
+        take the partitions of their storaged from a queue, scan them page by
+        page, and put the pages into a bounded queue the caller consumes
+        """
+        batches = asyncio.Queue(max(1, max_pending_batches))
+        # the queue of (part_id, cursor) of every storaged
+        part_queues = {}
+        tasks = []
+        connections = []
+        remaining = [len(part_leaders)]
+        done = object()
+
+        def dispatch(part_id, cursor, leader):
+            key = (leader.host, leader.port)
+            if key not in part_queues:
+                part_queues[key] = asyncio.Queue()
+                for _ in range(max(1, parts_per_storage)):
+                    tasks.append(
+                        asyncio.ensure_future(scan_parts(leader, part_queues[key]))
+                    )
+            part_queues[key].put_nowait((part_id, cursor))
+
+        async def scan_part(conn, part_id, cursor):
+            part_req = copy.copy(req)
+            while True:
+                part_req.parts = {part_id: cursor}
+                if is_vertex:
+                    resp = await conn.scan_vertex(part_req)
+                else:
+                    resp = await conn.scan_edge(part_req)
+                if len(resp.result.failed_parts) != 0:
+                    failed = resp.result.failed_parts[0]
+                    if failed.code == ErrorCode.E_LEADER_CHANGED:
+                        if failed.leader is None:
+                            raise RuntimeError(
+                                'Happen leader change, but the leader is None'
+                            )
+                        logger.warning(
+                            'part_id {} has leader change, '
+                            'old leader is {}, new leader is {}'.format(
+                                part_id, conn.storage_addr(), failed.leader
+                            )
+                        )
+                        conn.update_leader_info(req.space_id, part_id, failed.leader)
+                        dispatch(part_id, cursor, failed.leader)
+                        return False
+                    error = 'Query storage: {}, part id: {} failed: {}'.format(
+                        conn.storage_addr(), part_id, failed.code
+                    )
+                    logger.error(error)
+                    if not partial_success:
+                        raise RuntimeError('Scan failed: {}'.format(error))
+                    return True
+                if len(resp.props.column_names) == 0:
+                    raise RuntimeError(
+                        'Part id: {} return empty column names'.format(part_id)
+                    )
+                if len(resp.props.rows) != 0:
+                    if is_vertex:
+                        batch = VertexResult([resp.props])
+                    else:
+                        batch = EdgeResult([resp.props])
+                    # wait here while the consumer is behind
+                    await batches.put((part_id, batch))
+                next_cursor = resp.cursors[part_id].next_cursor
+                if not next_cursor:
+                    return True
+                cursor = ScanCursor(next_cursor=next_cursor)
+
+        async def scan_parts(leader, parts):
+            try:
+                conn = AsyncGraphStorageConnection(
+                    leader,
+                    self._time_out,
+                    self._meta_cache,
+                    self._compression,
+                    self._compression_min_size,
+                    self._protocol,
+                )
+                connections.append(conn)
+                await conn.open()
+                while True:
+                    part_id, cursor = await parts.get()
+                    if await scan_part(conn, part_id, cursor):
+                        remaining[0] -= 1
+                        if remaining[0] == 0:
+                            await batches.put(done)
+            except Exception as e:
+                logger.error('Scan failed: {}'.format(e))
+                await batches.put(e)
+
+        if len(part_leaders) == 0:
+            return
+        for part_id, leader in part_leaders.items():
+            dispatch(part_id, ScanCursor(), leader)
+        try:
+            while True:
+                item = await batches.get()
+                if item is done:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            for conn in connections:
+                conn.close()
@@ -12,13 +12,25 @@ from nebula3.Exception import InValidHostname
 from nebula3.storage import GraphStorageService
 from nebula3.fbthrift.transport import TSocket, THeaderTransport, TTransport
 from nebula3.fbthrift.protocol import THeaderProtocol
+from nebula3.gclient.net.AsyncConnection import AsyncHeaderConnection
 
 
 class GraphStorageConnection(object):
-    def __init__(self, address, timeout, meta_cache):
+    def __init__(
+        self,
+        address,
+        timeout,
+        meta_cache,
+        compression=None,
+        compression_min_size=0,
+        protocol=None,
+    ):
         self._address = address
         self._timeout = timeout
         self._meta_cache = meta_cache
+        self._compression = compression
+        self._compression_min_size = compression_min_size
+        self._protocol = protocol
         self._connection = None
         self._ip = ''
         try:
@@ -37,6 +49,12 @@ class GraphStorageConnection(object):
 
             buffered_transport = TTransport.TBufferedTransport(s)
             header_transport = THeaderTransport.THeaderTransport(buffered_transport)
+            if self._protocol is not None:
+                header_transport.set_protocol(self._protocol)
+            if self._compression is not None:
+                header_transport.set_compression(
+                    self._compression, self._compression_min_size
+                )
             protocol = THeaderProtocol.THeaderProtocol(header_transport)
             header_transport.open()
 
@@ -65,3 +83,56 @@ class GraphStorageConnection(object):
 
     def __del__(self):
         self.close()
+
+
+class AsyncGraphStorageConnection(AsyncHeaderConnection):
+    """The connection to a storaged for asyncio, it speaks the header
+    transport with GraphStorageService.Client, see AsyncHeaderConnection.
+    One request is on the connection at a time.
+    """
+
+    def __init__(
+        self,
+        address,
+        timeout,
+        meta_cache,
+        compression=None,
+        compression_min_size=0,
+        protocol=None,
+    ):
+        super().__init__()
+        self._address = address
+        self._timeout = timeout
+        self._meta_cache = meta_cache
+        self._compression = compression
+        self._compression_min_size = compression_min_size
+        self._protocol = protocol
+
+    def _peer(self):
+        return '{}:{}'.format(self._address.host, self._address.port)
+
+    async def open(self):
+        self.close()
+        await self._connect(self._address.host, self._address.port)
+        self._header_client(
+            GraphStorageService.Client,
+            self._protocol,
+            self._compression,
+            self._compression_min_size,
+        )
+
+    async def _call(self, name, req):
+        frame = await self._exchange(name, req)
+        return getattr(self._reader_client(frame), 'recv_' + name)()
+
+    async def scan_vertex(self, req):
+        return await self._call('scanVertex', req)
+
+    async def scan_edge(self, req):
+        return await self._call('scanEdge', req)
+
+    def storage_addr(self):
+        return self._address
+
+    def update_leader_info(self, space_id, part_id, address):
+        self._meta_cache.update_storage_leader(space_id, part_id, address)
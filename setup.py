@@ -5,7 +5,7 @@
 # This source code is licensed under Apache 2.0 License.
 
 import sys
-from setuptools import setup, find_packages
+from setuptools import setup, find_packages, Extension
 from pathlib import Path
 
 base_dir = Path(__file__).parent
@@ -38,4 +38,13 @@ setup(
     packages=find_packages(),
     platforms=["3.6, 3.7, 3.8, 3.9, 3.10, 3.11, 3.12"],
     package_dir={"nebula3": "nebula3"},
+    # Optional native codec for thrift structs, the pure Python protocols
+    # are used when it cannot be built.
+    ext_modules=[
+        Extension(
+            "nebula3.fbthrift.protocol.fastproto",
+            ["nebula3/fbthrift/protocol/fastproto.c"],
+            optional=True,
+        )
+    ],
 )
@@ -1,8 +1,53 @@
 import logging
 
+import pytest
+
+from graphd_stand_in import AsyncGraphdStandIn, GraphdStandIn, StoragedHandler
+from nebula3.storage import GraphStorageService
+
 logging.basicConfig(
     level=logging.INFO,
     format='[%(asctime)s] %(levelname)-8s [%(filename)s:%(lineno)d]:%(message)s',
 )
 
 logging.getLogger('nebula3').setLevel(logging.DEBUG)
+
+
+@pytest.fixture
+def graphd():
+    """a local graphd stand-in, for the tests without the nebula services"""
+    server = GraphdStandIn()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def graphd2():
+    """another graphd stand-in"""
+    server = GraphdStandIn()
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def storaged():
+    """a local storaged stand-in, it only scans vertexes"""
+    server = GraphdStandIn(StoragedHandler(), GraphStorageService)
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def storaged2():
+    """another storaged stand-in"""
+    server = GraphdStandIn(StoragedHandler(), GraphStorageService)
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def async_graphd():
+    """a local graphd stand-in served by asyncio"""
+    server = AsyncGraphdStandIn()
+    yield server
+    server.close()
@@ -0,0 +1,288 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2026 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License.
+
+"""
+Local stand-ins of graphd and storaged, for the tests and the benchmarks
+without the nebula services. They serve the services over the header
+transport, one thread per connection.
+"""
+
+import asyncio
+import json
+import socket
+import struct
+import threading
+import time
+
+from nebula3.common.ttypes import DataSet, ErrorCode, HostAddr, Row, Value
+from nebula3.fbthrift.protocol import THeaderProtocol
+from nebula3.fbthrift.server.TServer import TServer
+from nebula3.fbthrift.transport import TSocket, TTransport
+from nebula3.fbthrift.util.async_common import TReadWriteBuffer
+from nebula3.graph import GraphService
+from nebula3.graph.ttypes import (
+    AuthResponse,
+    ExecutionResponse,
+    VerifyClientVersionResp,
+)
+from nebula3.storage import GraphStorageService
+from nebula3.storage.ttypes import (
+    PartitionResult,
+    ResponseCommon,
+    ScanCursor,
+    ScanResponse,
+)
+
+
+class GraphdHandler(GraphService.Iface):
+    """Answer every statement with a one row result, count the calls"""
+
+    def __init__(self, latency=0.0, connect_latency=0.0, auth_latency=0.0):
+        """
+        :param latency: seconds to answer a statement
+        :param connect_latency: seconds to answer verifyClientVersion, what
+        opening a connection costs
+        :param auth_latency: seconds to answer authenticate, what opening a
+        session costs
+        """
+        self.latency = latency
+        self.connect_latency = connect_latency
+        self.auth_latency = auth_latency
+        self.calls = {}
+        # session id to the space of the session
+        self.spaces = {}
+        # the ids of the sessions expired on the server
+        self.expired = set()
+        # the rows of a JSON result
+        self.json_rows = 1
+        self._lock = threading.Lock()
+        self._session_id = 0
+
+    def _count(self, name):
+        with self._lock:
+            self.calls[name] = self.calls.get(name, 0) + 1
+
+    def verifyClientVersion(self, req=None):
+        self._count('verifyClientVersion')
+        time.sleep(self.connect_latency)
+        return VerifyClientVersionResp(error_code=ErrorCode.SUCCEEDED)
+
+    def authenticate(self, username=None, password=None):
+        self._count('authenticate')
+        time.sleep(self.auth_latency)
+        with self._lock:
+            self._session_id += 1
+            session_id = self._session_id
+        return AuthResponse(
+            error_code=ErrorCode.SUCCEEDED,
+            session_id=session_id,
+            time_zone_offset_seconds=0,
+            time_zone_name=b'UTC',
+        )
+
+    def signout(self, sessionId=None):
+        self._count('signout')
+
+    def execute(self, sessionId=None, stmt=None):
+        return self.executeWithParameter(sessionId, stmt, {})
+
+    def _error_code(self, sessionId, stmt):
+        if stmt.startswith(b'ERROR'):
+            return ErrorCode.E_SYNTAX_ERROR
+        if stmt.startswith(b'EXPIRE') or sessionId in self.expired:
+            return ErrorCode.E_SESSION_INVALID
+        for part in stmt.split(b';'):
+            part = part.strip()
+            if part.upper().startswith(b'USE '):
+                self.spaces[sessionId] = part[4:].strip(b' `')
+        return ErrorCode.SUCCEEDED
+
+    def executeWithParameter(self, sessionId=None, stmt=None, parameterMap=None):
+        self._count('execute')
+        time.sleep(self.latency)
+        error_code = self._error_code(sessionId, stmt)
+        if error_code != ErrorCode.SUCCEEDED:
+            return ExecutionResponse(
+                error_code=error_code,
+                latency_in_us=0,
+                error_msg=ErrorCode._VALUES_TO_NAMES[error_code].encode('utf-8'),
+                space_name=self.spaces.get(sessionId),
+            )
+        data = DataSet(column_names=[b'stmt'], rows=[Row(values=[Value(sVal=stmt)])])
+        return ExecutionResponse(
+            error_code=ErrorCode.SUCCEEDED,
+            latency_in_us=int(self.latency * 1000000),
+            data=data,
+            space_name=self.spaces.get(sessionId),
+        )
+
+    def executeJsonWithParameter(self, sessionId=None, stmt=None, parameterMap=None):
+        self._count('executeJson')
+        time.sleep(self.latency)
+        error_code = self._error_code(sessionId, stmt)
+        return json.dumps(
+            {
+                'errors': [{'code': error_code}],
+                'results': [
+                    {
+                        'columns': ['stmt'],
+                        'data': [{'row': [stmt.decode()], 'meta': [None]}]
+                        * self.json_rows,
+                        'latencyInUs': int(self.latency * 1000000),
+                        'spaceName': (self.spaces.get(sessionId) or b'').decode(),
+                    }
+                ],
+            }
+        ).encode('utf-8')
+
+
+class StoragedHandler(GraphStorageService.Iface):
+    """Scan the vertexes of the parts page by page, count the scans in flight"""
+
+    def __init__(self):
+        self.latency = 0.0
+        # part id to the vids of the part
+        self.parts = {}
+        # part id to the HostAddr of the new leader
+        self.moved = {}
+        # the part ids answered with E_PART_NOT_FOUND
+        self.failed = set()
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def scanVertex(self, req=None):
+        with self._lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            time.sleep(self.latency)
+            return self._scan(req)
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _scan(self, req):
+        ((part_id, cursor),) = req.parts.items()
+        result = ResponseCommon(failed_parts=[], latency_in_us=0)
+        props = DataSet(column_names=[b'_vid', b'player._vid', b'player.name'], rows=[])
+        if part_id in self.moved or part_id in self.failed:
+            code = ErrorCode.E_LEADER_CHANGED
+            if part_id in self.failed:
+                code = ErrorCode.E_PART_NOT_FOUND
+            result.failed_parts.append(
+                PartitionResult(
+                    code=code, part_id=part_id, leader=self.moved.get(part_id)
+                )
+            )
+            return ScanResponse(result=result, props=props, cursors={})
+        vids = self.parts[part_id]
+        start = int(cursor.next_cursor or 0)
+        end = start + req.limit
+        for vid in vids[start:end]:
+            props.rows.append(
+                Row(
+                    values=[
+                        Value(sVal=vid),
+                        Value(sVal=vid),
+                        Value(sVal=b'name of ' + vid),
+                    ]
+                )
+            )
+        next_cursor = str(end).encode('utf-8') if end < len(vids) else None
+        return ScanResponse(
+            result=result,
+            props=props,
+            cursors={part_id: ScanCursor(next_cursor=next_cursor)},
+        )
+
+
+class GraphdStandIn(object):
+    """Serve a GraphdHandler, or the handler of another service, over the
+    header transport on a local port
+    """
+
+    def __init__(self, handler=None, service=GraphService):
+        self.handler = handler if handler is not None else GraphdHandler()
+        self._server = TServer(
+            service.Processor(self.handler),
+            None,
+            TTransport.TBufferedTransportFactory(),
+            THeaderProtocol.THeaderProtocolFactory(),
+        )
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self._sock.bind(('127.0.0.1', 0))
+        self._sock.listen(128)
+        self.address = ('127.0.0.1', self._sock.getsockname()[1])
+        self.host_addr = HostAddr(host=self.address[0], port=self.address[1])
+        threading.Thread(target=self._accept, daemon=True).start()
+
+    def _accept(self):
+        while True:
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            client = TSocket.TSocket()
+            client.setHandle(conn)
+            threading.Thread(
+                target=self._server.handle, args=(client,), daemon=True
+            ).start()
+
+    def close(self):
+        self._sock.close()
+
+
+class AsyncGraphdStandIn(object):
+    """Serve a GraphdHandler with the asyncio streams on a local port, the
+    event loop runs in its own thread and the handler in the executor
+    """
+
+    def __init__(self):
+        self.handler = GraphdHandler()
+        self._processor = GraphService.Processor(self.handler)
+        self._loop = asyncio.new_event_loop()
+        self._server = self._loop.run_until_complete(
+            asyncio.start_server(self._serve, '127.0.0.1', 0)
+        )
+        self.address = ('127.0.0.1', self._server.sockets[0].getsockname()[1])
+        threading.Thread(target=self._loop.run_forever, daemon=True).start()
+
+    async def _serve(self, reader, writer):
+        try:
+            while True:
+                head = await reader.readexactly(4)
+                (size,) = struct.unpack('!I', head)
+                frame = head + await reader.readexactly(size)
+                reply = await self._loop.run_in_executor(None, self._process, frame)
+                if reply:
+                    writer.write(reply)
+                    await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError, asyncio.CancelledError):
+            pass
+        finally:
+            writer.close()
+
+    def _process(self, frame):
+        buf = TReadWriteBuffer(frame)
+        prot = THeaderProtocol.THeaderProtocol(buf)
+        self._processor.process(prot, prot, None)
+        return buf.getvalue()
+
+    def close(self):
+        async def _close():
+            self._server.close()
+            tasks = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        asyncio.run_coroutine_threadsafe(_close(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
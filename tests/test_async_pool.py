@@ -0,0 +1,236 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2026 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License.
+
+
+import asyncio
+import time
+
+import pytest
+
+from nebula3.Config import Config, SessionPoolConfig
+from nebula3.Exception import IOErrorException, NoValidSessionException
+from nebula3.gclient.net.AsyncConnection import AsyncConnection
+from nebula3.gclient.net.AsyncConnectionPool import AsyncConnectionPool
+from nebula3.gclient.net.AsyncSessionPool import AsyncSessionPool
+from nebula3.gclient.net.base import ExecuteError
+
+
+def test_execute_py(async_graphd):
+    async def run():
+        pool = AsyncConnectionPool()
+        assert await pool.init([async_graphd.address], Config())
+        async with pool.session_context('root', 'nebula') as session:
+            result = await session.execute_py('RETURN $a', {'a': 1})
+            assert result.is_succeeded()
+            assert result.row_values(0)[0].as_string() == 'RETURN $a'
+            with pytest.raises(ExecuteError):
+                await session.execute_py('ERROR')
+            assert await session.ping()
+        assert pool.in_used_connects() == 0
+        await pool.close()
+
+    asyncio.run(run())
+    assert async_graphd.handler.calls['signout'] == 1
+
+
+def test_invalid_frame_size():
+    async def reply(reader, writer):
+        await reader.read(4)
+        # a size past the max frame size of the header transport
+        writer.write(b'\xff\xff\xff\xf0')
+        await writer.drain()
+
+    async def run():
+        server = await asyncio.start_server(reply, '127.0.0.1', 0)
+        port = server.sockets[0].getsockname()[1]
+        conn = AsyncConnection()
+        with pytest.raises(IOErrorException, match='Invalid frame size') as e:
+            await conn.open('127.0.0.1', port, 1000)
+        assert e.value.type == IOErrorException.E_CONNECT_BROKEN
+        assert conn.is_closed()
+        server.close()
+        await server.wait_closed()
+
+    asyncio.run(run())
+
+
+def test_concurrent_sessions(async_graphd):
+    async_graphd.handler.latency = 0.1
+    config = Config()
+    config.max_connection_pool_size = 10
+
+    async def execute(pool):
+        async with pool.session_context('root', 'nebula') as session:
+            return await session.execute('YIELD 1')
+
+    async def run():
+        pool = AsyncConnectionPool()
+        assert await pool.init([async_graphd.address], config)
+        start = time.time()
+        results = await asyncio.gather(*(execute(pool) for _ in range(10)))
+        cost = time.time() - start
+        await pool.close()
+        return results, cost
+
+    results, cost = asyncio.run(run())
+    assert all(result.is_succeeded() for result in results)
+    # the statements are on the server at the same time
+    assert cost < 0.5
+
+
+def test_cancel(async_graphd):
+    async_graphd.handler.latency = 1
+    config = Config()
+    config.max_connection_pool_size = 1
+    config.acquire_timeout = 5000
+
+    async def run():
+        pool = AsyncConnectionPool()
+        assert await pool.init([async_graphd.address], config)
+        session = await pool.get_session('root', 'nebula')
+        task = asyncio.ensure_future(session.execute('YIELD 1'))
+        # a task waiting for the connection is cancelled too
+        waiting = asyncio.ensure_future(pool.get_connection())
+        await asyncio.sleep(0.1)
+        assert pool.wait_stats()['waiting'] == 1
+        task.cancel()
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert pool.wait_stats()['waiting'] == 0
+
+        # the connection of the cancelled statement is closed
+        with pytest.raises(IOErrorException):
+            await session.execute('YIELD 1')
+        await session.release()
+        assert pool.in_used_connects() == 0
+
+        async_graphd.handler.latency = 0
+        async with pool.session_context('root', 'nebula') as session:
+            assert (await session.execute('YIELD 1')).is_succeeded()
+        await pool.close()
+
+    asyncio.run(run())
+
+
+def test_acquire_timeout(async_graphd):
+    config = Config()
+    config.max_connection_pool_size = 1
+    config.acquire_timeout = 200
+
+    async def run():
+        pool = AsyncConnectionPool()
+        assert await pool.init([async_graphd.address], config)
+        session = await pool.get_session('root', 'nebula')
+        start = time.time()
+        assert await pool.get_connection() is None
+        assert time.time() - start >= 0.2
+        assert pool.wait_stats()['timeouts'] == 1
+
+        # a connection given back is handed to the waiter
+        waiting = asyncio.ensure_future(pool.get_session('root', 'nebula'))
+        await asyncio.sleep(0.05)
+        await session.release()
+        session = await waiting
+        assert (await session.execute('YIELD 1')).is_succeeded()
+        await session.release()
+        await pool.close()
+
+    asyncio.run(run())
+
+
+def test_check_idle_connections(async_graphd):
+    config = Config()
+    config.max_connection_pool_size = 12
+    config.min_connection_pool_size = 12
+    config.validation_policy = 'background'
+
+    async def run():
+        pool = AsyncConnectionPool()
+        assert await pool.init([async_graphd.address], config)
+        assert pool.idle_connects() == 12
+        async_graphd.handler.latency = 0.2
+        start = time.time()
+        checking = asyncio.ensure_future(pool._remove_idle_unusable_connection())
+        await asyncio.sleep(0.1)
+        # the connections not being pinged are still handed out
+        connection = await pool.get_connection()
+        assert connection is not None and pool.connects() == 12
+        pool.return_connection(connection)
+        await checking
+        assert time.time() - start < 0.2 * 4
+        assert pool.idle_connects() == 12
+        await pool.close()
+
+    asyncio.run(run())
+
+
+def test_probe(async_graphd):
+    config = Config()
+    config.min_connection_pool_size = 3
+    address = async_graphd.address
+
+    async def run():
+        pool = AsyncConnectionPool()
+        assert await pool.init([address], config)
+        idle = [(c, c.start_use_time) for c in pool._idle_connections[address]]
+        await asyncio.sleep(0.01)
+        assert await pool._probe(address)
+        # the probed connection is not taken as used
+        assert [(c, c.start_use_time) for c in pool._idle_connections[address]] == idle
+        await pool.close()
+
+    asyncio.run(run())
+
+
+def test_session_pool(async_graphd):
+    async_graphd.handler.latency = 0.05
+    config = SessionPoolConfig()
+    config.min_size = 2
+    config.max_size = 4
+    config.acquire_timeout = 2000
+
+    async def run():
+        pool = AsyncSessionPool('root', 'nebula', 'test', [async_graphd.address])
+        assert await pool.init(config)
+        assert async_graphd.handler.calls['authenticate'] == 2
+        results = await asyncio.gather(
+            *(pool.execute_py('RETURN $i', {'i': i}) for i in range(10))
+        )
+        assert all(result.is_succeeded() for result in results)
+        with pytest.raises(ExecuteError):
+            await pool.execute_py('ERROR')
+        assert async_graphd.handler.calls['authenticate'] == 4
+        assert pool.wait_stats()['waiting'] == 0
+        await pool.close()
+        with pytest.raises(NoValidSessionException):
+            await pool.execute('YIELD 1')
+
+    asyncio.run(run())
+    assert async_graphd.handler.calls['signout'] == 4
+
+
+def test_session_pool_space(async_graphd):
+    config = SessionPoolConfig()
+    config.min_size = 1
+    config.max_size = 1
+
+    async def run():
+        pool = AsyncSessionPool('root', 'nebula', 'nba', [async_graphd.address])
+        assert await pool.init(config)
+        await pool.execute('YIELD 1')
+        assert async_graphd.handler.calls['execute'] == 2
+        await pool.execute('USE other; YIELD 1')
+        assert list(async_graphd.handler.spaces.values()) == [b'other']
+        await pool.execute_json('YIELD 1')
+        assert list(async_graphd.handler.spaces.values()) == [b'nba']
+        assert async_graphd.handler.calls['execute'] == 4
+        await pool.close()
+
+    asyncio.run(run())
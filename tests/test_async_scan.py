@@ -0,0 +1,147 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2026 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License.
+
+
+import asyncio
+import time
+
+import pytest
+
+from nebula3.sclient.GraphStorageClient import GraphStorageClient
+
+
+class MetaCacheStandIn(object):
+    """The MetaCache of one space with the tag player"""
+
+    def __init__(self, part_leaders):
+        self.part_leaders = part_leaders
+
+    def get_space_id(self, space_name):
+        return 1
+
+    def get_tag_id(self, space_name, tag_name):
+        return 2
+
+    def get_part_leaders(self, space_name):
+        return dict(self.part_leaders)
+
+    def update_storage_leader(self, space_id, part_id, address):
+        self.part_leaders[part_id] = address
+
+
+def scan(client, **kwargs):
+    async def run():
+        batches = []
+        async for part, batch in client.ascan_vertex(
+            'nba', 'player', ['name'], **kwargs
+        ):
+            batches.append((part, batch))
+        return batches
+
+    return asyncio.run(run())
+
+
+def vids(batches):
+    return sorted(
+        vertex.get_id().as_string() for _, batch in batches for vertex in batch
+    )
+
+
+def test_ascan_vertex(storaged):
+    all_vids = []
+    for part in range(1, 5):
+        storaged.handler.parts[part] = [
+            '{}-{}'.format(part, i).encode('utf-8') for i in range(25)
+        ]
+        all_vids += ['{}-{}'.format(part, i) for i in range(25)]
+    storaged.handler.latency = 0.05
+    meta_cache = MetaCacheStandIn(
+        {part: storaged.host_addr for part in storaged.handler.parts}
+    )
+    client = GraphStorageClient(meta_cache, [storaged.host_addr])
+
+    batches = scan(client, batch_size=10, parts_per_storage=2)
+    # 3 pages of every part
+    assert len(batches) == 12
+    assert all(len(batch.as_nodes()) <= 10 for _, batch in batches)
+    assert vids(batches) == sorted(all_vids)
+    assert storaged.handler.max_in_flight == 2
+    client.close()
+
+
+def test_ascan_back_pressure(storaged):
+    storaged.handler.parts[1] = [str(i).encode('utf-8') for i in range(100)]
+    meta_cache = MetaCacheStandIn({1: storaged.host_addr})
+    client = GraphStorageClient(meta_cache, [storaged.host_addr])
+
+    async def run():
+        scanning = client.ascan_vertex(
+            'nba', 'player', ['name'], batch_size=10, max_pending_batches=2
+        )
+        batches = [await scanning.__anext__()]
+        await asyncio.sleep(0.3)
+        # the page consumed, 2 pages queued and 1 page waiting to be queued
+        assert storaged.handler.calls == 4
+        async for item in scanning:
+            batches.append(item)
+        return batches
+
+    batches = asyncio.run(run())
+    assert len(batches) == 10
+    assert storaged.handler.calls == 10
+    assert len(vids(batches)) == 100
+    client.close()
+
+
+def test_ascan_aclose(storaged):
+    storaged.handler.parts[1] = [str(i).encode('utf-8') for i in range(100)]
+    meta_cache = MetaCacheStandIn({1: storaged.host_addr})
+    client = GraphStorageClient(meta_cache, [storaged.host_addr])
+
+    async def run():
+        scanning = client.ascan_vertex(
+            'nba', 'player', ['name'], batch_size=10, max_pending_batches=2
+        )
+        try:
+            async for _ in scanning:
+                break
+        finally:
+            await scanning.aclose()
+        # no task is left blocked on the pages
+        assert asyncio.all_tasks() == {asyncio.current_task()}
+
+    asyncio.run(run())
+    calls = storaged.handler.calls
+    time.sleep(0.1)
+    assert storaged.handler.calls == calls < 10
+    client.close()
+
+
+def test_ascan_leader_changed(storaged, storaged2):
+    storaged.handler.parts = {1: [b'a'], 2: [b'b']}
+    storaged2.handler.parts = {2: [b'b']}
+    storaged.handler.moved[2] = storaged2.host_addr
+    meta_cache = MetaCacheStandIn({1: storaged.host_addr, 2: storaged.host_addr})
+    client = GraphStorageClient(meta_cache, [storaged.host_addr])
+
+    batches = scan(client)
+    assert vids(batches) == ['a', 'b']
+    assert meta_cache.part_leaders[2] == storaged2.host_addr
+    assert storaged2.handler.calls == 1
+    client.close()
+
+
+def test_ascan_failed_part(storaged):
+    storaged.handler.parts = {1: [b'a'], 2: [b'b']}
+    storaged.handler.failed.add(2)
+    meta_cache = MetaCacheStandIn({1: storaged.host_addr, 2: storaged.host_addr})
+    client = GraphStorageClient(meta_cache, [storaged.host_addr])
+
+    with pytest.raises(RuntimeError, match='Scan failed'):
+        scan(client)
+    assert vids(scan(client, partial_success=True)) == ['a']
+    client.close()
@@ -0,0 +1,114 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2026 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License.
+
+import pytest
+
+from nebula3.common.ttypes import DataSet, NullType, Row, Tag, Value, Vertex
+from nebula3.data.Column import Column
+from nebula3.data.ResultSet import ResultSet
+from nebula3.graph.ttypes import ExecutionResponse
+
+
+def make_result(rows=20):
+    data = DataSet(
+        column_names=[b'id', b'score', b'ok', b'name', b'maybe', b'v', b'mixed', b'n'],
+        rows=[],
+    )
+    for i in range(rows):
+        vertex = Vertex(
+            vid=Value(sVal=b'v%d' % i),
+            tags=[Tag(name=b'player', props={b'age': Value(iVal=i)})],
+        )
+        data.rows.append(
+            Row(
+                values=[
+                    Value(iVal=i),
+                    Value(fVal=i / 4.0),
+                    Value(bVal=i % 3 == 0),
+                    Value(sVal=b'team%d' % (i % 4)),
+                    Value(nVal=NullType.__NULL__) if i % 5 == 0 else Value(iVal=-i),
+                    Value(vVal=vertex),
+                    Value(iVal=i) if i % 2 else Value(sVal=b'odd'),
+                    Value(nVal=NullType.__NULL__),
+                ]
+            )
+        )
+    return ResultSet(ExecutionResponse(error_code=0, latency_in_us=0, data=data), 0)
+
+
+def test_columns():
+    result = make_result()
+    columns = result.columns()
+    assert list(columns.keys()) == result.keys()
+    assert [column.type for column in columns.values()] == [
+        Column.INT64,
+        Column.DOUBLE,
+        Column.BOOL,
+        Column.STRING,
+        Column.INT64,
+        Column.OBJECT,
+        Column.OBJECT,
+        Column.NULL,
+    ]
+    assert columns['name'].dictionary == ['team0', 'team1', 'team2', 'team3']
+    assert columns['id'].validity is None
+    assert columns['maybe'].null_count == 4
+    assert columns['maybe'].is_null(5) and not columns['maybe'].is_null(6)
+    assert result.columns() is columns
+    for key, column in columns.items():
+        assert len(column) == result.row_size()
+        assert column.to_pylist() == [
+            value.cast_primitive() for value in result.column_values(key)
+        ]
+
+
+def test_columns_empty():
+    data = DataSet(column_names=[b'a'], rows=[])
+    result = ResultSet(ExecutionResponse(error_code=0, latency_in_us=0, data=data), 0)
+    assert result.columns()['a'].to_pylist() == []
+    assert (
+        ResultSet(ExecutionResponse(error_code=0, latency_in_us=0), 0).columns() == {}
+    )
+
+
+def test_to_numpy():
+    np = pytest.importorskip('numpy')
+    columns = make_result().columns()
+    assert columns['id'].to_numpy().dtype == np.int64
+    assert columns['ok'].to_numpy().tolist() == columns['ok'].to_pylist()
+    maybe = columns['maybe'].to_numpy()
+    assert maybe.mask.sum() == 4
+    assert maybe.tolist() == columns['maybe'].to_pylist()
+
+
+def test_to_arrow():
+    pa = pytest.importorskip('pyarrow')
+    result = make_result()
+    table = result.to_arrow()
+    assert table.column_names == result.keys()
+    assert table.num_rows == 20
+    assert table.schema.field('id').type == pa.int64()
+    assert pa.types.is_dictionary(table.schema.field('name').type)
+    assert table.column('maybe').null_count == 4
+    assert table.column('n').null_count == 20
+    assert table.column('mixed').to_pylist()[:2] == ['odd', '1']
+    for key in ('id', 'score', 'ok', 'name', 'maybe', 'n'):
+        assert table.column(key).to_pylist() == result.columns()[key].to_pylist()
+
+
+def test_as_data_frame():
+    pd = pytest.importorskip('pandas')
+    result = make_result()
+    for primitive in (True, False):
+        expected = dict()
+        for key in result.keys():
+            if primitive:
+                expected[key] = [x.cast_primitive() for x in result.column_values(key)]
+            else:
+                expected[key] = [x.cast() for x in result.column_values(key)]
+        got = result.as_data_frame(primitive=primitive)
+        pd.testing.assert_frame_equal(got, pd.DataFrame(expected))
@@ -968,3 +968,26 @@ class TestResultset(TestBaseCase):
             in_use = True
             record.size() == 17
         assert in_use
+
+    def test_iter_tuples(self):
+        result = self.get_result_set()
+        expected = [
+            tuple(value.cast_primitive() for value in result.row_values(index))
+            for index in range(result.row_size())
+        ]
+        assert list(result.iter_tuples()) == expected
+        assert list(result.iter_primitive()) == [
+            dict(zip(result.keys(), values)) for values in expected
+        ]
+
+        # the type of a column changes after the first row
+        data_set = ttypes.DataSet(column_names=[b"a", b"b"], rows=[])
+        data_set.rows.append(
+            ttypes.Row(values=[Value(iVal=1), Value(nVal=Null.BAD_DATA)])
+        )
+        data_set.rows.append(ttypes.Row(values=[Value(sVal=b"x"), Value(fVal=1.5)]))
+        resp = graphTtype.ExecutionResponse(error_code=0, latency_in_us=0)
+        resp.data = data_set
+        result = ResultSet(resp, 0)
+        assert list(result.iter_tuples()) == [(1, None), ("x", 1.5)]
+        assert result.as_primitive() == [{"a": 1, "b": None}, {"a": "x", "b": 1.5}]
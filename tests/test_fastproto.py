@@ -0,0 +1,225 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2026 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License.
+
+import gc
+
+import pytest
+
+from nebula3.common import ttypes
+from nebula3.common.ttypes import (
+    Coordinate,
+    DataSet,
+    Date,
+    DateTime,
+    Duration,
+    Edge,
+    Geography,
+    NList,
+    NMap,
+    NSet,
+    NullType,
+    Path,
+    Point,
+    Row,
+    Step,
+    Tag,
+    Time,
+    Value,
+    Vertex,
+)
+from nebula3.fbthrift.protocol import (
+    TBinaryProtocol,
+    TCompactProtocol,
+    THeaderProtocol,
+    TProtocol,
+)
+from nebula3.fbthrift.transport import TTransport
+from nebula3.fbthrift.util import Serializer
+from nebula3.graph import ttypes as graph_ttypes
+from nebula3.graph.ttypes import AuthResponse, ExecutionResponse
+
+fastproto = pytest.importorskip('nebula3.fbthrift.protocol.fastproto')
+
+FACTORIES = [
+    TBinaryProtocol.TBinaryProtocolAcceleratedFactory(),
+    TCompactProtocol.TCompactProtocolAcceleratedFactory(),
+]
+
+
+def make_response(rows=10):
+    vertex = Vertex(
+        vid=Value(sVal=b'Tim Duncan'),
+        tags=[
+            Tag(
+                name=b'player',
+                props={b'name': Value(sVal=b'Tim Duncan'), b'age': Value(iVal=42)},
+            )
+        ],
+    )
+    edge = Edge(
+        src=Value(sVal=b'Tim Duncan'),
+        dst=Value(sVal=b'Tony Parker'),
+        type=1,
+        name=b'like',
+        ranking=-3,
+        props={b'degree': Value(fVal=0.95)},
+    )
+    path = Path(
+        src=vertex,
+        steps=[
+            Step(
+                dst=vertex,
+                type=-1,
+                name=b'like',
+                ranking=2**40,
+                props={b'likeness': Value(iVal=-(2**63))},
+            )
+        ],
+    )
+    values = [
+        Value(nVal=NullType.__NULL__),
+        Value(bVal=True),
+        Value(bVal=False),
+        Value(iVal=2**63 - 1),
+        Value(fVal=-1.5),
+        Value(sVal='中文'.encode('utf-8')),
+        Value(dVal=Date(2024, 2, 29)),
+        Value(tVal=Time(23, 59, 59, 999999)),
+        Value(dtVal=DateTime(1, 1, 1, 0, 0, 0, 0)),
+        Value(vVal=vertex),
+        Value(eVal=edge),
+        Value(pVal=path),
+        Value(lVal=NList(values=[Value(iVal=i) for i in range(20)])),
+        Value(mVal=NMap(kvs={b'k': Value(sVal=b'v'), b'': Value()})),
+        Value(uVal=NSet(values={Value(iVal=1), Value(iVal=-1)})),
+        Value(ggVal=Geography(ptVal=Point(coord=Coordinate(1.0, -2.5)))),
+        Value(duVal=Duration(seconds=3600, microseconds=1, months=-2)),
+    ]
+    data = DataSet(
+        column_names=[b'c%d' % i for i in range(len(values))],
+        rows=[Row(values=values) for _ in range(rows)],
+    )
+    return ExecutionResponse(
+        error_code=0,
+        latency_in_us=1234,
+        data=data,
+        space_name=b'nba',
+        error_msg=None,
+        comment=b'',
+    )
+
+
+@pytest.fixture
+def pure_python(monkeypatch):
+    """Route the generated read/write through the Python protocols."""
+
+    def use():
+        monkeypatch.setattr(ttypes, 'fastproto', None)
+        monkeypatch.setattr(graph_ttypes, 'fastproto', None)
+
+    return use
+
+
+@pytest.mark.parametrize('factory', FACTORIES)
+def test_encode_matches_python(factory, pure_python):
+    resp = make_response()
+    fast = Serializer.serialize(factory, resp)
+    pure_python()
+    assert Serializer.serialize(factory, resp) == fast
+
+
+@pytest.mark.parametrize('factory', FACTORIES)
+def test_decode_matches_python(factory, pure_python):
+    resp = make_response()
+    data = Serializer.serialize(factory, resp)
+    fast = Serializer.deserialize(factory, data, ExecutionResponse())
+    assert fast == resp
+    pure_python()
+    assert Serializer.deserialize(factory, data, ExecutionResponse()) == fast
+
+
+@pytest.mark.parametrize(
+    'proto_id',
+    [
+        THeaderProtocol.THeaderProtocol.T_BINARY_PROTOCOL,
+        THeaderProtocol.THeaderProtocol.T_COMPACT_PROTOCOL,
+    ],
+)
+def test_header_protocol_roundtrip(proto_id):
+    factory = THeaderProtocol.THeaderProtocolFactory(client_types=[0])
+    resp = make_response()
+    buf = TTransport.TMemoryBuffer()
+    prot = factory.getProtocol(buf)
+    prot.trans.set_protocol_id(proto_id)
+    prot.reset_protocol()
+    resp.write(prot)
+    prot.trans.flush()
+    got = Serializer.deserialize(factory, buf.getvalue(), ExecutionResponse())
+    assert got == resp
+
+
+@pytest.mark.parametrize('factory', FACTORIES)
+def test_decode_refills_transport(factory):
+    # a tiny read buffer makes the decoder ask for more data many times
+    resp = make_response(rows=50)
+    data = Serializer.serialize(factory, resp)
+    trans = TTransport.TBufferedTransport(TTransport.TMemoryBuffer(data), 7)
+    got = ExecutionResponse()
+    got.read(factory.getProtocol(trans))
+    assert got == resp
+
+
+@pytest.mark.parametrize('factory', FACTORIES)
+def test_decode_leaves_gc_enabled(factory):
+    # the collector keeps running while the transport is read
+    enabled = []
+
+    class Transport(TTransport.TBufferedTransport):
+        def cstringio_refill(self, partialread, reqlen):
+            enabled.append(gc.isenabled())
+            return super().cstringio_refill(partialread, reqlen)
+
+    resp = make_response(rows=50)
+    data = Serializer.serialize(factory, resp)
+    trans = Transport(TTransport.TMemoryBuffer(data), 7)
+    got = ExecutionResponse()
+    got.read(factory.getProtocol(trans))
+    assert got == resp
+    assert enabled and all(enabled)
+    # and tracks all the decoded containers once it is done
+    row = got.data.rows[0]
+    assert gc.is_tracked(row)
+    assert gc.is_tracked(row.values)
+    assert all(gc.is_tracked(value) for value in row.values)
+
+
+@pytest.mark.parametrize('factory', FACTORIES)
+def test_decode_skips_unknown_fields(factory):
+    # read back as an AuthResponse, only error_code has a matching type
+    data = Serializer.serialize(factory, make_response())
+    got = Serializer.deserialize(factory, data, AuthResponse())
+    assert got.error_code == 0
+    assert got.error_msg is None
+
+
+@pytest.mark.parametrize('factory', FACTORIES)
+def test_truncated_data(factory):
+    data = Serializer.serialize(factory, make_response())
+    with pytest.raises((EOFError, TTransport.TTransportException)):
+        Serializer.deserialize(factory, data[:-10], ExecutionResponse())
+
+
+def test_encode_out_of_range():
+    with pytest.raises(OverflowError):
+        Serializer.serialize(FACTORIES[0], Value(iVal=2**63))
+
+
+def test_decode_bad_container_type():
+    # list<Row> whose header claims i32 elements
+    data = b'\x0f\x00\x02\x08\x00\x00\x00\x01\x00\x00\x00\x00\x00'
+    with pytest.raises(TProtocol.TProtocolException):
+        Serializer.deserialize(FACTORIES[0], data, DataSet())
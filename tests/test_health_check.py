@@ -0,0 +1,48 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2026 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License.
+
+import time
+
+from nebula3.gclient.net.HealthCheck import CircuitBreaker, probe_in_parallel
+
+
+def test_circuit_breaker():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=100)
+    assert breaker.allow_probe()
+    assert not breaker.fail()
+    assert breaker.fail()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow_probe()
+
+    time.sleep(0.15)
+    assert breaker.allow_probe()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # one probe at a time when half open
+    assert not breaker.allow_probe()
+    # a failure when half open opens it again
+    assert breaker.fail()
+    assert not breaker.allow_probe()
+
+    time.sleep(0.15)
+    assert breaker.allow_probe()
+    breaker.succeed()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.failures == 0
+    assert not breaker.fail()
+
+
+def test_probe_in_parallel():
+    def probe(address):
+        time.sleep(0.2)
+        return address[1] % 2 == 0
+
+    addresses = [('127.0.0.1', port) for port in range(9660, 9670)]
+    start = time.time()
+    results = probe_in_parallel(probe, addresses)
+    assert time.time() - start < 1
+    assert results == {address: address[1] % 2 == 0 for address in addresses}
+    assert probe_in_parallel(probe, []) == {}
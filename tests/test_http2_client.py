@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2026 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License.
+
+import httpx
+import pytest
+
+from nebula3.fbthrift.transport import THttp2Client
+from nebula3.fbthrift.transport.TTransport import TTransportException
+
+
+@pytest.fixture
+def clients(monkeypatch):
+    """Record every httpx.Client the transport creates."""
+    created = []
+    client_class = httpx.Client
+    state = {'fail': False}
+
+    def handler(request):
+        if state['fail']:
+            raise httpx.ConnectError('connection reset', request=request)
+        return httpx.Response(200, content=request.content[::-1])
+
+    def make_client(**kwargs):
+        client = client_class(transport=httpx.MockTransport(handler))
+        created.append(client)
+        return client
+
+    monkeypatch.setattr(THttp2Client.httpx, 'Client', make_client)
+    return created, state
+
+
+def roundtrip(transport, data):
+    transport.write(data)
+    transport.flush()
+    return transport.read(len(data))
+
+
+def test_client_reused_between_requests(clients):
+    created, _ = clients
+    transport = THttp2Client.THttp2Client('http://127.0.0.1:9669')
+    transport.open()
+    for i in range(5):
+        assert roundtrip(transport, b'ab%d' % i) == b'%dba' % i
+    assert len(created) == 1
+    transport.close()
+    assert created[0].is_closed
+    assert not transport.isOpen()
+
+
+def test_reconnect_after_error(clients):
+    created, state = clients
+    transport = THttp2Client.THttp2Client('http://127.0.0.1:9669')
+    transport.open()
+    state['fail'] = True
+    with pytest.raises(TTransportException):
+        roundtrip(transport, b'abc')
+    assert created[0].is_closed
+    assert not transport.isOpen()
+
+    state['fail'] = False
+    assert roundtrip(transport, b'abc') == b'cba'
+    assert roundtrip(transport, b'abc') == b'cba'
+    assert len(created) == 2
+    # closing twice is harmless
+    transport.close()
+    transport.close()
+
+
+def test_channels_shared_by_transports(clients):
+    created, _ = clients
+    channels = THttp2Client.THttp2Channels(2)
+    transports = [
+        THttp2Client.THttp2Client('http://127.0.0.1:9669', channels=channels)
+        for _ in range(10)
+    ]
+    for i, transport in enumerate(transports):
+        transport.open()
+        assert roundtrip(transport, b'ab%d' % i) == b'%dba' % i
+    assert len(created) == 2
+    assert channels.count('http://127.0.0.1:9669') == 2
+
+    # closing a transport leaves the shared client to the others
+    transports[0].close()
+    assert not any(client.is_closed for client in created)
+    assert roundtrip(transports[1], b'abc') == b'cba'
+
+    channels.close()
+    assert all(client.is_closed for client in created)
+    assert channels.count() == 0
+
+    # no new client once closed
+    with pytest.raises(TTransportException):
+        transports[1].open()
+    assert len(created) == 2
+    assert channels.count() == 0
+
+
+def test_channels_survive_request_error(clients):
+    created, state = clients
+    channels = THttp2Client.THttp2Channels(1)
+    transport = THttp2Client.THttp2Client('http://127.0.0.1:9669', channels=channels)
+    transport.open()
+    state['fail'] = True
+    with pytest.raises(TTransportException):
+        roundtrip(transport, b'abc')
+    assert not created[0].is_closed
+
+    state['fail'] = False
+    assert roundtrip(transport, b'abc') == b'cba'
+    assert len(created) == 1
+
+
+def test_channels_size():
+    with pytest.raises(ValueError):
+        THttp2Client.THttp2Channels(0)
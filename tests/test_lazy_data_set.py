@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2026 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License.
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from nebula3.common import ttypes
+from nebula3.common.ttypes import DataSet, Edge, Row, Tag, Value, Vertex
+from nebula3.data.LazyDataSet import LazyDataSet, recv_execute_with_parameter
+from nebula3.data.ResultSet import ResultSet
+from nebula3.fbthrift.Thrift import TMessageType
+from nebula3.fbthrift.protocol import THeaderProtocol
+from nebula3.fbthrift.transport import THeaderTransport, TTransport
+from nebula3.graph import GraphService
+from nebula3.graph import ttypes as graph_ttypes
+from nebula3.graph.ttypes import ExecutionResponse, PlanDescription
+
+
+def make_response(rows):
+    data = DataSet(column_names=[b'id', b'name', b'v', b'e'], rows=[])
+    for i in range(rows):
+        vertex = Vertex(
+            vid=Value(iVal=i),
+            tags=[Tag(name=b'player', props={b'age': Value(iVal=i % 50)})],
+        )
+        edge = Edge(
+            src=Value(iVal=i),
+            dst=Value(iVal=i + 1),
+            type=1,
+            name=b'follow',
+            ranking=0,
+            props={b'degree': Value(bVal=i % 2 == 0)},
+        )
+        values = [Value(iVal=i), Value(sVal=b'player%d' % i), Value(vVal=vertex)]
+        if i % 3:
+            # rows shorter than the columns decode as None
+            values.append(Value(eVal=edge))
+        data.rows.append(Row(values=values))
+    return ExecutionResponse(
+        error_code=0,
+        latency_in_us=10,
+        data=data,
+        space_name=b'nba',
+        plan_desc=PlanDescription(plan_node_descs=[], node_index_map={}),
+        comment=b'lazy',
+    )
+
+
+def reply_client(resp, proto_id):
+    buf = TTransport.TMemoryBuffer()
+    trans = THeaderTransport.THeaderTransport(buf)
+    trans.set_protocol_id(proto_id)
+    prot = THeaderProtocol.THeaderProtocol(trans)
+    prot.writeMessageBegin('executeWithParameter', TMessageType.REPLY, 0)
+    GraphService.executeWithParameter_result(success=resp).write(prot)
+    prot.writeMessageEnd()
+    trans.flush()
+    # two replies to check the lazy read leaves the transport in order
+    frame = buf.getvalue() * 2
+    trans = THeaderTransport.THeaderTransport(TTransport.TMemoryBuffer(frame))
+    return GraphService.Client(THeaderProtocol.THeaderProtocol(trans))
+
+
+@pytest.fixture(params=[True, False], ids=['fastproto', 'python'])
+def accelerate(request, monkeypatch):
+    if not request.param:
+        monkeypatch.setattr(ttypes, 'fastproto', None)
+        monkeypatch.setattr(graph_ttypes, 'fastproto', None)
+        monkeypatch.setattr(GraphService, 'fastproto', None)
+    return request.param
+
+
+@pytest.mark.parametrize(
+    'proto_id',
+    [THeaderTransport.T_BINARY_PROTOCOL, THeaderTransport.T_COMPACT_PROTOCOL],
+)
+def test_lazy_response(proto_id, accelerate):
+    resp = make_response(50)
+    client = reply_client(resp, proto_id)
+    for _ in range(2):
+        got = recv_execute_with_parameter(client)
+        if not accelerate:
+            # decoded right away
+            assert type(got.data) is DataSet
+            assert got == resp
+            continue
+        assert isinstance(got.data, LazyDataSet)
+        assert got.data.row_size() == 50
+        assert not got.data.is_decoded()
+        assert got.comment == b'lazy'
+        assert got.plan_desc == resp.plan_desc
+        for index in range(4):
+            assert got.data.column(index) == [
+                row.values[index] if index < len(row.values) else None
+                for row in resp.data.rows
+            ]
+        assert got.data.row(7) == resp.data.rows[7]
+        assert not got.data.is_decoded()
+        assert got == resp
+        assert got.data.is_decoded()
+
+
+def test_lazy_result_set(accelerate):
+    resp = make_response(30)
+    resp.data.rows = [row for row in resp.data.rows if len(row.values) == 4]
+    lazy = recv_execute_with_parameter(
+        reply_client(resp, THeaderTransport.T_COMPACT_PROTOCOL)
+    )
+    eager = ResultSet(resp, 0)
+    result = ResultSet(lazy, 0)
+    assert result.row_size() == eager.row_size() == 20
+    assert result.keys() == eager.keys()
+    assert result.get_row_types() == eager.get_row_types()
+    assert [v.cast() for v in result.column_values('name')] == [
+        v.cast() for v in eager.column_values('name')
+    ]
+    assert str(result.row_values(3)) == str(eager.row_values(3))
+    assert [str(record) for record in result] == [str(record) for record in eager]
+    assert result.columns()['name'].to_pylist() == eager.columns()['name'].to_pylist()
+    assert not accelerate or not lazy.data.is_decoded()
+    assert result.as_primitive() == eager.as_primitive()
+
+
+def test_lazy_iter_rows():
+    resp = make_response(900)
+    resp.data.rows = [row for row in resp.data.rows if len(row.values) == 4]
+    got = recv_execute_with_parameter(
+        reply_client(resp, THeaderTransport.T_COMPACT_PROTOCOL)
+    )
+    rows = []
+    # the lookups between the batches do not move the iteration
+    for index, row in enumerate(got.data.iter_rows()):
+        rows.append(row)
+        assert got.data.row(599 - index) == resp.data.rows[599 - index]
+    assert rows == resp.data.rows
+    assert got.data.row(-1) == resp.data.rows[-1]
+    with pytest.raises(IndexError):
+        got.data.row(600)
+    assert not got.data.is_decoded()
+    result = ResultSet(got, 0)
+    assert [record.get_value(0).as_int() for record in result] == [
+        row.values[0].get_iVal() for row in resp.data.rows
+    ]
+
+
+def test_lazy_iter_tuples(monkeypatch):
+    resp = make_response(600)
+    resp.data.rows = [row for row in resp.data.rows if len(row.values) == 4]
+    result = ResultSet(
+        recv_execute_with_parameter(
+            reply_client(resp, THeaderTransport.T_COMPACT_PROTOCOL)
+        ),
+        0,
+    )
+
+    def row(self, index):
+        raise AssertionError('the rows are not looked up one by one')
+
+    monkeypatch.setattr(LazyDataSet, 'row', row)
+    assert list(result.iter_tuples()) == list(ResultSet(resp, 0).iter_tuples())
+
+
+def test_lazy_decode_threads():
+    resp = make_response(300)
+    resp.data.rows = [row for row in resp.data.rows if len(row.values) == 4]
+    got = recv_execute_with_parameter(
+        reply_client(resp, THeaderTransport.T_COMPACT_PROTOCOL)
+    )
+    names = [row.values[1] for row in resp.data.rows]
+
+    def read(index):
+        # the buffer is dropped by whichever thread decodes all the rows
+        if index % 3 == 0:
+            return got.data.rows == resp.data.rows
+        if index % 3 == 1:
+            return list(got.data.iter_rows()) == resp.data.rows
+        return got.data.column(1) == names
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        assert all(executor.map(read, range(48)))
+    assert got.data.is_decoded()
+
+
+def test_lazy_empty_response():
+    resp = ExecutionResponse(error_code=-1005, latency_in_us=0, error_msg=b'bad')
+    got = recv_execute_with_parameter(
+        reply_client(resp, THeaderTransport.T_COMPACT_PROTOCOL)
+    )
+    assert got.data is None
+    assert ResultSet(got, 0).error_msg() == 'bad'
+
+    resp.data = DataSet(column_names=[b'a'], rows=[])
+    got = recv_execute_with_parameter(
+        reply_client(resp, THeaderTransport.T_COMPACT_PROTOCOL)
+    )
+    assert got.data.row_size() == 0
+    assert got.data.column(0) == []
+    assert ResultSet(got, 0).is_empty()
@@ -0,0 +1,70 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2026 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License.
+
+import pytest
+
+from nebula3.gclient.net.LoadBalancer import (
+    EwmaLoadBalancer,
+    LeastInFlightLoadBalancer,
+    LoadBalancer,
+    RoundRobinLoadBalancer,
+    create_load_balancer,
+)
+
+A = ('127.0.0.1', 9669)
+B = ('127.0.0.1', 9670)
+C = ('127.0.0.1', 9671)
+
+
+def test_round_robin():
+    balancer = RoundRobinLoadBalancer()
+    assert [balancer.select([A, B, C]) for _ in range(6)] == [A, B, C, A, B, C]
+    assert balancer.select([B]) == B
+
+
+def test_least_in_flight():
+    balancer = LeastInFlightLoadBalancer()
+    balancer.begin(A)
+    balancer.begin(A)
+    balancer.begin(B)
+    assert [balancer.select([A, B, C]) for _ in range(2)] == [C, C]
+    balancer.begin(C)
+    balancer.begin(C)
+    assert balancer.select([A, B, C]) == B
+    balancer.end(A, 0.01)
+    balancer.end(A, 0.01)
+    assert balancer.select([A, B, C]) == A
+    assert balancer.stats()[A] == {'in_flight': 0, 'latency': 10.0}
+
+
+def test_ewma():
+    balancer = EwmaLoadBalancer(alpha=0.5)
+    for _ in range(3):
+        balancer.begin(A)
+        balancer.end(A, 0.1)
+        balancer.begin(B)
+        balancer.end(B, 0.01)
+    assert all(balancer.select([A, B]) == B for _ in range(20))
+    # a failure costs at least the failure latency
+    balancer.begin(B)
+    balancer.end(B, 0.01, succeeded=False)
+    assert balancer.latency(B) > balancer.latency(A)
+    assert balancer.select([A]) == A
+    # not measured yet
+    assert all(balancer.select([A, C]) == C for _ in range(20))
+
+
+def test_create_load_balancer():
+    assert isinstance(create_load_balancer('round_robin'), RoundRobinLoadBalancer)
+    assert isinstance(create_load_balancer('ewma'), EwmaLoadBalancer)
+    balancer = LeastInFlightLoadBalancer()
+    assert create_load_balancer(balancer) is balancer
+    with pytest.raises(ValueError):
+        create_load_balancer('random')
+    # a load balancer implements select
+    with pytest.raises(TypeError):
+        LoadBalancer()
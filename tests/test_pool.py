@@ -7,12 +7,14 @@
 
 
 import os
+import socket
 import threading
 import time
 from unittest import TestCase
 
 import pytest
 
+from nebula3.common.ttypes import ErrorCode
 from nebula3.Config import Config
 from nebula3.Exception import (
     InValidHostname,
@@ -20,6 +22,9 @@ from nebula3.Exception import (
     NotValidConnectionException,
 )
 from nebula3.gclient.net import ConnectionPool
+from nebula3.fbthrift.Thrift import TApplicationException
+from nebula3.fbthrift.transport.TTransport import TTransportException
+from nebula3.gclient.net.base import ExecuteError
 
 
 class TestConnectionPool(TestCase):
@@ -304,3 +309,469 @@ def test_remove_invalid_connection():
     finally:
         os.system("docker start tests_graphd0_1 || docker start tests-graphd0-1")
         time.sleep(3)
+
+
+def test_get_connection_reuse(graphd):
+    configs = Config()
+    configs.max_connection_pool_size = 2
+    pool = ConnectionPool()
+    assert pool.init([graphd.address], configs)
+    session = pool.get_session("root", "nebula")
+    connection = session._connection
+    session.release()
+    assert pool.in_used_connects() == 0
+    session = pool.get_session("root", "nebula")
+    assert session._connection is connection
+    assert pool.connects() == 1
+    session.release()
+    pool.close()
+
+
+def test_get_connection_concurrently(graphd):
+    configs = Config()
+    configs.min_connection_pool_size = 4
+    configs.max_connection_pool_size = 6
+    pool = ConnectionPool()
+    assert pool.init([graphd.address], configs)
+    # every check of an idle connection takes 0.2s
+    graphd.handler.latency = 0.2
+    connections = []
+
+    def get_connection():
+        connections.append(pool.get_connection())
+
+    threads = [threading.Thread(target=get_connection) for _ in range(8)]
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    # the checks are not serialized by the pool lock
+    assert time.time() - start < 0.6
+    assert len([conn for conn in connections if conn is not None]) == 6
+    assert pool.connects() == 6
+    assert pool.in_used_connects() == 6
+    pool.close()
+
+
+@pytest.mark.parametrize(
+    "policy, pings", [("always", 3), ("idle", 1), ("never", 0), ("background", 0)]
+)
+def test_validation_policy(graphd, policy, pings):
+    configs = Config()
+    configs.min_connection_pool_size = 1
+    configs.validation_policy = policy
+    configs.validation_idle_time = 100
+    pool = ConnectionPool()
+    assert pool.init([graphd.address], configs)
+    connection = pool.get_connection()
+    pool.return_connection(connection)
+    # unused longer than validation_idle_time
+    connection.last_used_time -= 1
+    assert pool.get_connection() is connection
+    pool.return_connection(connection)
+    assert pool.get_connection() is connection
+    assert graphd.handler.calls.get("execute", 0) == pings
+    pool.close()
+
+
+def test_session_reconnect_drops_connection(graphd):
+    configs = Config()
+    configs.validation_policy = "never"
+    pool = ConnectionPool()
+    assert pool.init([graphd.address], configs)
+    session = pool.get_session("root", "nebula")
+    broken = session._connection
+
+    def execute_parameter(session_id, stmt, params):
+        raise IOErrorException(IOErrorException.E_CONNECT_BROKEN, "broken")
+
+    broken.execute_parameter = execute_parameter
+    assert session.execute("YIELD 1").is_succeeded()
+    assert session._connection is not broken
+    assert broken.is_closed()
+    assert broken not in pool._connections[graphd.address]
+    session.release()
+    assert pool.get_connection() is not broken
+    pool.close()
+
+
+def test_connection_released_with_is_used(graphd):
+    configs = Config()
+    configs.max_connection_pool_size = 1
+    pool = ConnectionPool()
+    assert pool.init([graphd.address], configs)
+    connection = pool.get_connection()
+    # given back the old way, it is still handed out again
+    connection.is_used = False
+    assert pool.get_connection() is connection
+    assert pool.connects() == 1
+    connection.is_used = False
+    pool.return_connection(connection)
+    assert pool.idle_connects() == 1
+    assert pool.get_connection() is connection
+    pool.close()
+
+
+def test_validation_policy_unknown():
+    configs = Config()
+    configs.validation_policy = "sometimes"
+    with pytest.raises(ValueError):
+        ConnectionPool().init([("127.0.0.1", 9669)], configs)
+
+
+def test_get_connection_wait(graphd):
+    configs = Config()
+    configs.max_connection_pool_size = 1
+    configs.acquire_timeout = 2000
+    pool = ConnectionPool()
+    assert pool.init([graphd.address], configs)
+    connection = pool.get_connection()
+    got = []
+
+    def get_connection(index):
+        got.append((index, pool.get_connection()))
+
+    threads = []
+    for index in range(3):
+        threads.append(threading.Thread(target=get_connection, args=(index,)))
+        threads[-1].start()
+        # queue up in order
+        while pool.wait_stats()["waiting"] <= index:
+            time.sleep(0.01)
+    for index in range(3):
+        pool.return_connection(connection)
+        threads[index].join()
+        assert got[-1] == (index, connection)
+    stats = pool.wait_stats()
+    assert stats["waits"] == 3 and stats["waiting"] == 0 and stats["timeouts"] == 0
+    assert stats["wait_time_max"] > 0
+
+    # nothing is given back in time
+    configs.acquire_timeout = 100
+    configs.max_waiters = 1
+    start = time.time()
+    get_connection(3)
+    assert got[-1] == (3, None)
+    assert time.time() - start >= 0.1
+    assert pool.wait_stats()["timeouts"] == 1
+    pool.close()
+
+
+def test_get_connection_given_back_before_wait(graphd, monkeypatch):
+    configs = Config()
+    configs.max_connection_pool_size = 2
+    configs.acquire_timeout = 3000
+    pool = ConnectionPool()
+    assert pool.init([graphd.address], configs)
+    held = [pool.get_connection(), pool.get_connection()]
+    get_connection = pool._get_connection
+
+    def give_back_after_miss():
+        connection = get_connection()
+        if connection is None and held:
+            # given back out of the lock, before the caller waits
+            pool.return_connection(held.pop())
+        return connection
+
+    monkeypatch.setattr(pool, "_get_connection", give_back_after_miss)
+    start = time.time()
+    assert pool.get_connection() is not None
+    assert time.time() - start < 1
+    assert pool.wait_stats()["waits"] == 0
+    pool.close()
+
+
+@pytest.mark.parametrize("load_balancer", ["least_in_flight", "ewma"])
+def test_load_balancer(graphd, graphd2, load_balancer):
+    configs = Config()
+    configs.max_connection_pool_size = 8
+    configs.load_balancer = load_balancer
+    pool = ConnectionPool()
+    assert pool.init([graphd.address, graphd2.address], configs)
+    balancer = pool.load_balancer()
+    graphd.handler.latency = 0.05
+    session = pool.get_session("root", "nebula")
+    address = session._connection.get_address()
+    session.execute("YIELD 1")
+    assert balancer.stats()[address]["in_flight"] == 0
+    assert balancer.stats()[address]["latency"] > 0
+    session.release()
+
+    # graphd is slow and has a statement in flight
+    for server, latency in ((graphd, 0.05), (graphd2, 0.001)):
+        balancer.begin(server.address)
+        balancer.end(server.address, latency)
+    balancer.begin(graphd.address)
+    sessions = [pool.get_session("root", "nebula") for _ in range(3)]
+    assert all(s._connection.get_address() == graphd2.address for s in sessions)
+    pool.close()
+
+
+def test_update_servers_status(graphd):
+    # the servers accept the connections and never answer
+    hung = []
+    for _ in range(3):
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.bind(('127.0.0.1', 0))
+        sock.listen(8)
+        hung.append(sock)
+    addresses = [sock.getsockname() for sock in hung]
+    pool = ConnectionPool()
+    start = time.time()
+    with pytest.raises(RuntimeError):
+        pool.init([graphd.address] + addresses, Config())
+    # the servers are checked at the same time, each one times out in 1s
+    assert time.time() - start < 2.5
+    assert pool.get_ok_servers_num() == 1
+
+    # the bad servers are not checked until the breakers reset
+    start = time.time()
+    pool.update_servers_status()
+    assert time.time() - start < 0.5
+    pool.close()
+    for sock in hung:
+        sock.close()
+
+
+def test_server_failed(graphd):
+    configs = Config()
+    configs.min_connection_pool_size = 1
+    pool = ConnectionPool()
+    assert pool.init([graphd.address], configs)
+    connects = graphd.handler.calls['verifyClientVersion']
+
+    # the health check reuses the idle connection
+    pool.update_servers_status()
+    assert graphd.handler.calls['verifyClientVersion'] == connects
+    assert pool.connects() == 1
+
+    graphd.handler.latency = 0.5
+    graphd.handler.connect_latency = 0.5
+    start = time.time()
+    pool.server_failed(graphd.address)
+    assert time.time() - start < 0.1
+    pool.close()
+
+
+def test_open_workers(graphd):
+    graphd.handler.connect_latency = 0.1
+    configs = Config()
+    configs.min_connection_pool_size = 8
+    configs.open_workers = 2
+    pool = ConnectionPool()
+    start = time.time()
+    assert pool.init([graphd.address], configs)
+    # two connections are opened at a time
+    assert 0.1 * 4 <= time.time() - start < 0.1 * 8
+    assert pool.idle_connects() == 8
+    pool.close()
+
+
+def test_min_idle_size(graphd):
+    graphd.handler.connect_latency = 0.2
+    configs = Config()
+    configs.max_connection_pool_size = 8
+    configs.min_idle_size = 4
+    pool = ConnectionPool()
+    start = time.time()
+    assert pool.init([graphd.address], configs)
+    # the connections are opened at the same time
+    assert time.time() - start < 0.6
+    assert pool.idle_connects() == 4
+
+    # the sessions take the idle connections without connecting
+    start = time.time()
+    sessions = [pool.get_session("root", "nebula") for _ in range(3)]
+    assert time.time() - start < 0.2 * 3
+    # the idle connections handed out are opened again in the background
+    deadline = time.time() + 2
+    while pool.idle_connects() < 4 and time.time() < deadline:
+        time.sleep(0.05)
+    assert pool.idle_connects() == 4
+    assert pool.connects() == 7
+    for session in sessions:
+        session.release()
+    pool.close()
+
+
+def test_check_idle_connections(graphd):
+    configs = Config()
+    configs.max_connection_pool_size = 12
+    configs.min_connection_pool_size = 12
+    configs.validation_policy = "background"
+    pool = ConnectionPool()
+    assert pool.init([graphd.address], configs)
+    assert pool.idle_connects() == 12
+    graphd.handler.latency = 0.2
+    checking = threading.Thread(target=pool._remove_idle_unusable_connection)
+    start = time.time()
+    checking.start()
+    time.sleep(0.1)
+    # the connections not being pinged are still handed out
+    connection = pool.get_connection()
+    assert time.time() - start < 0.2
+    assert pool.connects() == 12
+    pool.return_connection(connection)
+    checking.join()
+    # the pings run at the same time
+    assert time.time() - start < 0.2 * 4
+    assert pool.idle_connects() == 12
+    pool.close()
+
+
+def test_probe(graphd):
+    configs = Config()
+    configs.min_connection_pool_size = 3
+    pool = ConnectionPool()
+    assert pool.init([graphd.address], configs)
+    idle = [(c, c.start_use_time) for c in pool._idle_connections[graphd.address]]
+    time.sleep(0.01)
+    assert pool._probe(graphd.address)
+    # the probed connection is not taken as used
+    assert [
+        (c, c.start_use_time) for c in pool._idle_connections[graphd.address]
+    ] == idle
+    pool.close()
+
+
+@pytest.mark.parametrize("lazy_decode", [False, True])
+def test_execute_pipeline(graphd, lazy_decode):
+    configs = Config()
+    configs.lazy_decode = lazy_decode
+    pool = ConnectionPool()
+    assert pool.init([graphd.address], configs)
+    session = pool.get_session("root", "nebula")
+    stmts = [
+        'FETCH PROP ON player "player{}" YIELD vertex AS v'.format(i)
+        for i in range(300)
+    ]
+    requests = stmts[:150] + [(stmt, {}) for stmt in stmts[150:]]
+    executes = graphd.handler.calls.get('execute', 0)
+    results = session.execute_pipeline(requests)
+    assert graphd.handler.calls['execute'] == executes + 300
+    assert [r.row_values(0)[0].as_string() for r in results] == stmts
+    # the connection is still in step
+    assert session.execute('YIELD 1').row_values(0)[0].as_string() == 'YIELD 1'
+    assert session.execute_pipeline([]) == []
+    session.release()
+    pool.close()
+
+
+@pytest.mark.parametrize("seq_id", [0, 1, 1000])
+def test_execute_pipeline_out_of_step(graphd, seq_id):
+    pool = ConnectionPool()
+    assert pool.init([graphd.address], Config())
+    session = pool.get_session("root", "nebula")
+    connection = session._connection
+    client = connection._connection
+    recv = client.recv_executeWithParameter
+
+    def recv_executeWithParameter():
+        resp = recv()
+        # a reply out of the range, or the first one again
+        client._iprot.trans.seq_id = seq_id
+        return resp
+
+    client.recv_executeWithParameter = recv_executeWithParameter
+    with pytest.raises(IOErrorException) as e:
+        connection.execute_pipeline(session._session_id, [("YIELD 1", None)] * 3)
+    assert e.value.type == IOErrorException.E_CONNECT_BROKEN
+    # the connection is not used again
+    assert connection.is_closed()
+    pool.return_connection(connection)
+    assert connection not in pool._connections[graphd.address]
+    # no signout on the closed connection
+    session.release()
+    pool.close()
+
+
+def test_session_execute_many(graphd):
+    pool = ConnectionPool()
+    assert pool.init([graphd.address], Config())
+    session = pool.get_session("root", "nebula")
+    results = session.execute_many(
+        [
+            "YIELD 1",
+            ("YIELD $a", {"a": 1}),
+            "ERROR",
+            ("YIELD $b", {"b": {}}),
+            ("YIELD 2", None),
+        ]
+    )
+    assert results[0].row_values(0)[0].as_string() == "YIELD 1"
+    assert results[1].row_values(0)[0].as_string() == "YIELD $a"
+    assert isinstance(results[2], ExecuteError)
+    assert results[2].code == ErrorCode.E_SYNTAX_ERROR
+    assert isinstance(results[3], TypeError)
+    assert results[4].row_values(0)[0].as_string() == "YIELD 2"
+    # one round of the pipeline
+    assert graphd.handler.calls["execute"] == 4
+    session.release()
+    pool.close()
+
+
+def test_session_execute_many_concurrency(graphd):
+    pool = ConnectionPool()
+    assert pool.init([graphd.address], Config())
+    session = pool.get_session("root", "nebula")
+    client = session._connection._connection
+    send, recv = client.send_executeWithParameter, client.recv_executeWithParameter
+    outstanding = [0]
+
+    def send_executeWithParameter(*args):
+        outstanding.append(outstanding[-1] + 1)
+        send(*args)
+
+    def recv_executeWithParameter():
+        outstanding.append(outstanding[-1] - 1)
+        return recv()
+
+    client.send_executeWithParameter = send_executeWithParameter
+    client.recv_executeWithParameter = recv_executeWithParameter
+    results = session.execute_many(["YIELD {}".format(i) for i in range(10)], 3)
+    assert [r.row_values(0)[0].as_string() for r in results] == [
+        "YIELD {}".format(i) for i in range(10)
+    ]
+    # the concurrency is the window of the pipeline
+    assert max(outstanding) == 3
+    session.release()
+    pool.close()
+
+
+def test_session_execute_many_broken(graphd):
+    pool = ConnectionPool()
+    assert pool.init([graphd.address], Config())
+    session = pool.get_session("root", "nebula")
+    broken = session._connection
+    client = broken._connection
+    recv = client.recv_executeWithParameter
+    received = []
+
+    def recv_executeWithParameter():
+        if len(received) == 3:
+            raise TTransportException(TTransportException.END_OF_FILE, "broken")
+        received.append(None)
+        resp = recv()
+        if len(received) == 2:
+            raise TApplicationException(TApplicationException.INTERNAL_ERROR, "bad")
+        return resp
+
+    client.recv_executeWithParameter = recv_executeWithParameter
+    executes = graphd.handler.calls.get("execute", 0)
+    results = session.execute_many(["YIELD {}".format(i) for i in range(6)], 4)
+    # the replies received are kept, each error is on its own statements
+    assert results[0].row_values(0)[0].as_string() == "YIELD 0"
+    assert isinstance(results[1], TApplicationException)
+    assert results[2].row_values(0)[0].as_string() == "YIELD 2"
+    for result in results[3:]:
+        assert isinstance(result, IOErrorException)
+        assert result.type == IOErrorException.E_CONNECT_BROKEN
+    # the statements are not sent again, the session reconnected
+    assert session._connection is not broken
+    assert session.execute("YIELD 1").is_succeeded()
+    assert graphd.handler.calls["execute"] <= executes + 6 + 1
+    with pytest.raises(IOErrorException):
+        broken.execute_pipeline(session._session_id, [("YIELD 1", None)])
+    session.release()
+    pool.close()
@@ -11,13 +11,17 @@ import threading
 import time
 from unittest import TestCase
 
+import pytest
+
 from nebula3.common.ttypes import ErrorCode
 from nebula3.Config import SessionPoolConfig
 from nebula3.Exception import (
     InValidHostname,
+    NoValidSessionException,
 )
 from nebula3.gclient.net import Connection
 from nebula3.gclient.net.SessionPool import SessionPool
+from nebula3.gclient.net.base import ExecuteError, _may_switch_space
 
 # ports for test
 test_port = 9669
@@ -221,3 +225,281 @@ def test_session_pool_multi_thread():
     thread4.join()
     assert len(session_pool._active_sessions) == 0
     assert success_flag
+
+
+def test_session_pool_wait(graphd):
+    config = SessionPoolConfig()
+    config.min_size = 0
+    config.max_size = 1
+    config.acquire_timeout = 2000
+    pool = SessionPool("root", "nebula", "nba", [graphd.address])
+    assert pool.init(config)
+    graphd.handler.latency = 0.1
+    errors = []
+
+    def execute():
+        try:
+            assert pool.execute("YIELD 1").is_succeeded()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=execute) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert pool.wait_stats()["waits"] == 3
+    assert graphd.handler.calls["authenticate"] == 1
+
+    # the waiter times out
+    config.acquire_timeout = 50
+    threads = [threading.Thread(target=execute) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(errors) == 1
+    assert isinstance(errors[0], NoValidSessionException)
+    assert pool.wait_stats()["timeouts"] == 1
+    pool.close()
+
+
+def test_session_pool_execute_many(graphd):
+    config = SessionPoolConfig()
+    config.min_size = 0
+    config.max_size = 4
+    pool = SessionPool("root", "nebula", "nba", [graphd.address])
+    assert pool.init(config)
+    graphd.handler.latency = 0.05
+    stmts = ["YIELD {}".format(i) for i in range(16)]
+    start = time.time()
+    results = pool.execute_many(stmts + ["ERROR"], concurrency=8)
+    # 4 sessions at the same time
+    assert time.time() - start < 0.05 * 16
+    assert [r.row_values(0)[0].as_string() for r in results[:-1]] == stmts
+    assert isinstance(results[-1], ExecuteError)
+    assert graphd.handler.calls["authenticate"] <= 4
+    pool.close()
+
+
+def test_session_pool_bookkeeping(graphd, graphd2):
+    config = SessionPoolConfig()
+    config.min_size = 8
+    config.max_size = 8
+    pool = SessionPool("root", "nebula", "nba", [graphd.address, graphd2.address])
+    assert pool.init(config)
+    assert sorted(pool._idle_sessions.addresses()) == sorted(
+        [graphd.address, graphd2.address]
+    )
+
+    def checkout():
+        for _ in range(200):
+            pool._return_session(pool._get_idle_session())
+
+    threads = [threading.Thread(target=checkout) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(pool._idle_sessions) == 8
+    assert len(set(pool._idle_sessions)) == 8
+    assert len(pool._active_sessions) == 0
+
+    # the idle sessions beyond min_size expire
+    config.min_size = 2
+    config.idle_time = 50
+    sessions = [pool._get_idle_session() for _ in range(3)]
+    time.sleep(0.1)
+    for session in sessions:
+        pool._return_session(session)
+    pool._remove_idle_unusable_session()
+    assert len(pool._idle_sessions) == 3
+    assert set(pool._idle_sessions) == set(sessions)
+    pool.close()
+
+
+@pytest.mark.parametrize(
+    "stmt, switch",
+    [
+        ("USE nba", True),
+        ("use nba; YIELD 1", True),
+        ("USE`nba`", True),
+        ("USE\n`my space`", True),
+        ("YIELD 1; DROP SPACE nba", True),
+        ("YIELD 1", False),
+        ("YIELD 'USED'", False),
+        ("YIELD $USE_COUNT", False),
+    ],
+)
+def test_may_switch_space(stmt, switch):
+    assert _may_switch_space(stmt) is switch
+
+
+def test_session_pool_space(graphd):
+    config = SessionPoolConfig()
+    config.min_size = 1
+    config.max_size = 1
+    pool = SessionPool("root", "nebula", "nba", [graphd.address])
+    assert pool.init(config)
+    session_id = next(iter(pool._idle_sessions))._session_id
+    # the USE of the new session
+    assert graphd.handler.calls["execute"] == 1
+
+    # no USE after the statements which can not switch the space
+    for _ in range(5):
+        assert pool.execute("YIELD 1").is_succeeded()
+        assert pool.execute_json("YIELD 1")
+    assert graphd.handler.calls["execute"] == 6
+
+    # switched back when the session is checked out next time
+    assert pool.execute("USE other; YIELD 1").is_succeeded()
+    assert graphd.handler.spaces[session_id] == b"other"
+    assert graphd.handler.calls["execute"] == 7
+    assert pool.execute("YIELD 1").is_succeeded()
+    assert graphd.handler.spaces[session_id] == b"nba"
+    assert graphd.handler.calls["execute"] == 9
+
+    json.loads(pool.execute_json("USE other"))
+    assert graphd.handler.spaces[session_id] == b"other"
+    assert pool.execute("YIELD 1").is_succeeded()
+    assert graphd.handler.spaces[session_id] == b"nba"
+
+    # a session invalid is replaced
+    resp = json.loads(pool.execute_json("EXPIRE"))
+    assert resp["errors"][0]["code"] == ErrorCode.E_SESSION_INVALID
+    assert graphd.handler.calls["authenticate"] == 2
+    assert next(iter(pool._idle_sessions))._session_id != session_id
+    assert pool.execute("YIELD 1").is_succeeded()
+    pool.close()
+
+
+def test_session_pool_spaces(graphd):
+    config = SessionPoolConfig()
+    config.min_size = 1
+    config.max_size = 2
+    pool = SessionPool("root", "nebula", "nba", [graphd.address])
+    assert pool.init(config)
+    tenant_a = pool.space("a")
+    tenant_b = pool.space("b")
+
+    # a new session for the space while the pool is not full
+    assert tenant_a.execute("YIELD 1").is_succeeded()
+    assert sorted(graphd.handler.spaces.values()) == [b"a", b"nba"]
+    assert graphd.handler.calls["authenticate"] == 2
+    # the idle session of the space is used, no USE
+    executed = graphd.handler.calls["execute"]
+    for _ in range(3):
+        assert tenant_a.execute("YIELD 1").is_succeeded()
+        assert pool.execute("YIELD 1").is_succeeded()
+    assert graphd.handler.calls["execute"] == executed + 6
+
+    # the pool is full, the session of the least recently used space is
+    # switched to the space
+    assert tenant_b.execute("YIELD 1").is_succeeded()
+    assert sorted(graphd.handler.spaces.values()) == [b"b", b"nba"]
+    assert graphd.handler.calls["execute"] == executed + 8
+    assert pool.space("nba").execute("YIELD 1").is_succeeded()
+    assert graphd.handler.calls["execute"] == executed + 9
+
+    # the sessions in use are not switched, the statements wait for one
+    results = tenant_b.execute_many(["YIELD 1"] * 4)
+    assert all(result.is_succeeded() for result in results)
+    assert graphd.handler.calls["authenticate"] == 2
+    assert len(pool._idle_sessions) == 2
+    pool.close()
+
+
+def test_session_pool_ping_sessions(graphd):
+    config = SessionPoolConfig()
+    config.min_size = 3
+    config.max_size = 3
+    pool = SessionPool("root", "nebula", "nba", [graphd.address])
+    assert pool.init(config)
+    sessions = {
+        session._session_id: session._idle_time_start for session in pool._idle_sessions
+    }
+    expired = min(sessions)
+    graphd.handler.expired.add(expired)
+    graphd.handler.latency = 0.2
+
+    # the sessions are pinged at the same time, and the dead one replaced
+    start = time.time()
+    pool.ping_sessions()
+    assert time.time() - start < 0.6
+    assert graphd.handler.calls["authenticate"] == 4
+    idle = {session._session_id: session for session in pool._idle_sessions}
+    assert len(idle) == 3 and expired not in idle
+    # the pings do not count as use for SessionPoolConfig.idle_time
+    for session_id, idle_time_start in sessions.items():
+        if session_id != expired:
+            assert idle[session_id]._idle_time_start == idle_time_start
+    pool.close()
+
+
+def test_session_pool_probe(graphd):
+    config = SessionPoolConfig()
+    config.min_size = 3
+    config.max_size = 3
+    pool = SessionPool("root", "nebula", "nba", [graphd.address])
+    assert pool.init(config)
+    idle = [(s, s._idle_time_start) for s in pool._idle_sessions]
+    time.sleep(0.01)
+    assert pool._probe(graphd.address)
+    # the probed session is not taken as used
+    assert [(s, s._idle_time_start) for s in pool._idle_sessions] == idle
+    pool.close()
+
+
+def test_session_pool_keep_alive(graphd):
+    config = SessionPoolConfig()
+    config.min_size = 1
+    config.max_size = 1
+    config.keep_alive_interval = 100
+    pool = SessionPool("root", "nebula", "nba", [graphd.address])
+    assert pool.init(config)
+    executed = graphd.handler.calls["execute"]
+    time.sleep(0.3)
+    assert graphd.handler.calls["execute"] > executed
+
+    # the dead session is replaced in the background
+    session_id = next(iter(pool._idle_sessions))._session_id
+    graphd.handler.expired.add(session_id)
+    time.sleep(0.3)
+    assert graphd.handler.calls["authenticate"] == 2
+    assert next(iter(pool._idle_sessions))._session_id != session_id
+    assert pool.execute("YIELD 1").is_succeeded()
+    assert graphd.handler.calls["authenticate"] == 2
+    pool.close()
+
+
+def test_session_pool_create_in_parallel(graphd):
+    graphd.handler.connect_latency = 0.1
+    config = SessionPoolConfig()
+    config.min_size = 8
+    config.max_size = 12
+    config.create_workers = 8
+    pool = SessionPool("root", "nebula", "nba", [graphd.address])
+    start = time.time()
+    assert pool.init(config)
+    assert time.time() - start < 0.4
+    assert len(pool._idle_sessions) == 8
+
+    # the callers create the sessions out of the lock at the same time, up
+    # to the max size
+    sessions = [pool._get_idle_session() for _ in range(8)]
+    threads = [
+        threading.Thread(target=lambda: sessions.append(pool._get_idle_session()))
+        for _ in range(4)
+    ]
+    start = time.time()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert time.time() - start < 0.3
+    assert len(sessions) == 12 and pool._creating == 0
+    assert graphd.handler.calls["authenticate"] == 12
+    for session in sessions:
+        pool._return_session(session)
+    pool.close()
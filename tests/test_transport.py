@@ -0,0 +1,201 @@
+#!/usr/bin/env python
+# --coding:utf-8--
+
+# Copyright (c) 2026 vesoft inc. All rights reserved.
+#
+# This source code is licensed under Apache 2.0 License.
+
+import socket
+import threading
+
+import pytest
+
+from nebula3.common import ttypes
+from nebula3.common.ttypes import DataSet, Row, Value
+from nebula3.fbthrift.protocol import THeaderProtocol
+from nebula3.fbthrift.transport import THeaderTransport, TSocket, TTransport
+from nebula3.graph import ttypes as graph_ttypes
+from nebula3.graph.ttypes import ExecutionResponse
+
+
+class ChunkedTransport(TTransport.TTransportBase):
+    """Serve data in small pieces like a socket does"""
+
+    def __init__(self, data, chunk=7):
+        self._buf = TTransport.TMemoryBuffer(data)
+        self._chunk = chunk
+
+    def read(self, sz):
+        return self._buf.read(min(sz, self._chunk))
+
+
+def make_response(rows):
+    data = DataSet(column_names=[b'a', b'b'], rows=[])
+    for i in range(rows):
+        data.rows.append(Row(values=[Value(iVal=i), Value(sVal=b'x' * (i % 100))]))
+    return ExecutionResponse(error_code=0, latency_in_us=1, data=data)
+
+
+def header_frame(resp, proto_id, transforms=()):
+    buf = TTransport.TMemoryBuffer()
+    trans = THeaderTransport.THeaderTransport(buf)
+    trans.set_protocol_id(proto_id)
+    for trans_id in transforms:
+        trans.add_transform(trans_id)
+    resp.write(THeaderProtocol.THeaderProtocol(trans))
+    trans.flush()
+    return buf.getvalue()
+
+
+def test_read_buffer():
+    buf = TTransport.read_buffer(ChunkedTransport(b'0123456789'), b'ab', 5, 8)
+    assert buf.getvalue() == b'ab012345'
+    buf = TTransport.read_buffer(ChunkedTransport(b'0123456789'), b'ab', 9)
+    assert buf.getvalue() == b'ab0123456'
+    assert buf.read() == b'ab0123456'
+    # nothing to read
+    buf = TTransport.read_buffer(ChunkedTransport(b''), b'ab', 2)
+    assert buf.getvalue() == b'ab'
+    with pytest.raises(TTransport.TTransportException):
+        TTransport.read_buffer(ChunkedTransport(b'0123'), b'', 5)
+
+
+def test_buffered_read_into():
+    data = bytes(range(256)) * 64
+    trans = TTransport.TBufferedTransport(ChunkedTransport(data, 1000), 512)
+    out = bytearray(len(data))
+    view = memoryview(out)
+    pos = 0
+    for sz in (1, 10, 300, 4000, 1, 20000):
+        sz = min(sz, len(data) - pos)
+        trans.readAllInto(view[pos : pos + sz])
+        pos += sz
+    assert bytes(out) == data
+    with pytest.raises(TTransport.TTransportException):
+        trans.readAllInto(bytearray(1))
+
+
+@pytest.mark.parametrize(
+    'proto_id',
+    [THeaderTransport.T_BINARY_PROTOCOL, THeaderTransport.T_COMPACT_PROTOCOL],
+)
+@pytest.mark.parametrize('transforms', [(), (THeaderTransport.TRANSFORM.ZLIB,)])
+@pytest.mark.parametrize('accelerate', [True, False])
+def test_header_frame_over_socket(proto_id, transforms, accelerate, monkeypatch):
+    if not accelerate:
+        monkeypatch.setattr(ttypes, 'fastproto', None)
+        monkeypatch.setattr(graph_ttypes, 'fastproto', None)
+    resp = make_response(5000)
+    frame = header_frame(resp, proto_id, transforms)
+    server, client = socket.socketpair()
+    sender = threading.Thread(target=server.sendall, args=(frame * 2,))
+    sender.start()
+    try:
+        sock = TSocket.TSocket()
+        sock.setHandle(client)
+        trans = THeaderTransport.THeaderTransport(TTransport.TBufferedTransport(sock))
+        prot = THeaderProtocol.THeaderProtocol(trans)
+        for _ in range(2):
+            # what readMessageBegin does
+            trans.readFrame(0)
+            prot.reset_protocol()
+            got = ExecutionResponse()
+            got.read(prot)
+            assert got == resp
+    finally:
+        sender.join()
+        server.close()
+        client.close()
+
+
+def test_framed_transport():
+    payload = b'hello framed transport'
+    data = TTransport.TMemoryBuffer()
+    framed = TTransport.TFramedTransport(data)
+    framed.write(payload)
+    framed.flush()
+    framed = TTransport.TFramedTransport(ChunkedTransport(data.getvalue()))
+    assert framed.readAll(len(payload)) == payload
+
+
+def test_socket_write_large_buffer():
+    data = bytes(range(256)) * 40000
+    server, client = socket.socketpair()
+    # a small send buffer forces many partial sends
+    client.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+    received = bytearray()
+
+    def drain():
+        while len(received) < len(data):
+            chunk = server.recv(65536)
+            if not chunk:
+                break
+            received.extend(chunk)
+
+    reader = threading.Thread(target=drain)
+    reader.start()
+    try:
+        sock = TSocket.TSocket()
+        sock.setHandle(client)
+        sock.write(data)
+        reader.join()
+        assert bytes(received) == data
+    finally:
+        server.close()
+        client.close()
+
+
+def read_header_frame(frame):
+    trans = THeaderTransport.THeaderTransport(TTransport.TMemoryBuffer(frame))
+    prot = THeaderProtocol.THeaderProtocol(trans)
+    trans.readFrame(0)
+    prot.reset_protocol()
+    got = ExecutionResponse()
+    got.read(prot)
+    return got
+
+
+def compressed_frame(resp, min_size):
+    buf = TTransport.TMemoryBuffer()
+    trans = THeaderTransport.THeaderTransport(buf)
+    trans.set_compression('zlib', min_size)
+    resp.write(THeaderProtocol.THeaderProtocol(trans))
+    trans.flush()
+    return buf.getvalue()
+
+
+def test_header_compression():
+    small = make_response(2)
+    large = make_response(2000)
+    plain = header_frame(small, THeaderTransport.T_COMPACT_PROTOCOL)
+    # below the threshold the frame is sent as is
+    assert compressed_frame(small, 1024) == plain
+    assert read_header_frame(compressed_frame(small, 1024)) == small
+
+    plain = header_frame(large, THeaderTransport.T_COMPACT_PROTOCOL)
+    frame = compressed_frame(large, 1024)
+    assert len(frame) < len(plain) // 4
+    assert frame == header_frame(
+        large, THeaderTransport.T_COMPACT_PROTOCOL, (THeaderTransport.TRANSFORM.ZLIB,)
+    )
+    assert read_header_frame(frame) == large
+
+
+def test_header_compression_unknown():
+    trans = THeaderTransport.THeaderTransport(TTransport.TMemoryBuffer())
+    with pytest.raises(ValueError):
+        trans.set_compression('lz4')
+
+
+@pytest.mark.parametrize('name', ['binary', 'compact'])
+def test_header_set_protocol(name):
+    resp = make_response(20)
+    buf = TTransport.TMemoryBuffer()
+    trans = THeaderTransport.THeaderTransport(buf)
+    trans.set_protocol(name)
+    resp.write(THeaderProtocol.THeaderProtocol(trans))
+    trans.flush()
+    assert buf.getvalue() == header_frame(resp, THeaderTransport.PROTOCOLS[name])
+    assert read_header_frame(buf.getvalue()) == resp
+    with pytest.raises(ValueError):
+        trans.set_protocol('json')